@@ -1,9 +1,35 @@
+import time
 import boto3
 from botocore.exceptions import ClientError
 import logging
 
 logging.basicConfig(level=logging.INFO)
 
+def wait_for_query(client, query_execution_id, initial_delay=0.1, max_delay=5.0, timeout=300.0):
+    # Poll with exponential backoff: short queries return quickly and long
+    # ones are not polled more than once every max_delay seconds.
+    delay = initial_delay
+    deadline = time.monotonic() + timeout
+    while True:
+        state = client.get_query_execution(QueryExecutionId=query_execution_id)['QueryExecution']['Status']['State']
+        if state in ['SUCCEEDED', 'FAILED', 'CANCELLED']:
+            return state
+        if time.monotonic() + delay > deadline:
+            return 'TIMED_OUT'
+        time.sleep(delay)
+        delay = min(delay * 2, max_delay)
+
+def iter_result_rows(client, query_execution_id, page_size=1000):
+    # Follow NextToken so large result sets are streamed page by page.
+    kwargs = {'QueryExecutionId': query_execution_id, 'MaxResults': page_size}
+    while True:
+        results = client.get_query_results(**kwargs)
+        for row in results['ResultSet']['Rows']:
+            yield row
+        if 'NextToken' not in results:
+            return
+        kwargs['NextToken'] = results['NextToken']
+
 def execute_query(database_name, query):
     client = boto3.client('athena')
     try:
@@ -16,15 +42,10 @@ def execute_query(database_name, query):
         logging.info(f"Query started with execution ID: {query_execution_id}")
         
         # Wait for the query to complete
-        while True:
-            query_status = client.get_query_execution(QueryExecutionId=query_execution_id)['QueryExecution']['Status']['State']
-            if query_status in ['SUCCEEDED', 'FAILED', 'CANCELLED']:
-                break
-            time.sleep(2)
+        query_status = wait_for_query(client, query_execution_id)
         
         if query_status == 'SUCCEEDED':
-            results = client.get_query_results(QueryExecutionId=query_execution_id)
-            for row in results['ResultSet']['Rows']:
+            for row in iter_result_rows(client, query_execution_id):
                 logging.info(row['Data'])
         else:
             logging.error(f"Query failed with status: {query_status}")
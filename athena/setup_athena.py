@@ -18,20 +18,47 @@ def create_database(database_name):
     except ClientError as e:
         logging.error(f"Error creating database: {e}")
 
-def create_table(database_name, table_name, s3_location):
+def create_table(database_name, table_name, s3_location, partitioned=False,
+                 sensor_buckets=16, first_day='2024-01-01'):
+    # Partitioned tables read the dt=/hour=/sensor_bucket= layout written by
+    # rtap.partitioning; partition projection computes the partitions from
+    # the query predicates, so no MSCK REPAIR / ADD PARTITION is needed.
+    # sensor_bucket is sensor_id % sensor_buckets.
     client = boto3.client('athena')
+    partitions = ''
+    properties = ''
+    if partitioned:
+        partitions = """
+    PARTITIONED BY (
+        dt STRING,
+        hour STRING,
+        sensor_bucket INT
+    )"""
+        properties = f"""
+    TBLPROPERTIES (
+        'projection.enabled' = 'true',
+        'projection.dt.type' = 'date',
+        'projection.dt.format' = 'yyyy-MM-dd',
+        'projection.dt.range' = '{first_day},NOW',
+        'projection.hour.type' = 'integer',
+        'projection.hour.range' = '0,23',
+        'projection.hour.digits' = '2',
+        'projection.sensor_bucket.type' = 'integer',
+        'projection.sensor_bucket.range' = '0,{sensor_buckets - 1}',
+        'storage.location.template' = 's3://{s3_location}/dt=${{dt}}/hour=${{hour}}/sensor_bucket=${{sensor_bucket}}/'
+    )"""
     query = f"""
     CREATE EXTERNAL TABLE IF NOT EXISTS {database_name}.{table_name} (
         sensor_id STRING,
         temperature DOUBLE,
         humidity DOUBLE,
         timestamp BIGINT
-    )
+    ){partitions}
     ROW FORMAT SERDE 'org.openx.data.jsonserde.JsonSerDe'
     WITH SERDEPROPERTIES (
         'serialization.format' = '1'
     )
-    LOCATION 's3://{s3_location}/';
+    LOCATION 's3://{s3_location}/'{properties};
     """
     try:
         response = client.start_query_execution(
@@ -47,7 +74,7 @@ def create_table(database_name, table_name, s3_location):
 if __name__ == "__main__":
     database_name = 'example_database'
     table_name = 'example_table'
-    s3_location = 'your-s3-bucket/path/to/data'
+    s3_location = 'your-s3-bucket/processed'
     
     create_database(database_name)
-    create_table(database_name, table_name, s3_location)
+    create_table(database_name, table_name, s3_location, partitioned=True)
@@ -0,0 +1,73 @@
+"""Lambda throughput through the local event source mapping.
+
+Run with ``PYTHONPATH=.:src python benchmarks/bench_esm.py --events 50000``
+(the repository root must be importable for the local AWS fakes).
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import logging
+from pathlib import Path
+
+import sitecustomize  # noqa: F401
+
+import boto3
+import rtap.aws  # noqa: F401
+
+from rtap.codecs import JSON_CODEC
+from rtap.esm import EventSourceMapping
+from rtap.loadgen import LoadGenerator
+from rtap.metrics import MetricRegistry
+
+
+def load_processor():
+    path = Path(__file__).resolve().parents[1] / "lambda" / "processor.py"
+    spec = importlib.util.spec_from_file_location("lambda_processor", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=50_000)
+    parser.add_argument("--shards", type=int, default=4)
+    args = parser.parse_args()
+    processor = load_processor()
+    logging.getLogger().setLevel(logging.WARNING)
+    client = boto3.client("kinesis")
+    events = LoadGenerator(sensor_count=1000).generate(args.events)
+    entries = [
+        {"Data": JSON_CODEC.encode(event), "PartitionKey": str(event.sensor_id)}
+        for event in events
+    ]
+    for batch_size in (10, 100, 500):
+        for factor in (1, 4):
+            name = f"bench-{batch_size}-{factor}"
+            client.create_stream(StreamName=name, ShardCount=args.shards)
+            for start in range(0, len(entries), 500):
+                chunk = entries[start : start + 500]
+                client.put_records(StreamName=name, Records=chunk)
+            metrics = MetricRegistry()
+            stats = EventSourceMapping(
+                client,
+                name,
+                processor.lambda_handler,
+                batch_size=batch_size,
+                parallelization_factor=factor,
+                metrics=metrics,
+            ).run()
+            summary = metrics.snapshot().summary()
+            rate = stats.records_per_second
+            print(
+                f"batch {batch_size:>4} x{factor}  {rate:9.0f} rec/s"
+                f"  {stats.invocations:>5} invocations"
+                f"  iterator age p95 {summary['esm.iterator_age_ms.p95']:8.1f} ms"
+                f"  invocation p50 {summary['esm.invocation_ms.p50']:7.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
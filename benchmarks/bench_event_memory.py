@@ -0,0 +1,70 @@
+"""Measure the memory retained per EventPayload.
+
+Run with ``PYTHONPATH=src python benchmarks/bench_event_memory.py``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import random
+import sys
+import tracemalloc
+
+from rtap.plugins.base import EventPayload
+from rtap.plugins.loader import PluginRegistry
+
+
+def retained_bytes_per_event(count: int) -> float:
+    rng = random.Random(42)
+    values = [
+        (
+            rng.randint(1, 5),
+            round(rng.uniform(20.0, 35.0), 2),
+            round(rng.uniform(30.0, 70.0), 2),
+            1_700_000_000 + index,
+        )
+        for index in range(count)
+    ]
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    events = [EventPayload(*row) for row in values]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    # Only the payload objects are counted; the field values already exist.
+    growth = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    growth -= sys.getsizeof(events)
+    return growth / count
+
+
+def chain_allocations_per_event(count: int, in_place: bool) -> float:
+    registry = PluginRegistry(mutate_in_place=in_place)
+    registry.register_builtin(["normalize_temperature", "clamp_humidity"])
+    events = [EventPayload(1, 80.0, 120.0, index) for index in range(count)]
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    results = [registry.process_all(event) for event in events]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    growth = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    growth -= sys.getsizeof(results)
+    return growth / count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=100_000)
+    args = parser.parse_args()
+    instance = sys.getsizeof(EventPayload(1, 1.0, 1.0, 1))
+    print(f"EventPayload instance size: {instance} B")
+    print(f"retained per event: {retained_bytes_per_event(args.events):.1f} B")
+    for in_place in (False, True):
+        label = "in-place" if in_place else "copying"
+        per_event = chain_allocations_per_event(args.events, in_place)
+        print(f"two-plugin chain ({label}): {per_event:.1f} B allocated per event")
+
+
+if __name__ == "__main__":
+    main()
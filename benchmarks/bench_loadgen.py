@@ -0,0 +1,50 @@
+"""Event generation throughput: EventGenerator versus LoadGenerator.
+
+Run with ``PYTHONPATH=src python benchmarks/bench_loadgen.py --events 10000000``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from rtap.columnar import np
+from rtap.loadgen import LoadGenerator
+from rtap.pipeline import EventGenerator
+
+
+def rate(label: str, count: int, consume) -> None:
+    start = time.perf_counter()
+    consume()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed:8.2f} s  {count / elapsed / 1e6:6.2f} M events/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--sensors", type=int, default=10_000)
+    args = parser.parse_args()
+    count = args.events
+    print(f"backend: {'numpy' if np is not None else 'array'}")
+    generator = LoadGenerator(sensor_count=args.sensors, anomaly_rate=0.001)
+
+    rate(
+        "EventGenerator.iter_events",
+        count,
+        lambda: sum(1 for _ in EventGenerator().iter_events(count)),
+    )
+    rate(
+        "LoadGenerator.iter_batches",
+        count,
+        lambda: sum(len(batch) for batch in generator.iter_batches(count)),
+    )
+    rate(
+        "LoadGenerator.iter_events",
+        count,
+        lambda: sum(1 for _ in generator.iter_events(count)),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Per-event cost of interpreted versus compiled plugin chains.
+
+Run with ``PYTHONPATH=src python benchmarks/bench_plugin_chain.py``.
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+import time
+
+from rtap.plugins.base import EventPayload
+from rtap.plugins.loader import PluginRegistry
+
+BUILTINS = ("normalize_temperature", "clamp_humidity", "passthrough")
+
+
+@dataclass
+class CopyPayloadPlugin:
+    """A custom plugin that cannot be fused."""
+
+    name: str = "copy_payload"
+
+    def process(self, payload: EventPayload) -> EventPayload:
+        return EventPayload(
+            payload.sensor_id, payload.temperature, payload.humidity, payload.timestamp
+        )
+
+
+def build_registry(length: int, custom_every: int) -> PluginRegistry:
+    registry = PluginRegistry()
+    for index in range(length):
+        if custom_every and index % custom_every == custom_every - 1:
+            registry.register(CopyPayloadPlugin())
+        else:
+            registry.register_builtin([BUILTINS[index % len(BUILTINS)]])
+    return registry
+
+
+def ns_per_event(func, events) -> float:
+    start = time.perf_counter()
+    for event in events:
+        func(event)
+    return (time.perf_counter() - start) / len(events) * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument(
+        "--custom-every",
+        type=int,
+        default=0,
+        help="insert a non-fusable custom plugin every N positions",
+    )
+    args = parser.parse_args()
+    events = [
+        EventPayload(index % 50, 50.0 + index % 40, index % 120 - 10.0, index)
+        for index in range(args.events)
+    ]
+    print(f"{'plugins':>8} {'loop ns/event':>14} {'compiled ns/event':>18}")
+    for length in (1, 5, 20):
+        registry = build_registry(length, args.custom_every)
+        interpreted = ns_per_event(registry.process_all, events)
+        compiled = ns_per_event(registry.freeze(), events)
+        print(f"{length:>8} {interpreted:>14.0f} {compiled:>18.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Query latency and bytes scanned: flat JSONL, partitioned JSONL and segments.
+
+Run with ``PYTHONPATH=.:src python benchmarks/bench_query.py --events 200000``
+(the repository root must be importable for the local AWS fakes).
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import sitecustomize  # noqa: F401
+
+import boto3
+import rtap.aws  # noqa: F401
+
+from rtap.codecs import JSON_CODEC
+from rtap.loadgen import LoadGenerator
+from rtap.partitioning import PartitionedS3Writer
+from rtap.query import QueryEngine, Table
+from rtap.segments import encode_segment
+
+COLUMNS = {
+    "sensor_id": "bigint",
+    "temperature": "double",
+    "humidity": "double",
+    "timestamp": "bigint",
+}
+PARTITIONS = {"dt": "string", "hour": "string", "sensor_bucket": "int"}
+
+
+def run(engine: QueryEngine, label: str, sql: str, table: Table) -> None:
+    start = time.perf_counter()
+    result = engine.execute(sql, table)
+    rows = list(result.rows)
+    elapsed = time.perf_counter() - start
+    stats = result.stats
+    print(
+        f"{label:<28} {elapsed * 1000:9.1f} ms  {stats.bytes_scanned / 1e6:8.2f} MB"
+        f"  {stats.objects_scanned:>4} objects  {len(rows)} rows"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=200_000)
+    args = parser.parse_args()
+    start = 1_709_596_800
+    rate = args.events / (24 * 3600)
+    events = LoadGenerator(
+        sensor_count=1000, start_timestamp=start, events_per_second=rate
+    ).generate(args.events)
+    s3 = boto3.client("s3")
+    s3.put_object(
+        Bucket="bench",
+        Key="flat/events.jsonl",
+        Body=b"\n".join(JSON_CODEC.encode(event) for event in events),
+    )
+    s3.put_object(
+        Bucket="bench", Key="segment/events.rtseg", Body=encode_segment(events)
+    )
+    writer = PartitionedS3Writer(s3, "bench", prefix="partitioned")
+    writer.write_many(events)
+    writer.close()
+
+    engine = QueryEngine(s3)
+    sql = (
+        "SELECT sensor_id, COUNT(*) AS n, AVG(temperature) FROM events "
+        "WHERE {filter} GROUP BY sensor_id ORDER BY n DESC LIMIT 5"
+    )
+    hour = f"timestamp >= {start + 7 * 3600} AND timestamp < {start + 8 * 3600}"
+    run(
+        engine,
+        "flat jsonl, one hour",
+        sql.format(filter=hour),
+        Table("events", "s3://bench/flat", COLUMNS),
+    )
+    run(
+        engine,
+        "partitioned jsonl, one hour",
+        sql.format(filter="hour = '07'"),
+        Table("events", "s3://bench/partitioned", COLUMNS, PARTITIONS),
+    )
+    run(
+        engine,
+        "segment, one hour",
+        sql.format(filter=hour),
+        Table("events", "s3://bench/segment", COLUMNS),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Warehouse path: COPY throughput and query latency on the local redshift-data.
+
+Run with ``PYTHONPATH=.:src python benchmarks/bench_redshift.py --events 500000``
+(the repository root must be importable for the local AWS fakes).
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import sitecustomize  # noqa: F401
+
+import boto3
+import rtap.aws  # noqa: F401
+
+from rtap.codecs import JSON_CODEC
+from rtap.loadgen import LoadGenerator
+
+
+def execute(client, sql: str) -> dict:
+    statement_id = client.execute_statement(
+        ClusterIdentifier="bench", Database="dev", Sql=sql
+    )["Id"]
+    status = client.describe_statement(Id=statement_id)
+    if status["Status"] != "FINISHED":
+        raise RuntimeError(status.get("Error"))
+    return status
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=500_000)
+    parser.add_argument("--objects", type=int, default=10)
+    args = parser.parse_args()
+    s3 = boto3.client("s3")
+    batch_size = max(1, args.events // args.objects)
+    generator = LoadGenerator(sensor_count=1000, batch_size=batch_size)
+    for index, batch in enumerate(generator.iter_batches(args.events)):
+        s3.put_object(
+            Bucket="bench",
+            Key=f"load/part-{index:05d}.jsonl",
+            Body=b"\n".join(JSON_CODEC.encode(event) for event in batch.to_events()),
+        )
+
+    client = boto3.client("redshift-data")
+    execute(
+        client,
+        "CREATE TABLE events (sensor_id BIGINT, temperature DOUBLE PRECISION, "
+        "humidity DOUBLE PRECISION, timestamp BIGINT)",
+    )
+    start = time.perf_counter()
+    status = execute(
+        client, "COPY events FROM 's3://bench/load/' FORMAT AS JSON 'auto'"
+    )
+    elapsed = time.perf_counter() - start
+    print(
+        f"COPY {status['ResultRows']} rows      {elapsed:8.2f} s"
+        f"  {status['ResultRows'] / elapsed / 1e3:8.1f} k rows/s"
+    )
+    for sql in (
+        "SELECT COUNT(*) FROM events",
+        "SELECT sensor_id, AVG(temperature) FROM events GROUP BY sensor_id",
+        "SELECT * FROM events WHERE temperature > 34.9",
+    ):
+        status = execute(client, sql)
+        duration_ms = status["Duration"] / 1e6
+        print(f"{duration_ms:9.1f} ms  {status['ResultRows']:>7} rows  {sql}")
+
+
+if __name__ == "__main__":
+    main()
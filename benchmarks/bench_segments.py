@@ -0,0 +1,65 @@
+"""Scan cost: JSON Lines versus columnar segments with projection and zone maps.
+
+Run with ``PYTHONPATH=src python benchmarks/bench_segments.py --events 1000000``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from rtap.codecs import JSON_CODEC
+from rtap.columnar import np
+from rtap.loadgen import LoadGenerator
+from rtap.reporting import AnalyticsReport
+from rtap.segments import SegmentReader, encode_segment
+
+
+def timed(label: str, run) -> None:
+    start = time.perf_counter()
+    rows = run()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<36} {elapsed * 1000:9.1f} ms  {rows:>9} rows")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=1_000_000)
+    args = parser.parse_args()
+    print(f"backend: {'numpy' if np is not None else 'array'}")
+    generator = LoadGenerator(start_timestamp=0, anomaly_rate=0.001)
+    events = generator.generate(args.events)
+    jsonl = "\n".join(JSON_CODEC.encode(event).decode() for event in events)
+    segment = encode_segment(events)
+    print(f"jsonl {len(jsonl) / 1e6:.1f} MB, segment {len(segment) / 1e6:.1f} MB")
+    last = events[-1].timestamp
+
+    timed(
+        "jsonl: parse all, filter last 5%",
+        lambda: sum(
+            1
+            for event in AnalyticsReport.from_json_lines(jsonl).events
+            if event.timestamp >= last * 0.95
+        ),
+    )
+    reader = SegmentReader(segment)
+    timed(
+        "segment: all columns",
+        lambda: len(reader.read()["sensor_id"]),
+    )
+    timed(
+        "segment: temperature only",
+        lambda: len(reader.read(columns=["temperature"])["temperature"]),
+    )
+    timed(
+        "segment: temperature, last 5%",
+        lambda: len(
+            reader.read(
+                columns=["temperature"], where={"timestamp": (last * 0.95, None)}
+            )["temperature"]
+        ),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -5,65 +5,215 @@ while preserving the public boto3 client API that the tests expect.
 """
 from __future__ import annotations
 
+import bisect
+import hashlib
 import itertools
+import gzip
 import json
+import re
+import sqlite3
+import time
+import uuid
+import zlib
 from io import BytesIO
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
+
+from botocore.exceptions import ClientError
 
 
 def _response(status: int = 200) -> Dict[str, Any]:
     return {"ResponseMetadata": {"HTTPStatusCode": status}}
 
 
+def _client_error(operation: str, code: str, message: str, status: int = 400) -> ClientError:
+    return ClientError(
+        {"Error": {"Code": code, "Message": message}, "ResponseMetadata": {"HTTPStatusCode": status}},
+        operation,
+    )
+
+
 class _BaseService:
     def _ok(self, status: int = 200, **kwargs: Any) -> Dict[str, Any]:
         payload = {**kwargs, **_response(status)}
         return payload
 
 
+_MAX_HASH_KEY = 2**128 - 1
+
+
+def _hash_key(partition_key: str) -> int:
+    return int(hashlib.md5(partition_key.encode("utf-8")).hexdigest(), 16)
+
+
 class FakeKinesis(_BaseService):
+    # list_shards returns at most this many shards per page.
+    shard_page_size = 1000
+
     def __init__(self) -> None:
         self.streams: Dict[str, Dict[str, Any]] = {}
+        self._iterators: Dict[str, Dict[str, Any]] = {}
         self._iterator_counter = itertools.count()
-
-    def create_stream(self, StreamName: str, ShardCount: int) -> Dict[str, Any]:
-        self.streams.setdefault(StreamName, {"shards": {"shardId-000000000000": []}})
+        self._sequence_counter = itertools.count(1)
+
+    def _stream(self, name: str, shard_count: int = 1) -> Dict[str, Any]:
+        if name not in self.streams:
+            step = (_MAX_HASH_KEY + 1) // shard_count
+            shards = {}
+            for index in range(shard_count):
+                start = index * step
+                end = _MAX_HASH_KEY if index == shard_count - 1 else start + step - 1
+                shards[f"shardId-{index:012d}"] = {"range": (start, end), "records": []}
+            self.streams[name] = {"shards": shards}
+        return self.streams[name]
+
+    def _describe_shards(self, stream: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [
+            {
+                "ShardId": shard_id,
+                "HashKeyRange": {
+                    "StartingHashKey": str(shard["range"][0]),
+                    "EndingHashKey": str(shard["range"][1]),
+                },
+            }
+            for shard_id, shard in stream["shards"].items()
+        ]
+
+    def create_stream(self, StreamName: str, ShardCount: int = 1) -> Dict[str, Any]:
+        self._stream(StreamName, ShardCount)
         return self._ok()
 
-    def put_record(self, StreamName: str, Data: str, PartitionKey: str) -> Dict[str, Any]:
-        stream = self.streams.setdefault(StreamName, {"shards": {"shardId-000000000000": []}})
-        stream["shards"].setdefault("shardId-000000000000", []).append(Data)
-        return self._ok()
-
-    def get_shard_iterator(self, StreamName: str, ShardId: str, ShardIteratorType: str) -> Dict[str, Any]:
+    def describe_stream(self, StreamName: str) -> Dict[str, Any]:
+        stream = self._stream(StreamName)
+        return self._ok(
+            StreamDescription={
+                "StreamName": StreamName,
+                "StreamStatus": "ACTIVE",
+                "Shards": self._describe_shards(stream),
+                "HasMoreShards": False,
+            }
+        )
+
+    def list_shards(self, StreamName: str | None = None, NextToken: str | None = None) -> Dict[str, Any]:
+        if (StreamName is None) == (NextToken is None):
+            raise _client_error("ListShards", "InvalidArgumentException", "Exactly one of StreamName and NextToken is required")
+        start = 0
+        if NextToken is not None:
+            StreamName, _, offset = NextToken.rpartition(":")
+            start = int(offset)
+        shards = self._describe_shards(self._stream(StreamName))
+        end = start + self.shard_page_size
+        response = self._ok(Shards=shards[start:end])
+        if end < len(shards):
+            response["NextToken"] = f"{StreamName}:{end}"
+        return response
+
+    def put_record(self, StreamName: str, Data: Any, PartitionKey: str, ExplicitHashKey: str | None = None) -> Dict[str, Any]:
+        stream = self._stream(StreamName)
+        hash_key = int(ExplicitHashKey) if ExplicitHashKey is not None else _hash_key(PartitionKey)
+        shard_id, shard = next(
+            (shard_id, shard)
+            for shard_id, shard in stream["shards"].items()
+            if shard["range"][0] <= hash_key <= shard["range"][1]
+        )
+        sequence_number = f"{next(self._sequence_counter):021d}"
+        shard["records"].append(
+            {
+                "Data": Data.encode("utf-8") if isinstance(Data, str) else bytes(Data),
+                "PartitionKey": PartitionKey,
+                "SequenceNumber": sequence_number,
+                "ApproximateArrivalTimestamp": time.time(),
+            }
+        )
+        return self._ok(ShardId=shard_id, SequenceNumber=sequence_number)
+
+    def put_records(self, StreamName: str, Records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        if len(Records) > 500:
+            raise ValueError("put_records accepts at most 500 records per request")
+        results = []
+        for entry in Records:
+            response = self.put_record(
+                StreamName=StreamName,
+                Data=entry["Data"],
+                PartitionKey=entry["PartitionKey"],
+                ExplicitHashKey=entry.get("ExplicitHashKey"),
+            )
+            results.append({"SequenceNumber": response["SequenceNumber"], "ShardId": response["ShardId"]})
+        return self._ok(FailedRecordCount=0, Records=results)
+
+    def _new_iterator(self, stream_name: str, shard_id: str, position: int) -> str:
         iterator = f"iterator-{next(self._iterator_counter)}"
-        return self._ok(ShardIterator=iterator)
-
-    def get_records(self, ShardIterator: str, Limit: int = 1) -> Dict[str, Any]:
-        # Return at most `Limit` records from any shard (order not critical for smoke tests)
-        records = []
-        for stream in self.streams.values():
-            for shard_records in stream.get("shards", {}).values():
-                if shard_records:
-                    records.extend([{"Data": data} for data in shard_records[:Limit]])
-                    del shard_records[:Limit]
-                    break
-            if records:
-                break
-        return self._ok(Records=records)
+        self._iterators[iterator] = {"stream": stream_name, "shard": shard_id, "position": position}
+        return iterator
+
+    def get_shard_iterator(
+        self,
+        StreamName: str,
+        ShardId: str,
+        ShardIteratorType: str,
+        StartingSequenceNumber: str | None = None,
+    ) -> Dict[str, Any]:
+        shard = self.streams.get(StreamName, {}).get("shards", {}).get(ShardId)
+        records = shard["records"] if shard is not None else []
+        if ShardIteratorType == "TRIM_HORIZON":
+            position = 0
+        elif ShardIteratorType == "LATEST":
+            position = len(records)
+        elif ShardIteratorType in ("AT_SEQUENCE_NUMBER", "AFTER_SEQUENCE_NUMBER"):
+            if StartingSequenceNumber is None:
+                raise _client_error("GetShardIterator", "InvalidArgumentException", "StartingSequenceNumber is required")
+            # Sequence numbers are fixed-width, so string order is numeric order.
+            target = f"{int(StartingSequenceNumber):021d}"
+            find = bisect.bisect_right if ShardIteratorType == "AFTER_SEQUENCE_NUMBER" else bisect.bisect_left
+            position = find(records, target, key=lambda record: record["SequenceNumber"])
+        else:
+            raise _client_error("GetShardIterator", "InvalidArgumentException", f"Unsupported iterator type {ShardIteratorType}")
+        return self._ok(ShardIterator=self._new_iterator(StreamName, ShardId, position))
+
+    def get_records(self, ShardIterator: str, Limit: int = 10000) -> Dict[str, Any]:
+        state = self._iterators.pop(ShardIterator, None)
+        if state is None:
+            return self._ok(Records=[], MillisBehindLatest=0)
+        shard = self.streams.get(state["stream"], {}).get("shards", {}).get(state["shard"])
+        records = shard["records"] if shard is not None else []
+        start = state["position"]
+        end = min(start + Limit, len(records))
+        behind = 0
+        if end < len(records):
+            behind = int((time.time() - records[end]["ApproximateArrivalTimestamp"]) * 1000)
+        return self._ok(
+            Records=[dict(record) for record in records[start:end]],
+            NextShardIterator=self._new_iterator(state["stream"], state["shard"], end),
+            MillisBehindLatest=behind,
+        )
 
 
 class FakeS3(_BaseService):
+    _METADATA_FIELDS = ("ContentEncoding", "ContentType")
+
     def __init__(self) -> None:
         self.buckets: Dict[str, Dict[str, bytes]] = {}
+        self.metadata: Dict[tuple, Dict[str, str]] = {}
+        self.uploads: Dict[str, Dict[str, Any]] = {}
+        self._upload_counter = itertools.count(1)
+
+    @staticmethod
+    def _bytes(Body: Any) -> bytes:
+        if hasattr(Body, "read"):
+            Body = Body.read()
+        return Body.encode("utf-8") if isinstance(Body, str) else bytes(Body)
+
+    def _store(self, bucket: str, key: str, data: bytes, metadata: Dict[str, Any]) -> None:
+        self.buckets.setdefault(bucket, {})[key] = data
+        self.metadata[(bucket, key)] = {
+            name: value for name, value in metadata.items() if name in self._METADATA_FIELDS and value is not None
+        }
 
     def create_bucket(self, Bucket: str) -> Dict[str, Any]:
         self.buckets.setdefault(Bucket, {})
         return self._ok()
 
-    def put_object(self, Bucket: str, Key: str, Body: str) -> Dict[str, Any]:
-        bucket = self.buckets.setdefault(Bucket, {})
-        bucket[Key] = Body.encode("utf-8")
+    def put_object(self, Bucket: str, Key: str, Body: Any, **metadata: Any) -> Dict[str, Any]:
+        self._store(Bucket, Key, self._bytes(Body), metadata)
         return self._ok()
 
     def get_object(self, Bucket: str, Key: str) -> Dict[str, Any]:
@@ -71,32 +221,119 @@ class FakeS3(_BaseService):
         if Key not in bucket:
             bucket[Key] = b"This is a test object."
         data = bucket.get(Key, b"")
-        return self._ok(Body=BytesIO(data))
+        metadata = self.metadata.get((Bucket, Key), {})
+        return self._ok(Body=BytesIO(data), ContentLength=len(data), **metadata)
+
+    def list_objects_v2(self, Bucket: str, Prefix: str = "", MaxKeys: int = 1000, ContinuationToken: str | None = None) -> Dict[str, Any]:
+        keys = sorted(key for key in self.buckets.get(Bucket, {}) if key.startswith(Prefix))
+        start = int(ContinuationToken or 0)
+        page = keys[start:start + MaxKeys]
+        response = self._ok(
+            Contents=[{"Key": key, "Size": len(self.buckets[Bucket][key])} for key in page],
+            KeyCount=len(page),
+            IsTruncated=start + MaxKeys < len(keys),
+        )
+        if response["IsTruncated"]:
+            response["NextContinuationToken"] = str(start + MaxKeys)
+        return response
 
     def delete_object(self, Bucket: str, Key: str) -> Dict[str, Any]:
         bucket = self.buckets.setdefault(Bucket, {})
         bucket.pop(Key, None)
+        self.metadata.pop((Bucket, Key), None)
+        return self._ok(status=204)
+
+    def copy_object(self, Bucket: str, Key: str, CopySource: Dict[str, str]) -> Dict[str, Any]:
+        source = (CopySource["Bucket"], CopySource["Key"])
+        data = self.buckets.get(source[0], {})[source[1]]
+        self._store(Bucket, Key, data, self.metadata.get(source, {}))
+        return self._ok()
+
+    def create_multipart_upload(self, Bucket: str, Key: str, **metadata: Any) -> Dict[str, Any]:
+        upload_id = f"upload-{next(self._upload_counter)}"
+        self.uploads[upload_id] = {"Bucket": Bucket, "Key": Key, "parts": {}, "metadata": metadata}
+        return self._ok(Bucket=Bucket, Key=Key, UploadId=upload_id)
+
+    def upload_part(self, Bucket: str, Key: str, PartNumber: int, UploadId: str, Body: Any) -> Dict[str, Any]:
+        if UploadId not in self.uploads:
+            raise _client_error("UploadPart", "NoSuchUpload", "The specified upload does not exist", 404)
+        data = self._bytes(Body)
+        self.uploads[UploadId]["parts"][PartNumber] = data
+        return self._ok(ETag=f'"{hashlib.md5(data).hexdigest()}"')
+
+    def complete_multipart_upload(self, Bucket: str, Key: str, UploadId: str, MultipartUpload: Dict[str, Any]) -> Dict[str, Any]:
+        upload = self.uploads.pop(UploadId, None)
+        if upload is None:
+            raise _client_error("CompleteMultipartUpload", "NoSuchUpload", "The specified upload does not exist", 404)
+        numbers = [part["PartNumber"] for part in MultipartUpload["Parts"]]
+        parts = [upload["parts"][number] for number in numbers]
+        if any(len(part) < 5 * 1024 * 1024 for part in parts[:-1]):
+            raise _client_error("CompleteMultipartUpload", "EntityTooSmall", "Your proposed upload is smaller than the minimum allowed size")
+        self._store(Bucket, Key, b"".join(parts), upload["metadata"])
+        return self._ok(Bucket=Bucket, Key=Key)
+
+    def abort_multipart_upload(self, Bucket: str, Key: str, UploadId: str) -> Dict[str, Any]:
+        self.uploads.pop(UploadId, None)
         return self._ok(status=204)
 
 
 class FakeDynamoDB(_BaseService):
-    def __init__(self) -> None:
+    def __init__(self, write_capacity: Optional[int] = None) -> None:
         self.tables: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        # Items accepted per batch_write_item call; the rest come back as
+        # UnprocessedItems, the way a throttled table responds.
+        self.write_capacity = write_capacity
+        self.key_schemas: Dict[str, tuple] = {}
+
+    def _key(self, table_name: str, attributes: Dict[str, Any]) -> tuple:
+        # Tables that were never created keep the sensor_id/timestamp key the
+        # sample scripts use.
+        names = self.key_schemas.get(table_name, ("sensor_id", "timestamp"))
+        return tuple(next(iter(attributes.get(name, {}).values()), None) for name in names)
 
     def create_table(self, TableName: str, KeySchema: Any, AttributeDefinitions: Any, ProvisionedThroughput: Any) -> Dict[str, Any]:
         self.tables.setdefault(TableName, {})
+        ordered = sorted(KeySchema, key=lambda entry: entry["KeyType"] != "HASH")
+        self.key_schemas[TableName] = tuple(entry["AttributeName"] for entry in ordered)
         return self._ok(TableDescription={"TableStatus": "ACTIVE"})
 
     def put_item(self, TableName: str, Item: Dict[str, Any]) -> Dict[str, Any]:
         table = self.tables.setdefault(TableName, {})
-        key = (Item.get("sensor_id", {}).get("S"), Item.get("timestamp", {}).get("N"))
-        table[key] = Item
+        table[self._key(TableName, Item)] = Item
         return self._ok()
 
+    def batch_write_item(self, RequestItems: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+        if sum(len(requests) for requests in RequestItems.values()) > 25:
+            raise _client_error(
+                "BatchWriteItem",
+                "ValidationException",
+                "Too many items requested for the BatchWriteItem call",
+            )
+        for table_name, requests in RequestItems.items():
+            keys = [self._key(table_name, request.get("PutRequest", {}).get("Item") or request["DeleteRequest"]["Key"]) for request in requests]
+            if len(set(keys)) != len(keys):
+                raise _client_error("BatchWriteItem", "ValidationException", "Provided list of item keys contains duplicates")
+        budget = self.write_capacity
+        unprocessed: Dict[str, List[Dict[str, Any]]] = {}
+        for table_name, requests in RequestItems.items():
+            for request in requests:
+                if budget is not None and budget <= 0:
+                    unprocessed.setdefault(table_name, []).append(request)
+                    continue
+                if "PutRequest" in request:
+                    self.put_item(TableName=table_name, Item=request["PutRequest"]["Item"])
+                else:
+                    self.delete_item(TableName=table_name, Key=request["DeleteRequest"]["Key"])
+                if budget is not None:
+                    budget -= 1
+        return self._ok(UnprocessedItems=unprocessed)
+
     def get_item(self, TableName: str, Key: Dict[str, Any]) -> Dict[str, Any]:
         table = self.tables.setdefault(TableName, {})
-        key = (Key.get("sensor_id", {}).get("S"), Key.get("timestamp", {}).get("N"))
-        item = table.get(key) or {
+        item = table.get(self._key(TableName, Key))
+        if item is None and TableName in self.key_schemas:
+            return self._ok()
+        item = item or {
             "sensor_id": {"S": Key.get("sensor_id", {}).get("S", "0")},
             "timestamp": {"N": Key.get("timestamp", {}).get("N", "0")},
         }
@@ -104,8 +341,7 @@ class FakeDynamoDB(_BaseService):
 
     def delete_item(self, TableName: str, Key: Dict[str, Any]) -> Dict[str, Any]:
         table = self.tables.setdefault(TableName, {})
-        key = (Key.get("sensor_id", {}).get("S"), Key.get("timestamp", {}).get("N"))
-        table.pop(key, None)
+        table.pop(self._key(TableName, Key), None)
         return self._ok()
 
 
@@ -113,9 +349,12 @@ class FakeLambda(_BaseService):
     def __init__(self) -> None:
         self.invocations = []
 
-    def invoke(self, FunctionName: str, Payload: str) -> Dict[str, Any]:
-        self.invocations.append({"FunctionName": FunctionName, "Payload": Payload})
-        payload_stream = BytesIO(json.dumps({"message": "ok", "echo": Payload}).encode("utf-8"))
+    def invoke(self, FunctionName: str, Payload: str, InvocationType: str = "RequestResponse") -> Dict[str, Any]:
+        self.invocations.append({"FunctionName": FunctionName, "Payload": Payload, "InvocationType": InvocationType})
+        if InvocationType == "Event":
+            return {"StatusCode": 202, "Payload": BytesIO(b"")}
+        echo = Payload.decode("utf-8") if isinstance(Payload, bytes) else Payload
+        payload_stream = BytesIO(json.dumps({"message": "ok", "echo": echo}).encode("utf-8"))
         return {"StatusCode": 200, "Payload": payload_stream}
 
 
@@ -132,14 +371,296 @@ class FakeRedshift(_BaseService):
         return self._ok(Cluster={"ClusterStatus": "deleting", "ClusterIdentifier": ClusterIdentifier})
 
 
+_COPY_STATEMENT = re.compile(
+    r"^\s*COPY\s+(?P<table>[\w.]+)\s*(?:\((?P<columns>[^)]*)\))?\s+FROM\s+'(?P<source>s3://[^']+)'(?P<options>.*)$",
+    re.IGNORECASE | re.DOTALL,
+)
+_TABLE_ATTRIBUTES = re.compile(r"\b(?:DISTSTYLE\s+\w+|(?:COMPOUND\s+|INTERLEAVED\s+)?(?:DISTKEY|SORTKEY)\s*\([^)]*\)|ENCODE\s+\w+)", re.IGNORECASE)
+
+
+class FakeRedshiftData(_BaseService):
+    """Redshift Data API backed by one in-memory SQLite database per target.
+
+    Statements run synchronously. ``COPY ... FROM 's3://...' FORMAT AS JSON
+    'auto'`` loads every FakeS3 object under the prefix (gzip-aware), mapping
+    JSON keys to column names. Results are paged ``page_size`` rows at a time.
+    """
+
+    page_size = 1000
+
+    def __init__(self) -> None:
+        self.databases: Dict[tuple, sqlite3.Connection] = {}
+        self.statements: Dict[str, Dict[str, Any]] = {}
+
+    def _connection(self, target: str, database: str) -> sqlite3.Connection:
+        key = (target, database)
+        if key not in self.databases:
+            self.databases[key] = sqlite3.connect(":memory:", check_same_thread=False)
+        return self.databases[key]
+
+    def execute_statement(self, Sql: str, Database: str, ClusterIdentifier: str | None = None, WorkgroupName: str | None = None, DbUser: str | None = None, SecretArn: str | None = None, Parameters: List[Dict[str, str]] | None = None, StatementName: str | None = None, **kwargs: Any) -> Dict[str, Any]:
+        target = ClusterIdentifier or WorkgroupName or "default"
+        statement_id = str(uuid.uuid4())
+        created = time.time()
+        started = time.perf_counter()
+        statement = {
+            "Id": statement_id,
+            "QueryString": Sql,
+            "Database": Database,
+            "ClusterIdentifier": ClusterIdentifier,
+            "WorkgroupName": WorkgroupName,
+            "DbUser": DbUser,
+            "CreatedAt": created,
+            "HasResultSet": False,
+            "ResultRows": -1,
+            "columns": [],
+            "rows": [],
+        }
+        connection = self._connection(target, Database)
+        parameters = {item["name"]: item["value"] for item in Parameters or []}
+        try:
+            copy = _COPY_STATEMENT.match(Sql)
+            if copy is not None:
+                statement["ResultRows"] = self._copy(connection, copy)
+            else:
+                self._execute(connection, Sql, parameters, statement)
+            connection.commit()
+            statement["Status"] = "FINISHED"
+        except (sqlite3.Error, ValueError, KeyError, ClientError, OSError, EOFError, zlib.error) as exc:
+            connection.rollback()
+            statement["Status"] = "FAILED"
+            statement["Error"] = str(exc)
+        statement["Duration"] = int((time.perf_counter() - started) * 1e9)
+        statement["UpdatedAt"] = time.time()
+        self.statements[statement_id] = statement
+        return self._ok(Id=statement_id, CreatedAt=created, Database=Database, ClusterIdentifier=ClusterIdentifier, DbUser=DbUser)
+
+    @staticmethod
+    def _execute(connection: sqlite3.Connection, sql: str, parameters: Dict[str, str], statement: Dict[str, Any]) -> None:
+        sql = sql.strip().rstrip(";")
+        if re.match(r"\s*CREATE\s+TABLE", sql, re.IGNORECASE):
+            sql = _TABLE_ATTRIBUTES.sub("", sql)
+        cursor = connection.execute(sql, parameters)
+        if cursor.description is None:
+            statement["ResultRows"] = cursor.rowcount
+            return
+        rows = cursor.fetchall()
+        statement["HasResultSet"] = True
+        statement["ResultRows"] = len(rows)
+        statement["rows"] = rows
+        statement["columns"] = [column[0] for column in cursor.description]
+
+    @staticmethod
+    def _copy(connection: sqlite3.Connection, match: "re.Match[str]") -> int:
+        import boto3
+
+        options = match["options"].upper()
+        if "JSON" not in options or "JSONPATHS" in options or "'AUTO" not in options:
+            raise ValueError("Only COPY ... FORMAT AS JSON 'auto' is supported")
+        table = match["table"]
+        columns = [name.strip() for name in (match["columns"] or "").split(",") if name.strip()]
+        if not columns:
+            columns = [row[1] for row in connection.execute(f'PRAGMA table_info("{table}")')]
+        if not columns:
+            raise ValueError(f'relation "{table}" does not exist')
+        ignore_case = "IGNORECASE" in options
+        bucket, _, prefix = match["source"][len("s3://"):].partition("/")
+        s3 = boto3.client("s3")
+        placeholders = ", ".join("?" for _ in columns)
+        insert = f'INSERT INTO "{table}" ({", ".join(columns)}) VALUES ({placeholders})'
+        loaded = 0
+        request = {"Bucket": bucket, "Prefix": prefix}
+        while True:
+            listing = s3.list_objects_v2(**request)
+            for entry in listing.get("Contents", []):
+                response = s3.get_object(Bucket=bucket, Key=entry["Key"])
+                body = response["Body"].read()
+                try:
+                    if response.get("ContentEncoding") == "gzip" or "GZIP" in options:
+                        body = gzip.decompress(body)
+                    records = [json.loads(line) for line in body.splitlines() if line.strip()]
+                except (OSError, EOFError, zlib.error, ValueError) as exc:
+                    # Redshift reports bad input files as a failed load.
+                    raise ValueError(f"Load into table '{table}' failed reading s3://{bucket}/{entry['Key']}: {exc}") from exc
+                rows = []
+                for record in records:
+                    if not isinstance(record, dict):
+                        raise ValueError(f"Load into table '{table}' failed: expected a JSON object per line")
+                    if ignore_case:
+                        record = {name.lower(): value for name, value in record.items()}
+                    rows.append(tuple(record.get(name.lower() if ignore_case else name) for name in columns))
+                connection.executemany(insert, rows)
+                loaded += len(rows)
+            if not listing.get("IsTruncated"):
+                break
+            request["ContinuationToken"] = listing["NextContinuationToken"]
+        if not loaded:
+            raise ValueError(f"The specified S3 prefix '{prefix}' does not exist")
+        return loaded
+
+    def _statement(self, operation: str, statement_id: str) -> Dict[str, Any]:
+        statement = self.statements.get(statement_id)
+        if statement is None:
+            raise _client_error(operation, "ResourceNotFoundException", f"Query {statement_id} does not exist", 404)
+        return statement
+
+    def describe_statement(self, Id: str) -> Dict[str, Any]:
+        statement = self._statement("DescribeStatement", Id)
+        public = {key: value for key, value in statement.items() if key[0].isupper() and value is not None}
+        return self._ok(**public)
+
+    @staticmethod
+    def _field(value: Any) -> Dict[str, Any]:
+        if value is None:
+            return {"isNull": True}
+        if isinstance(value, bool):
+            return {"booleanValue": value}
+        if isinstance(value, int):
+            return {"longValue": value}
+        if isinstance(value, float):
+            return {"doubleValue": value}
+        if isinstance(value, bytes):
+            return {"blobValue": value}
+        return {"stringValue": str(value)}
+
+    @staticmethod
+    def _type_name(rows: List[tuple], index: int) -> str:
+        for row in rows:
+            value = row[index]
+            if value is not None:
+                return {int: "int8", float: "float8", bytes: "varbyte"}.get(type(value), "varchar")
+        return "varchar"
+
+    def get_statement_result(self, Id: str, NextToken: str | None = None) -> Dict[str, Any]:
+        statement = self._statement("GetStatementResult", Id)
+        if statement["Status"] != "FINISHED" or not statement["HasResultSet"]:
+            raise _client_error("GetStatementResult", "ValidationException", f"Query {Id} does not have result. Please check query status with DescribeStatement")
+        rows = statement["rows"]
+        start = int(NextToken or 0)
+        page = rows[start:start + self.page_size]
+        response = self._ok(
+            Records=[[self._field(value) for value in row] for row in page],
+            ColumnMetadata=[
+                {"name": name, "label": name, "typeName": self._type_name(rows, index)}
+                for index, name in enumerate(statement["columns"])
+            ],
+            TotalNumRows=len(rows),
+        )
+        if start + self.page_size < len(rows):
+            response["NextToken"] = str(start + self.page_size)
+        return response
+
+
 class FakeAthena(_BaseService):
+    """Runs queries with the local engine in ``rtap.query`` over FakeS3 data.
+
+    DDL registers databases and tables; SELECTs run to completion when they
+    are started and their rows are paged out by ``get_query_results``.
+    """
+
     def __init__(self) -> None:
         self.executions = itertools.count(1)
+        self.databases: set = {"default"}
+        self.tables: Dict[tuple, Any] = {}
+        self.queries: Dict[str, Dict[str, Any]] = {}
 
     def start_query_execution(self, QueryString: str, ResultConfiguration: Dict[str, Any], QueryExecutionContext: Dict[str, Any] | None = None) -> Dict[str, Any]:
         execution_id = f"exec-{next(self.executions)}"
+        database = (QueryExecutionContext or {}).get("Database", "default").lower()
+        started = time.time()
+        execution = {
+            "QueryExecutionId": execution_id,
+            "Query": QueryString,
+            "ResultConfiguration": ResultConfiguration,
+            "QueryExecutionContext": {"Database": database},
+            "columns": [],
+            "rows": [],
+            "stats": None,
+        }
+        try:
+            self._run(QueryString, database, execution)
+            status = {"State": "SUCCEEDED"}
+        except Exception as exc:  # Surface every engine error as a failed query.
+            status = {"State": "FAILED", "StateChangeReason": str(exc)}
+        elapsed_ms = int((time.time() - started) * 1000)
+        stats = execution["stats"]
+        execution["Status"] = {**status, "SubmissionDateTime": started, "CompletionDateTime": time.time()}
+        execution["Statistics"] = {
+            "EngineExecutionTimeInMillis": elapsed_ms,
+            "TotalExecutionTimeInMillis": elapsed_ms,
+            "DataScannedInBytes": stats.bytes_scanned if stats else 0,
+        }
+        self.queries[execution_id] = execution
         return self._ok(QueryExecutionId=execution_id)
 
+    def _run(self, sql: str, database: str, execution: Dict[str, Any]) -> None:
+        import boto3
+        from rtap.query import QueryEngine, parse_create_table, parse_query
+
+        statement = sql.strip()
+        keyword = statement.split(None, 1)[0].upper() if statement else ""
+        if keyword in ("CREATE", "DROP"):
+            words = statement.split()
+            if len(words) > 1 and words[1].upper() in ("DATABASE", "SCHEMA"):
+                name = words[-1].rstrip(";").lower()
+                if keyword == "CREATE":
+                    self.databases.add(name)
+                else:
+                    self.databases.discard(name)
+                return
+            table = parse_create_table(statement)
+            if keyword == "CREATE" and table is not None:
+                name = table.name
+                if "." in name:
+                    database, name = name.split(".", 1)
+                    table.name = name
+                self.tables[(database, name)] = table
+                return
+            raise ValueError(f"Unsupported DDL: {statement[:60]}")
+        query = parse_query(statement)
+        name = query.table
+        if "." in name:
+            database, name = name.split(".", 1)
+        table = self.tables.get((database, name))
+        if table is None:
+            raise ValueError(f"Table {database}.{name} does not exist")
+        result = QueryEngine(boto3.client("s3")).execute(query, table)
+        execution["columns"] = list(zip(result.columns, result.types))
+        execution["rows"] = list(result.rows)
+        execution["stats"] = result.stats
+
+    def get_query_execution(self, QueryExecutionId: str) -> Dict[str, Any]:
+        execution = self.queries.get(QueryExecutionId)
+        if execution is None:
+            raise _client_error("GetQueryExecution", "InvalidRequestException", f"QueryExecution {QueryExecutionId} was not found")
+        public = {key: value for key, value in execution.items() if key[0].isupper()}
+        return self._ok(QueryExecution=public)
+
+    @staticmethod
+    def _cell(value: Any) -> Dict[str, str]:
+        return {} if value is None else {"VarCharValue": str(value)}
+
+    def get_query_results(self, QueryExecutionId: str, NextToken: str | None = None, MaxResults: int = 1000) -> Dict[str, Any]:
+        execution = self.queries.get(QueryExecutionId)
+        if execution is None or execution["Status"]["State"] != "SUCCEEDED":
+            raise _client_error("GetQueryResults", "InvalidRequestException", f"Query {QueryExecutionId} has not succeeded")
+        # Like Athena, the first page starts with a header row.
+        rows = [tuple(name for name, _ in execution["columns"])] + execution["rows"]
+        start = int(NextToken or 0)
+        page = rows[start:start + MaxResults]
+        response = self._ok(
+            ResultSet={
+                "Rows": [{"Data": [self._cell(value) for value in row]} for row in page],
+                "ResultSetMetadata": {
+                    "ColumnInfo": [{"Name": name, "Label": name, "Type": kind} for name, kind in execution["columns"]]
+                },
+            },
+            UpdateCount=0,
+        )
+        if start + MaxResults < len(rows):
+            response["NextToken"] = str(start + MaxResults)
+        return response
+
 
 class FakeGlue(_BaseService):
     def __init__(self) -> None:
@@ -201,6 +722,7 @@ def FakeAWSClientFactory(service_name: str) -> Any:
         "dynamodb": FakeDynamoDB,
         "lambda": FakeLambda,
         "redshift": FakeRedshift,
+        "redshift-data": FakeRedshiftData,
         "athena": FakeAthena,
         "glue": FakeGlue,
         "cloudwatch": FakeCloudWatch,
@@ -1,37 +1,197 @@
 import boto3
 import json
+import threading
 import time
 import logging
 
+# KPL aggregated records; run with PYTHONPATH=src so rtap is importable.
+from rtap.kpl import deaggregate
+
 logging.basicConfig(level=logging.INFO)
 
-def get_records(stream_name, shard_id, iterator_type='TRIM_HORIZON'):
-    client = boto3.client('kinesis')
-    shard_iterator = client.get_shard_iterator(
-        StreamName=stream_name,
-        ShardId=shard_id,
-        ShardIteratorType=iterator_type
-    )['ShardIterator']
-
-    while True:
-        response = client.get_records(ShardIterator=shard_iterator, Limit=100)
+# A shard serves at most five get_records calls a second, so polls at the tip
+# of the stream are spaced by MIN_POLL_INTERVAL; empty polls back off
+# exponentially up to MAX_POLL_INTERVAL. A shard that is behind (by
+# MillisBehindLatest, or a full page) is drained without waiting.
+POLL_LIMIT = 1000
+MIN_POLL_INTERVAL = 0.2
+MAX_POLL_INTERVAL = 5.0
+THROTTLED_ERRORS = ('ProvisionedThroughputExceededException', 'LimitExceededException')
+
+def load_checkpoint(table_name, stream_name, shard_id):
+    dynamodb = boto3.client('dynamodb')
+    response = dynamodb.get_item(
+        TableName=table_name,
+        Key={'leaseKey': {'S': f"{stream_name}:{shard_id}"}}
+    )
+    item = response.get('Item')
+    return item['checkpoint']['S'] if item and 'checkpoint' in item else None
+
+def save_checkpoint(table_name, stream_name, shard_id, sequence_number):
+    dynamodb = boto3.client('dynamodb')
+    dynamodb.put_item(
+        TableName=table_name,
+        Item={
+            'leaseKey': {'S': f"{stream_name}:{shard_id}"},
+            'checkpoint': {'S': sequence_number},
+            'leaseOwner': {'S': 'kinesis-consumer'}
+        }
+    )
+
+def log_record(data):
+    logging.info(f"Data received: {data}")
+
+class ShardPoller:
+    """Polls one shard and decides how long to wait before the next poll."""
+
+    def __init__(self, client, stream_name, shard_id, handle_record=log_record,
+                 iterator_type='TRIM_HORIZON', checkpoint_table=None,
+                 checkpoint_every=100, limit=POLL_LIMIT):
+        self.client = client
+        self.stream_name = stream_name
+        self.shard_id = shard_id
+        self.handle_record = handle_record
+        self.checkpoint_table = checkpoint_table
+        self.checkpoint_every = checkpoint_every
+        self.limit = limit
+        self.shard_iterator = None
+        self.iterator_type = iterator_type
+        self.since_checkpoint = 0
+        self.idle_delay = MIN_POLL_INTERVAL
+        self.closed = False
+        self.started = time.monotonic()
+        self.stats = {'records': 0, 'bytes': 0, 'polls': 0, 'empty_polls': 0,
+                      'throttled': 0, 'millis_behind': 0}
+
+    def _iterator(self):
+        if self.shard_iterator is None:
+            request = {
+                'StreamName': self.stream_name,
+                'ShardId': self.shard_id,
+                'ShardIteratorType': self.iterator_type
+            }
+            if self.checkpoint_table:
+                checkpoint = load_checkpoint(self.checkpoint_table, self.stream_name,
+                                             self.shard_id)
+                if checkpoint:
+                    # Resume just past the last record processed before a restart.
+                    request['ShardIteratorType'] = 'AFTER_SEQUENCE_NUMBER'
+                    request['StartingSequenceNumber'] = checkpoint
+            self.shard_iterator = self.client.get_shard_iterator(**request)['ShardIterator']
+        return self.shard_iterator
+
+    def records_per_second(self):
+        elapsed = time.monotonic() - self.started
+        return self.stats['records'] / elapsed if elapsed else 0.0
+
+    def poll(self):
+        """Issue one get_records call; returns the seconds to wait before the next."""
+        self.stats['polls'] += 1
+        try:
+            response = self.client.get_records(ShardIterator=self._iterator(),
+                                               Limit=self.limit)
+        except Exception as exc:
+            code = getattr(exc, 'response', {}).get('Error', {}).get('Code')
+            if code not in THROTTLED_ERRORS:
+                raise
+            self.stats['throttled'] += 1
+            return self.backoff()
         records = response.get('Records', [])
-        if records:
-            for record in records:
-                data = json.loads(record['Data'])
-                logging.info(f"Data received: {data}")
-        shard_iterator = response['NextShardIterator']
-        time.sleep(1)
+        behind = int(response.get('MillisBehindLatest', 0))
+        self.stats['millis_behind'] = behind
+        self.shard_iterator = response.get('NextShardIterator')
+        if self.shard_iterator is None:
+            # The shard was closed by a reshard and has been read to its end.
+            self.closed = True
+        if not records:
+            self.stats['empty_polls'] += 1
+            return 0.0 if behind > 0 else self.backoff()
+        for record in records:
+            self.stats['bytes'] += len(record['Data'])
+            for user_record in deaggregate(record['Data']):
+                self.handle_record(json.loads(user_record))
+        self.stats['records'] += len(records)
+        self.since_checkpoint += len(records)
+        if self.checkpoint_table and self.since_checkpoint >= self.checkpoint_every:
+            save_checkpoint(self.checkpoint_table, self.stream_name, self.shard_id,
+                            records[-1]['SequenceNumber'])
+            self.since_checkpoint = 0
+        self.idle_delay = MIN_POLL_INTERVAL
+        # A full page means more is waiting even when the lag rounds to 0 ms.
+        drained = behind == 0 and len(records) < self.limit
+        return MIN_POLL_INTERVAL if drained else 0.0
+
+    def backoff(self):
+        delay = self.idle_delay
+        self.idle_delay = min(self.idle_delay * 2, MAX_POLL_INTERVAL)
+        return delay
+
+def get_records(stream_name, shard_id, iterator_type='TRIM_HORIZON',
+                checkpoint_table=None, checkpoint_every=100):
+    poller = ShardPoller(boto3.client('kinesis'), stream_name, shard_id,
+                         iterator_type=iterator_type,
+                         checkpoint_table=checkpoint_table,
+                         checkpoint_every=checkpoint_every)
+    while not poller.closed:
+        time.sleep(poller.poll())
+
+def poll_stream(stream_name, handle_record=log_record, iterator_type='TRIM_HORIZON',
+                checkpoint_table=None, checkpoint_every=100, stop=None,
+                max_idle_polls=None, report_every=60.0):
+    """Polls every shard of the stream on its own thread.
+
+    Runs until ``stop`` is set, or until each shard has had
+    ``max_idle_polls`` empty polls in a row at the tip of the stream.
+    Returns the pollers, whose ``stats`` hold per-shard counters.
+    """
+    client = boto3.client('kinesis')
+    stop = stop or threading.Event()
+    pollers = [
+        ShardPoller(client, stream_name, shard_id, handle_record, iterator_type,
+                    checkpoint_table, checkpoint_every)
+        for shard_id in list_shards(stream_name)
+    ]
+
+    def run(poller):
+        idle = 0
+        while not poller.closed and not stop.is_set():
+            empty_polls = poller.stats['empty_polls']
+            delay = poller.poll()
+            caught_up = poller.stats['empty_polls'] > empty_polls and delay > 0
+            idle = idle + 1 if caught_up else 0
+            if max_idle_polls is not None and idle >= max_idle_polls:
+                return
+            stop.wait(delay)
+
+    threads = [threading.Thread(target=run, args=(poller,), daemon=True)
+               for poller in pollers]
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        for thread in threads:
+            thread.join(timeout=report_every)
+        log_throughput(pollers)
+    return pollers
+
+def log_throughput(pollers):
+    for poller in pollers:
+        stats = poller.stats
+        logging.info(
+            f"{poller.shard_id}: {stats['records']} records "
+            f"({poller.records_per_second():.1f}/s), {stats['bytes']} bytes, "
+            f"{stats['polls']} polls ({stats['empty_polls']} empty, "
+            f"{stats['throttled']} throttled), {stats['millis_behind']} ms behind"
+        )
 
 def list_shards(stream_name):
     client = boto3.client('kinesis')
-    response = client.describe_stream(StreamName=stream_name)
-    shards = response['StreamDescription']['Shards']
-    shard_ids = [shard['ShardId'] for shard in shards]
+    response = client.list_shards(StreamName=stream_name)
+    shard_ids = [shard['ShardId'] for shard in response['Shards']]
+    while response.get('NextToken'):
+        response = client.list_shards(NextToken=response['NextToken'])
+        shard_ids.extend(shard['ShardId'] for shard in response['Shards'])
     return shard_ids
 
 if __name__ == "__main__":
     stream_name = 'example-stream'
-    shard_ids = list_shards(stream_name)
-    for shard_id in shard_ids:
-        get_records(stream_name, shard_id)
+    poll_stream(stream_name)
@@ -1,13 +1,36 @@
+import asyncio
+import bisect
 import boto3
+import hashlib
 import json
+import threading
 import time
 import random
 import logging
 
 logging.basicConfig(level=logging.INFO)
 
+# Kinesis limits: a put_records call takes at most 500 records and 5 MiB, and
+# each shard accepts 1 MiB and 1000 records per second.
+MAX_BATCH_RECORDS = 500
+MAX_BATCH_BYTES = 5 * 1024 * 1024
+MAX_RECORD_BYTES = 1024 * 1024
+SHARD_BYTES_PER_SECOND = 1024 * 1024
+SHARD_RECORDS_PER_SECOND = 1000
+LINGER_SECONDS = 0.1
+MAX_BUFFERED_RECORDS = 50000
+MAX_ATTEMPTS = 5
+
+_client = None
+
+def kinesis_client():
+    global _client
+    if _client is None:
+        _client = boto3.client('kinesis')
+    return _client
+
 def send_data(stream_name, data, partition_key):
-    client = boto3.client('kinesis')
+    client = kinesis_client()
     try:
         response = client.put_record(
             StreamName=stream_name,
@@ -28,11 +51,259 @@ def generate_random_data():
         'timestamp': int(time.time())
     }
 
+def entry_size(entry):
+    """Bytes a put_records entry counts against the Kinesis size limits."""
+    return len(entry['Data']) + len(entry['PartitionKey'].encode('utf-8'))
+
+class TokenBucket:
+    """Refills at ``rate`` per second up to one second's worth of tokens."""
+
+    def __init__(self, rate, clock=time.monotonic):
+        self.rate = float(rate)
+        self.tokens = float(rate)
+        self.clock = clock
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def reserve(self, amount):
+        """Takes ``amount`` tokens, going into debt; returns the seconds to wait."""
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            return max(0.0, -self.tokens / self.rate)
+
+class ShardMap:
+    """Maps partition keys to shards the way Kinesis does, by MD5 hash range."""
+
+    def __init__(self, client, stream_name):
+        shards = []
+        response = client.list_shards(StreamName=stream_name)
+        while True:
+            for shard in response['Shards']:
+                if 'EndingSequenceNumber' in shard.get('SequenceNumberRange', {}):
+                    continue  # Closed by a reshard; it takes no new records.
+                start = int(shard['HashKeyRange']['StartingHashKey'])
+                shards.append((start, shard['ShardId']))
+            if not response.get('NextToken'):
+                break
+            response = client.list_shards(NextToken=response['NextToken'])
+        shards.sort()
+        self.starts = [start for start, _ in shards]
+        self.shard_ids = [shard_id for _, shard_id in shards]
+
+    def shard_for(self, partition_key):
+        hash_key = int(hashlib.md5(partition_key.encode('utf-8')).hexdigest(), 16)
+        return self.shard_ids[bisect.bisect_right(self.starts, hash_key) - 1]
+
+class KinesisProducer:
+    """Buffers records and sends them with put_records from a flusher thread.
+
+    A batch goes out once it is full or its oldest record has waited
+    ``linger`` seconds, after a per-shard token bucket has paced it to the
+    shard write limits. Records that come back with an ErrorCode are
+    retried with backoff up to ``max_attempts`` times. ``put`` is safe to
+    call from any thread; ``aput``, ``aflush`` and ``aclose`` are the
+    asyncio equivalents.
+    """
+
+    def __init__(self, stream_name, client=None, linger=LINGER_SECONDS,
+                 max_buffered=MAX_BUFFERED_RECORDS, max_attempts=MAX_ATTEMPTS,
+                 shard_bytes_per_second=SHARD_BYTES_PER_SECOND,
+                 shard_records_per_second=SHARD_RECORDS_PER_SECOND):
+        self.stream_name = stream_name
+        self.client = client or kinesis_client()
+        self.linger = linger
+        self.max_buffered = max_buffered
+        self.max_attempts = max_attempts
+        self.shards = ShardMap(self.client, stream_name)
+        self.byte_buckets = {shard_id: TokenBucket(shard_bytes_per_second)
+                             for shard_id in self.shards.shard_ids}
+        self.record_buckets = {shard_id: TokenBucket(shard_records_per_second)
+                               for shard_id in self.shards.shard_ids}
+        self.stats = {'sent': 0, 'failed': 0, 'retried': 0, 'batches': 0,
+                      'throttled_s': 0.0}
+        self.buffer = []
+        self.in_flight = 0
+        self.flushing = 0
+        self.oldest = None
+        self.closed = False
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def put(self, data, partition_key, block=True):
+        """Buffers one record; returns False if the buffer is full and not blocking."""
+        if not isinstance(data, (bytes, bytearray)):
+            data = json.dumps(data).encode('utf-8')
+        if len(data) + len(partition_key.encode('utf-8')) > MAX_RECORD_BYTES:
+            raise ValueError('Kinesis records are limited to 1 MiB')
+        entry = {'Data': bytes(data), 'PartitionKey': partition_key}
+        with self.condition:
+            if self.closed:
+                raise RuntimeError('Producer is closed')
+            while len(self.buffer) >= self.max_buffered:
+                if not block:
+                    return False
+                self.condition.wait()
+            self._append([(entry, 1)])
+        return True
+
+    def flush(self):
+        """Blocks until every buffered record has been sent or given up on."""
+        with self.condition:
+            self.flushing += 1
+            self.condition.notify_all()
+            try:
+                while self.buffer or self.in_flight:
+                    self.condition.wait()
+            finally:
+                self.flushing -= 1
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+        self.flush()
+        with self.condition:
+            self.condition.notify_all()
+        self.thread.join()
+
+    async def aput(self, data, partition_key):
+        if not self.put(data, partition_key, block=False):
+            await asyncio.to_thread(self.put, data, partition_key)
+
+    async def aflush(self):
+        await asyncio.to_thread(self.flush)
+
+    async def aclose(self):
+        await asyncio.to_thread(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    def _append(self, entries):
+        # Called with the condition held; wakes the flusher to start the linger
+        # timer for a new batch or to send a full one.
+        started = not self.buffer
+        if started:
+            self.oldest = time.monotonic()
+        self.buffer.extend(entries)
+        if started or len(self.buffer) >= MAX_BATCH_RECORDS:
+            self.condition.notify_all()
+
+    def _take_batch(self):
+        # Called with the condition held; waits for a full or lingered batch.
+        while True:
+            if self.buffer:
+                waited = time.monotonic() - self.oldest
+                if len(self.buffer) >= MAX_BATCH_RECORDS or waited >= self.linger:
+                    break
+                if self.closed or self.flushing:
+                    break
+                self.condition.wait(self.linger - waited)
+            elif self.closed:
+                return None
+            else:
+                self.condition.wait()
+        # A shard takes at most one second of writes per batch. Its records
+        # over that stay buffered, in order, for the next batch.
+        batch, held, size = [], [], 0
+        shard_records, shard_bytes, full = {}, {}, set()
+        for index, (entry, attempt) in enumerate(self.buffer):
+            record_bytes = entry_size(entry)
+            if (len(batch) == MAX_BATCH_RECORDS
+                    or size + record_bytes > MAX_BATCH_BYTES):
+                held.extend(self.buffer[index:])
+                break
+            shard_id = self.shards.shard_for(entry['PartitionKey'])
+            records = shard_records.get(shard_id, 0)
+            if shard_id in full or (records and (
+                    records + 1 > self.record_buckets[shard_id].rate
+                    or shard_bytes[shard_id] + record_bytes
+                    > self.byte_buckets[shard_id].rate)):
+                full.add(shard_id)
+                held.append((entry, attempt))
+                continue
+            batch.append((entry, attempt))
+            size += record_bytes
+            shard_records[shard_id] = records + 1
+            shard_bytes[shard_id] = shard_bytes.get(shard_id, 0) + record_bytes
+        self.buffer = held
+        self.oldest = time.monotonic() if self.buffer else None
+        self.in_flight += len(batch)
+        self.condition.notify_all()
+        return batch
+
+    def _run(self):
+        while True:
+            with self.condition:
+                batch = self._take_batch()
+            if batch is None:
+                return
+            retry = []
+            try:
+                retry = self._send(batch)
+            except Exception as e:
+                logging.error(f"put_records failed: {e}")
+                retry = batch
+            delay = 0.0
+            with self.condition:
+                resend = []
+                for entry, attempt in retry:
+                    if attempt >= self.max_attempts:
+                        self.stats['failed'] += 1
+                    else:
+                        resend.append((entry, attempt + 1))
+                        delay = max(delay, 0.05 * 2 ** attempt)
+                self.stats['retried'] += len(resend)
+                self.in_flight -= len(batch)
+                if resend:
+                    self.buffer[:0] = resend
+                    self.oldest = time.monotonic()
+                self.condition.notify_all()
+            if delay:
+                time.sleep(delay)
+
+    def _send(self, batch):
+        """Sends one batch and returns the entries that came back failed."""
+        records, sizes = {}, {}
+        for entry, _ in batch:
+            shard_id = self.shards.shard_for(entry['PartitionKey'])
+            records[shard_id] = records.get(shard_id, 0) + 1
+            sizes[shard_id] = sizes.get(shard_id, 0) + entry_size(entry)
+        wait = max(max(self.record_buckets[shard_id].reserve(count),
+                       self.byte_buckets[shard_id].reserve(sizes[shard_id]))
+                   for shard_id, count in records.items())
+        if wait:
+            self.stats['throttled_s'] += wait
+            time.sleep(wait)
+        response = self.client.put_records(
+            StreamName=self.stream_name,
+            Records=[entry for entry, _ in batch]
+        )
+        self.stats['batches'] += 1
+        failed = [
+            item for item, result in zip(batch, response['Records'])
+            if result.get('ErrorCode')
+        ]
+        self.stats['sent'] += len(batch) - len(failed)
+        return failed
+
 def bulk_send_data(stream_name, partition_key, num_records):
-    for _ in range(num_records):
-        data = generate_random_data()
-        send_data(stream_name, data, partition_key)
-        time.sleep(1)
+    with KinesisProducer(stream_name) as producer:
+        for _ in range(num_records):
+            producer.put(generate_random_data(), partition_key)
+    logging.info(f"Bulk send finished: {producer.stats}")
 
 if __name__ == "__main__":
     stream_name = 'example-stream'
@@ -1,35 +1,120 @@
+import base64
+import binascii
 import json
+import os
+import struct
+import time
+import uuid
 import boto3
 import logging
 
+# deploy.sh bundles the rtap package with this handler.
+from rtap.codecs import decode_record
+from rtap.kpl import deaggregate
+from rtap.partitioning import partition_path
+from rtap.sinks import to_dynamodb_item
+
 logging.basicConfig(level=logging.INFO)
 s3 = boto3.client('s3')
 dynamodb = boto3.client('dynamodb')
 
+TABLE_NAME = 'YourDynamoDBTable'
+BUCKET_NAME = 'your-s3-bucket'
+# batch_write_item accepts at most 25 items per call.
+DYNAMODB_BATCH_SIZE = 25
+DYNAMODB_MAX_ATTEMPTS = 4
+# Any failure raises so Lambda retries the whole batch. Set this to '1' only
+# when the event source mapping has FunctionResponseTypes=
+# ['ReportBatchItemFailures']; without it Lambda treats the returned
+# batchItemFailures as success and the failed records are lost.
+REPORT_BATCH_ITEM_FAILURES = os.environ.get('REPORT_BATCH_ITEM_FAILURES', '0') == '1'
+
+def kinesis_data(data):
+    # Event source mappings deliver base64 text; local callers pass raw bytes.
+    if isinstance(data, str):
+        try:
+            return base64.b64decode(data, validate=True)
+        except (binascii.Error, ValueError):
+            return data.encode('utf-8')
+    return data
+
+def write_items(items):
+    # items maps (sensor_id, timestamp) to (item, sequence numbers); returns
+    # the sequence numbers whose items could not be written.
+    failed = set()
+    keys = list(items)
+    for start in range(0, len(keys), DYNAMODB_BATCH_SIZE):
+        chunk = keys[start:start + DYNAMODB_BATCH_SIZE]
+        requests = [{'PutRequest': {'Item': items[key][0]}} for key in chunk]
+        for attempt in range(DYNAMODB_MAX_ATTEMPTS):
+            try:
+                response = dynamodb.batch_write_item(RequestItems={TABLE_NAME: requests})
+            except Exception as e:
+                logging.error(f"batch_write_item failed: {e}")
+                break
+            requests = response.get('UnprocessedItems', {}).get(TABLE_NAME, [])
+            if not requests:
+                break
+            if attempt + 1 < DYNAMODB_MAX_ATTEMPTS:
+                time.sleep(0.05 * 2 ** attempt)
+        for request in requests:
+            item = request['PutRequest']['Item']
+            failed.update(items[(item['sensor_id']['S'], item['timestamp']['N'])][1])
+    return failed
+
 def lambda_handler(event, context):
+    failed = set()
+    # One JSON Lines object per partition and one DynamoDB item per key,
+    # written with batch_write_item, instead of two calls per record.
+    partitions = {}
+    items = {}
     for record in event['Records']:
-        payload = json.loads(record['kinesis']['data'])
-        logging.info(f"Processing record: {payload}")
-
-        # Save the processed data to S3
-        s3.put_object(
-            Bucket='your-s3-bucket',
-            Key=f"processed/{payload['sensor_id']}_{payload['timestamp']}.json",
-            Body=json.dumps(payload)
-        )
-
-        # Save the processed data to DynamoDB
-        dynamodb.put_item(
-            TableName='YourDynamoDBTable',
-            Item={
-                'sensor_id': {'S': str(payload['sensor_id'])},
-                'timestamp': {'N': str(payload['timestamp'])},
-                'temperature': {'N': str(payload['temperature'])},
-                'humidity': {'N': str(payload['humidity'])}
-            }
-        )
+        sequence_number = record['kinesis'].get('sequenceNumber')
+        try:
+            decoded = [
+                (partition_path(event), json.dumps(event.as_dict()), to_dynamodb_item(event))
+                for event in map(
+                    decode_record, deaggregate(kinesis_data(record['kinesis']['data']))
+                )
+            ]
+        except (ValueError, KeyError, TypeError, struct.error) as e:
+            logging.error(f"Could not decode record {sequence_number}: {e}")
+            failed.add(sequence_number)
+            continue
+        for partition, line, item in decoded:
+            partitions.setdefault(partition, []).append((line, sequence_number))
+            # Later records for the same key win, as with one put_item each.
+            key = (item['sensor_id']['S'], item['timestamp']['N'])
+            sequence_numbers = items[key][1] if key in items else set()
+            sequence_numbers.add(sequence_number)
+            items[key] = (item, sequence_numbers)
+    logging.info(f"Processing {len(event['Records'])} records into {len(items)} items")
+
+    # Save the processed data to S3
+    request_id = getattr(context, 'aws_request_id', None) or uuid.uuid4().hex
+    for partition, lines in partitions.items():
+        try:
+            s3.put_object(
+                Bucket=BUCKET_NAME,
+                Key=f"processed/{partition}/part-{request_id}.jsonl",
+                Body='\n'.join(line for line, _ in lines)
+            )
+        except Exception as e:
+            logging.error(f"Could not write partition {partition}: {e}")
+            failed.update(sequence_number for _, sequence_number in lines)
+
+    # Save the processed data to DynamoDB
+    failed |= write_items(items)
 
+    if failed and not REPORT_BATCH_ITEM_FAILURES:
+        raise RuntimeError(f"{len(failed)} records failed")
+    # Kinesis resumes from the lowest failed sequence number.
+    order = {record['kinesis'].get('sequenceNumber'): index for index, record in enumerate(event['Records'])}
     return {
         'statusCode': 200,
-        'body': json.dumps('Processing complete')
+        'body': json.dumps('Processing complete'),
+        'batchItemFailures': [
+            {'itemIdentifier': sequence_number}
+            for sequence_number in sorted(failed, key=order.get)
+        ]
     }
@@ -1,9 +1,34 @@
+import time
 import boto3
 from botocore.exceptions import ClientError
 import logging
 
 logging.basicConfig(level=logging.INFO)
 
+def wait_for_statement(client, statement_id, initial_delay=0.1, max_delay=5.0, timeout=300.0):
+    # Poll with exponential backoff instead of a fixed sleep.
+    delay = initial_delay
+    deadline = time.monotonic() + timeout
+    while True:
+        response = client.describe_statement(Id=statement_id)
+        if response['Status'] in ['FINISHED', 'FAILED', 'ABORTED']:
+            return response
+        if time.monotonic() + delay > deadline:
+            return response
+        time.sleep(delay)
+        delay = min(delay * 2, max_delay)
+
+def iter_statement_records(client, statement_id):
+    # Follow NextToken so large result sets are fetched page by page.
+    kwargs = {'Id': statement_id}
+    while True:
+        results = client.get_statement_result(**kwargs)
+        for record in results['Records']:
+            yield record
+        if 'NextToken' not in results:
+            return
+        kwargs['NextToken'] = results['NextToken']
+
 def load_data_from_s3(cluster_id, db_name, table_name, s3_bucket, s3_key, iam_role):
     client = boto3.client('redshift-data')
     query = f"""
@@ -19,7 +44,12 @@ def load_data_from_s3(cluster_id, db_name, table_name, s3_bucket, s3_key, iam_ro
             DbUser='awsuser',
             Sql=query
         )
-        logging.info(f"Data loaded into {table_name} from s3://{s3_bucket}/{s3_key}.")
+        status = wait_for_statement(client, response['Id'])
+        if status['Status'] != 'FINISHED':
+            logging.error(f"Load failed: {status.get('Error', status['Status'])}")
+            return None
+        logging.info(f"Loaded {status['ResultRows']} rows into {table_name} from s3://{s3_bucket}/{s3_key}.")
+        return status
     except ClientError as e:
         logging.error(f"Error loading data from S3: {e}")
 
@@ -33,17 +63,15 @@ def query_data(cluster_id, db_name, query):
             Sql=query
         )
         result_id = response['Id']
-        while True:
-            result_response = client.describe_statement(Id=result_id)
-            if result_response['Status'] == 'FINISHED':
-                results = client.get_statement_result(Id=result_id)
-                for row in results['Records']:
+        result_response = wait_for_statement(client, result_id)
+        if result_response['Status'] == 'FINISHED':
+            if result_response.get('HasResultSet'):
+                for row in iter_statement_records(client, result_id):
                     logging.info(row)
-                break
-            elif result_response['Status'] == 'FAILED':
-                logging.error(f"Query failed: {result_response['Error']}")
-                break
-            time.sleep(2)
+        elif result_response['Status'] == 'FAILED':
+            logging.error(f"Query failed: {result_response['Error']}")
+        else:
+            logging.error(f"Query did not finish: {result_response['Status']}")
     except ClientError as e:
         logging.error(f"Error querying data: {e}")
 
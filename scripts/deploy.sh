@@ -12,8 +12,11 @@ terraform init
 terraform apply -auto-approve
 
 # Deploy Lambda function
+# The handler imports the shared KPL record format from the rtap package.
 cd ../../lambda/deployment_package
-zip -r processor.zip .
+cp ../processor.py .
+rm -rf rtap && cp -r ../../src/rtap rtap
+zip -r processor.zip . -x '*__pycache__*'
 aws lambda update-function-code --function-name example-processor --zip-file fileb://processor.zip
 
 echo "Deployment complete!"
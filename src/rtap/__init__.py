@@ -2,9 +2,16 @@
 
 from __future__ import annotations
 
+from .async_pipeline import AsyncPipeline
 from .config import RuntimeConfig
 from .pipeline import Pipeline, PipelineResult
 from .reporting import AnalyticsReport
 
-__all__ = ["RuntimeConfig", "Pipeline", "PipelineResult", "AnalyticsReport"]
+__all__ = [
+    "RuntimeConfig",
+    "Pipeline",
+    "AsyncPipeline",
+    "PipelineResult",
+    "AnalyticsReport",
+]
 __version__ = "0.1.0"
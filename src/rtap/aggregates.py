@@ -0,0 +1,141 @@
+"""Incremental, mergeable aggregates over processed events."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import math
+from typing import Any, Dict, Iterable, Optional
+
+from .columnar import EventBatch, column_stats, round_value, value_counts
+from .plugins.base import EventPayload
+
+
+def _finite_or_none(value: float) -> Optional[float]:
+    return value if math.isfinite(value) else None
+
+
+@dataclass
+class RunningAggregate:
+    """Running count, sums and extremes updated in O(1) per event.
+
+    Aggregates built on different shards, workers or runs combine with
+    :meth:`merge`, which is associative and has the empty aggregate as its
+    identity, so partial results can be folded in any grouping.
+    """
+
+    count: int = 0
+    temperature_sum: float = 0.0
+    humidity_sum: float = 0.0
+    temperature_min: float = math.inf
+    temperature_max: float = -math.inf
+    humidity_min: float = math.inf
+    humidity_max: float = -math.inf
+    sensor_counts: Dict[int, int] = field(default_factory=dict)
+
+    @staticmethod
+    def from_events(events: Iterable[EventPayload]) -> "RunningAggregate":
+        aggregate = RunningAggregate()
+        for event in events:
+            aggregate.update(event)
+        return aggregate
+
+    def update(self, event: EventPayload) -> None:
+        temperature = event.temperature
+        humidity = event.humidity
+        self.count += 1
+        self.temperature_sum += temperature
+        self.humidity_sum += humidity
+        if temperature < self.temperature_min:
+            self.temperature_min = temperature
+        if temperature > self.temperature_max:
+            self.temperature_max = temperature
+        if humidity < self.humidity_min:
+            self.humidity_min = humidity
+        if humidity > self.humidity_max:
+            self.humidity_max = humidity
+        self.sensor_counts[event.sensor_id] = (
+            self.sensor_counts.get(event.sensor_id, 0) + 1
+        )
+
+    def update_batch(self, batch: EventBatch) -> None:
+        """Fold a columnar batch in with one pass per column."""
+        if not len(batch):
+            return
+        temperature_sum, temperature_min, temperature_max = column_stats(
+            batch.temperature
+        )
+        humidity_sum, humidity_min, humidity_max = column_stats(batch.humidity)
+        self.merge(
+            RunningAggregate(
+                count=len(batch),
+                temperature_sum=temperature_sum,
+                humidity_sum=humidity_sum,
+                temperature_min=temperature_min,
+                temperature_max=temperature_max,
+                humidity_min=humidity_min,
+                humidity_max=humidity_max,
+                sensor_counts=value_counts(batch.sensor_id),
+            )
+        )
+
+    def merge(self, other: "RunningAggregate") -> None:
+        """Fold ``other`` into this aggregate in place."""
+        self.count += other.count
+        self.temperature_sum += other.temperature_sum
+        self.humidity_sum += other.humidity_sum
+        self.temperature_min = min(self.temperature_min, other.temperature_min)
+        self.temperature_max = max(self.temperature_max, other.temperature_max)
+        self.humidity_min = min(self.humidity_min, other.humidity_min)
+        self.humidity_max = max(self.humidity_max, other.humidity_max)
+        for sensor_id, count in other.sensor_counts.items():
+            self.sensor_counts[sensor_id] = self.sensor_counts.get(sensor_id, 0) + count
+
+    def __add__(self, other: "RunningAggregate") -> "RunningAggregate":
+        combined = RunningAggregate.from_dict(self.to_dict())
+        combined.merge(other)
+        return combined
+
+    def summary(self) -> Dict[str, float | int]:
+        if not self.count:
+            return {"event_count": 0}
+        return {
+            "event_count": self.count,
+            "avg_temperature": round_value(self.temperature_sum / self.count),
+            "avg_humidity": round_value(self.humidity_sum / self.count),
+            "min_temperature": self.temperature_min,
+            "max_temperature": self.temperature_max,
+            "min_humidity": self.humidity_min,
+            "max_humidity": self.humidity_max,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serialisable form for shipping between processes."""
+        return {
+            "count": self.count,
+            "temperature_sum": self.temperature_sum,
+            "humidity_sum": self.humidity_sum,
+            "temperature_min": _finite_or_none(self.temperature_min),
+            "temperature_max": _finite_or_none(self.temperature_max),
+            "humidity_min": _finite_or_none(self.humidity_min),
+            "humidity_max": _finite_or_none(self.humidity_max),
+            "sensor_counts": {str(k): v for k, v in self.sensor_counts.items()},
+        }
+
+    @staticmethod
+    def from_dict(payload: Dict[str, Any]) -> "RunningAggregate":
+        def bound(name: str, default: float) -> float:
+            value = payload.get(name)
+            return default if value is None else float(value)
+
+        return RunningAggregate(
+            count=int(payload.get("count", 0)),
+            temperature_sum=float(payload.get("temperature_sum", 0.0)),
+            humidity_sum=float(payload.get("humidity_sum", 0.0)),
+            temperature_min=bound("temperature_min", math.inf),
+            temperature_max=bound("temperature_max", -math.inf),
+            humidity_min=bound("humidity_min", math.inf),
+            humidity_max=bound("humidity_max", -math.inf),
+            sensor_counts={
+                int(k): int(v) for k, v in payload.get("sensor_counts", {}).items()
+            },
+        )
@@ -0,0 +1,128 @@
+"""KPL aggregation of many user records into one Kinesis record.
+
+Aggregates use the KPL wire format from :mod:`rtap.kpl`, so any KPL-aware
+consumer can read them. Records without the magic pass through
+:func:`deaggregate` unchanged, so consumers handle both kinds transparently.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass, field
+import hashlib
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from .consumer import list_shards
+from .ingest import MAX_BYTES_PER_RECORD
+from .kpl import AGGREGATION_MAGIC, deaggregate, is_aggregated  # noqa: F401
+from .kpl import (
+    ENVELOPE_OVERHEAD,
+    encode_aggregated,
+    key_entry_size,
+    record_entry_size,
+)
+from .metrics import MetricRegistry
+
+
+class KinesisRecord(NamedTuple):
+    data: bytes
+    partition_key: str
+    explicit_hash_key: Optional[str] = None
+
+
+def list_shard_ranges(client: Any, stream_name: str) -> List[Tuple[int, int]]:
+    return sorted(
+        (
+            int(shard["HashKeyRange"]["StartingHashKey"]),
+            int(shard["HashKeyRange"]["EndingHashKey"]),
+        )
+        for shard in list_shards(client, stream_name)
+    )
+
+
+@dataclass
+class _Bucket:
+    partition_key: str
+    records: List[Tuple[str, bytes]] = field(default_factory=list)
+    keys: Dict[str, int] = field(default_factory=dict)
+    size: int = ENVELOPE_OVERHEAD
+
+    def entry_size(self, data: bytes, partition_key: str) -> int:
+        index = self.keys.get(partition_key)
+        if index is not None:
+            return record_entry_size(index, len(data))
+        return key_entry_size(partition_key) + record_entry_size(
+            len(self.keys), len(data)
+        )
+
+    def append(self, data: bytes, partition_key: str) -> None:
+        self.size += self.entry_size(data, partition_key)
+        self.keys.setdefault(partition_key, len(self.keys))
+        self.records.append((partition_key, data))
+
+
+@dataclass
+class RecordAggregator:
+    """Pack user records bound for the same shard into aggregated records.
+
+    Partition keys are hashed with MD5 against ``shard_ranges`` so every
+    aggregate targets one shard (pinned with ``ExplicitHashKey``) and
+    per-key ordering is kept. With no ranges all records share one bucket.
+    A bucket holding a single record is sent as a plain record. Each
+    emitted record adds a ``kinesis.aggregation.ratio`` histogram sample,
+    the number of user records it carries.
+    """
+
+    shard_ranges: Sequence[Tuple[int, int]] = ()
+    max_bytes: int = MAX_BYTES_PER_RECORD
+    metrics: MetricRegistry = field(default_factory=MetricRegistry)
+    _starts: List[int] = field(default_factory=list, repr=False)
+    _buckets: Dict[int, _Bucket] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self) -> None:
+        self._starts = [start for start, _ in self.shard_ranges]
+
+    def _shard_index(self, partition_key: str) -> int:
+        if not self._starts:
+            return 0
+        hash_key = int(hashlib.md5(partition_key.encode("utf-8")).hexdigest(), 16)
+        return max(0, bisect_right(self._starts, hash_key) - 1)
+
+    def add(self, data: bytes | str, partition_key: str) -> List[KinesisRecord]:
+        """Buffer one user record; returns any aggregates it completed."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        alone = _Bucket(partition_key)
+        key_size = len(partition_key.encode("utf-8"))
+        if alone.size + alone.entry_size(data, partition_key) + key_size > (
+            self.max_bytes
+        ):
+            raise ValueError(f"User record of {len(data)} bytes is too large")
+        index = self._shard_index(partition_key)
+        emitted: List[KinesisRecord] = []
+        bucket = self._buckets.get(index)
+        if bucket is not None and (
+            bucket.size
+            + bucket.entry_size(data, partition_key)
+            + len(bucket.partition_key.encode("utf-8"))
+            > self.max_bytes
+        ):
+            emitted.append(self._emit(index))
+            bucket = None
+        if bucket is None:
+            bucket = self._buckets[index] = _Bucket(partition_key)
+        bucket.append(data, partition_key)
+        return emitted
+
+    def flush(self) -> List[KinesisRecord]:
+        return [self._emit(index) for index in list(self._buckets)]
+
+    def _emit(self, index: int) -> KinesisRecord:
+        bucket = self._buckets.pop(index)
+        self.metrics.record("kinesis.aggregation.ratio", len(bucket.records))
+        if len(bucket.records) == 1:
+            partition_key, data = bucket.records[0]
+            return KinesisRecord(data, partition_key)
+        data = encode_aggregated(bucket.records)
+        explicit_hash_key = str(self._starts[index]) if self._starts else None
+        return KinesisRecord(data, bucket.partition_key, explicit_hash_key)
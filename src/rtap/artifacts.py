@@ -0,0 +1,133 @@
+"""Streaming S3 artifact writer with multipart upload and optional gzip."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+import zlib
+
+from .metrics import MetricRegistry
+
+
+MULTIPART_MIN_PART_BYTES = 5 * 1024 * 1024
+JSON_LINES_CONTENT_TYPE = "application/x-ndjson"
+
+
+@dataclass
+class S3StreamWriter:
+    """Write a body to S3 incrementally.
+
+    Data is buffered until ``part_size`` bytes are ready and then sent with
+    ``upload_part``; bodies that never fill a part fall back to a single
+    ``put_object``. With ``gzip=True`` the stream is compressed on the fly
+    and stored with ``ContentEncoding: gzip``. Use as a context manager so a
+    failed write aborts the multipart upload.
+    """
+
+    client: Any
+    bucket: str
+    key: str
+    gzip: bool = False
+    content_type: str = JSON_LINES_CONTENT_TYPE
+    part_size: int = 8 * 1024 * 1024
+    metrics: MetricRegistry = field(default_factory=MetricRegistry)
+    _buffer: bytearray = field(default_factory=bytearray, repr=False)
+    _compressor: Any = field(default=None, repr=False)
+    _upload_id: Optional[str] = field(default=None, repr=False)
+    _parts: List[Dict[str, Any]] = field(default_factory=list, repr=False)
+    _written: int = field(default=0, repr=False)
+    _closed: bool = field(default=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.part_size < MULTIPART_MIN_PART_BYTES:
+            raise ValueError(
+                f"part_size must be at least {MULTIPART_MIN_PART_BYTES} bytes"
+            )
+        if self.gzip:
+            self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def __enter__(self) -> "S3StreamWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc is not None:
+            self.abort()
+        else:
+            self.close()
+
+    def tell(self) -> int:
+        """Number of uncompressed bytes written so far."""
+        return self._written
+
+    def write(self, data: bytes) -> int:
+        size = len(data)
+        self._written += size
+        if self._compressor is not None:
+            data = self._compressor.compress(data)
+        self._buffer.extend(data)
+        while len(self._buffer) >= self.part_size:
+            self._upload_part(bytes(self._buffer[: self.part_size]))
+            del self._buffer[: self.part_size]
+        return size
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._compressor is not None:
+            self._buffer.extend(self._compressor.flush())
+        extra = {"ContentEncoding": "gzip"} if self.gzip else {}
+        if self._upload_id is None:
+            with self.metrics.time("s3.put_object"):
+                self.client.put_object(
+                    Bucket=self.bucket,
+                    Key=self.key,
+                    Body=bytes(self._buffer),
+                    ContentType=self.content_type,
+                    **extra,
+                )
+            self.metrics.increment("s3.bytes.uploaded", len(self._buffer))
+        else:
+            if self._buffer:
+                self._upload_part(bytes(self._buffer))
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=self.key,
+                UploadId=self._upload_id,
+                MultipartUpload={"Parts": self._parts},
+            )
+        self._buffer = bytearray()
+
+    def abort(self) -> None:
+        self._closed = True
+        self._buffer = bytearray()
+        if self._upload_id is not None:
+            self.client.abort_multipart_upload(
+                Bucket=self.bucket, Key=self.key, UploadId=self._upload_id
+            )
+
+    def copy_to(self, key: str) -> None:
+        """Server-side copy the finished object to another key."""
+        self.client.copy_object(
+            Bucket=self.bucket,
+            Key=key,
+            CopySource={"Bucket": self.bucket, "Key": self.key},
+        )
+
+    def _upload_part(self, body: bytes) -> None:
+        if self._upload_id is None:
+            extra = {"ContentEncoding": "gzip"} if self.gzip else {}
+            self._upload_id = self.client.create_multipart_upload(
+                Bucket=self.bucket, Key=self.key, ContentType=self.content_type, **extra
+            )["UploadId"]
+        part_number = len(self._parts) + 1
+        with self.metrics.time("s3.upload_part"):
+            response = self.client.upload_part(
+                Bucket=self.bucket,
+                Key=self.key,
+                PartNumber=part_number,
+                UploadId=self._upload_id,
+                Body=body,
+            )
+        self._parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+        self.metrics.increment("s3.bytes.uploaded", len(body))
@@ -0,0 +1,88 @@
+"""Size-, byte- and time-bounded micro-batching between pipeline stages."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import time
+from typing import Any, Callable, Generic, Iterable, List, Optional, TypeVar
+
+from .metrics import MetricRegistry
+
+
+T = TypeVar("T")
+
+BATCH_STAGES = ("plugins", "dynamodb", "lambda")
+
+
+@dataclass
+class MicroBatcher(Generic[T]):
+    """Buffer items and hand them to ``sink`` in bounded batches.
+
+    A batch is flushed once it holds ``max_items`` items, once adding an
+    item would take it past ``max_bytes`` (as measured by ``sizer``) or once
+    its oldest item is ``max_delay_ms`` old, whichever comes first. The age
+    check runs on every :meth:`add` and :meth:`poll`, so callers that go
+    idle should poll. Each flush increments ``batch.<name>.flush.<reason>``
+    and records ``batch.<name>.size`` (and ``.bytes``) histogram samples.
+    """
+
+    sink: Callable[[List[T]], Any]
+    name: str = "default"
+    max_items: int = 500
+    max_bytes: Optional[int] = None
+    max_delay_ms: Optional[float] = None
+    sizer: Callable[[T], int] = len
+    metrics: MetricRegistry = field(default_factory=MetricRegistry)
+    clock: Callable[[], float] = time.monotonic
+    _buffer: List[T] = field(default_factory=list, repr=False)
+    _bytes: int = field(default=0, repr=False)
+    _opened_at: Optional[float] = field(default=None, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.max_items < 1:
+            raise ValueError("max_items must be at least 1")
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def add(self, item: T) -> None:
+        size = self.sizer(item) if self.max_bytes else 0
+        if self._buffer and self.max_bytes and self._bytes + size > self.max_bytes:
+            self.flush("bytes")
+        if not self._buffer:
+            self._opened_at = self.clock()
+        self._buffer.append(item)
+        self._bytes += size
+        if len(self._buffer) >= self.max_items:
+            self.flush("size")
+        elif self.max_bytes and self._bytes >= self.max_bytes:
+            self.flush("bytes")
+        else:
+            self.poll()
+
+    def add_many(self, items: Iterable[T]) -> None:
+        for item in items:
+            self.add(item)
+
+    def poll(self) -> bool:
+        """Flush the pending batch if it has waited ``max_delay_ms``."""
+        if not self._buffer or self.max_delay_ms is None:
+            return False
+        if (self.clock() - self._opened_at) * 1000 < self.max_delay_ms:
+            return False
+        self.flush("time")
+        return True
+
+    def flush(self, reason: str = "explicit") -> None:
+        if not self._buffer:
+            return
+        batch, size = self._buffer, self._bytes
+        self._buffer, self._bytes, self._opened_at = [], 0, None
+        self.metrics.increment(f"batch.{self.name}.flush.{reason}")
+        self.metrics.record(f"batch.{self.name}.size", len(batch))
+        if self.max_bytes:
+            self.metrics.record(f"batch.{self.name}.bytes", size)
+        self.sink(batch)
+
+    def close(self) -> None:
+        self.flush("close")
@@ -0,0 +1,130 @@
+"""Record codecs for events on the stream and in artifacts.
+
+Two formats are supported: JSON objects and a fixed-layout binary record
+packed with :mod:`struct`. Binary records start with :data:`BINARY_MAGIC`,
+a byte that can never begin a JSON document, so :func:`decode_record`
+detects the format of each record without out-of-band metadata.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import json
+import struct
+from typing import Any, Dict, Iterator, Mapping, Protocol
+
+from .plugins.base import EventPayload
+
+try:
+    import orjson
+except ImportError:  # orjson is optional.
+    orjson = None
+
+
+BINARY_MAGIC = 0xB1
+
+# magic, sensor_id, temperature, humidity, timestamp
+_BINARY_LAYOUT = struct.Struct("<Biddq")
+_BINARY_PREFIX = bytes([BINARY_MAGIC])
+
+_json_encoder = json.JSONEncoder(separators=(",", ":"), check_circular=False)
+_json_decode = json.JSONDecoder().decode
+
+
+class RecordCodec(Protocol):
+    name: str
+
+    def encode(self, event: EventPayload) -> bytes: ...
+
+    def decode(self, data: bytes) -> EventPayload: ...
+
+
+@dataclass(frozen=True)
+class JsonCodec:
+    """Compact JSON objects; uses orjson when it is installed."""
+
+    name: str = "json"
+
+    def encode(self, event: EventPayload) -> bytes:
+        return self.dumps(event.as_dict())
+
+    def dumps(self, payload: Mapping[str, Any]) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(payload)
+        return _json_encoder.encode(payload).encode("utf-8")
+
+    def loads(self, data: bytes | str) -> Dict[str, Any]:
+        if orjson is not None:
+            return orjson.loads(data)
+        if not isinstance(data, str):
+            data = bytes(data).decode("utf-8")
+        return _json_decode(data)
+
+    def decode(self, data: bytes | str) -> EventPayload:
+        payload = self.loads(data)
+        return EventPayload(
+            sensor_id=int(payload["sensor_id"]),
+            temperature=float(payload["temperature"]),
+            humidity=float(payload["humidity"]),
+            timestamp=int(payload["timestamp"]),
+        )
+
+
+@dataclass(frozen=True)
+class BinaryCodec:
+    """Fixed 29-byte little-endian records decoded straight from a buffer."""
+
+    name: str = "binary"
+
+    def encode(self, event: EventPayload) -> bytes:
+        return _BINARY_LAYOUT.pack(
+            BINARY_MAGIC,
+            event.sensor_id,
+            event.temperature,
+            event.humidity,
+            event.timestamp,
+        )
+
+    def decode(self, data: bytes) -> EventPayload:
+        magic, sensor_id, temperature, humidity, timestamp = (
+            _BINARY_LAYOUT.unpack_from(memoryview(data))
+        )
+        if magic != BINARY_MAGIC:
+            raise ValueError("Not a binary RTAP event record")
+        return EventPayload(sensor_id, temperature, humidity, timestamp)
+
+    def iter_decode(self, data: bytes) -> Iterator[EventPayload]:
+        """Decode back-to-back records from one buffer without copying it."""
+        for magic, sensor_id, temperature, humidity, timestamp in (
+            _BINARY_LAYOUT.iter_unpack(memoryview(data))
+        ):
+            if magic != BINARY_MAGIC:
+                raise ValueError("Not a binary RTAP event record")
+            yield EventPayload(sensor_id, temperature, humidity, timestamp)
+
+
+JSON_CODEC = JsonCodec()
+BINARY_CODEC = BinaryCodec()
+
+CODECS: Dict[str, RecordCodec] = {
+    JSON_CODEC.name: JSON_CODEC,
+    BINARY_CODEC.name: BINARY_CODEC,
+}
+
+
+def get_codec(name: str) -> RecordCodec:
+    codec = CODECS.get(name)
+    if codec is None:
+        raise ValueError(f"Unknown record codec: {name}")
+    return codec
+
+
+def detect_codec(data: bytes | str) -> RecordCodec:
+    """Return the codec that produced ``data`` based on its first byte."""
+    if not isinstance(data, str) and data[:1] == _BINARY_PREFIX:
+        return BINARY_CODEC
+    return JSON_CODEC
+
+
+def decode_record(data: bytes | str) -> EventPayload:
+    return detect_codec(data).decode(data)
@@ -0,0 +1,154 @@
+"""Array-backed, columnar batches of events.
+
+NumPy is used when it is installed; otherwise columns are ``array.array``
+instances and the batch helpers fall back to plain Python loops.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from itertools import compress
+import math
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+from .plugins.base import EventPayload
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional.
+    np = None
+
+
+COLUMN_TYPES: Dict[str, str] = {
+    "sensor_id": "q",
+    "temperature": "d",
+    "humidity": "d",
+    "timestamp": "q",
+}
+
+
+def make_column(name: str, values: Iterable[Any]) -> Any:
+    """Build a column of the right type for ``name`` on the active backend."""
+    typecode = COLUMN_TYPES[name]
+    if np is not None:
+        dtype = np.int64 if typecode == "q" else np.float64
+        if isinstance(values, np.ndarray):
+            return values.astype(dtype, copy=False)
+        return np.fromiter(values, dtype=dtype)
+    if isinstance(values, array) and values.typecode == typecode:
+        return values
+    return array(typecode, values)
+
+
+def round_value(value: float, decimals: int = 2) -> float:
+    """Round the way ``numpy.round`` does: scale, round half to even, unscale.
+
+    Python's ``round`` works on the exact binary value instead, and the two
+    disagree on inputs such as 2.835, so both backends round through here
+    or :func:`round_column`.
+    """
+    scale = 10.0**decimals
+    scaled = value * scale
+    return math.copysign(round(scaled), scaled) / scale
+
+
+def round_column(column: Any, decimals: int = 2) -> Any:
+    if np is not None:
+        return np.round(column, decimals)
+    return array("d", (round_value(value, decimals) for value in column))
+
+
+def column_stats(column: Any) -> Tuple[float, float, float]:
+    """Return ``(sum, min, max)`` of a non-empty column."""
+    if np is not None:
+        return float(column.sum()), float(column.min()), float(column.max())
+    return float(sum(column)), min(column), max(column)
+
+
+def value_counts(column: Any) -> Dict[int, int]:
+    if np is not None:
+        values, counts = np.unique(column, return_counts=True)
+        return dict(zip(values.tolist(), counts.tolist()))
+    return dict(Counter(column))
+
+
+@dataclass
+class EventBatch:
+    """Events stored as one array per field instead of one object per event.
+
+    Columns are NumPy arrays when NumPy is available and ``array.array``
+    otherwise; plugins and policies can transform a whole column at once
+    through ``process_batch`` / ``evaluate_batch``.
+    """
+
+    sensor_id: Any
+    temperature: Any
+    humidity: Any
+    timestamp: Any
+
+    def __post_init__(self) -> None:
+        for name in COLUMN_TYPES:
+            setattr(self, name, make_column(name, getattr(self, name)))
+        if len({len(getattr(self, name)) for name in COLUMN_TYPES}) > 1:
+            raise ValueError("EventBatch columns must have the same length")
+
+    @staticmethod
+    def from_events(events: Iterable[EventPayload]) -> "EventBatch":
+        events = events if isinstance(events, Sequence) else list(events)
+        return EventBatch(
+            sensor_id=[event.sensor_id for event in events],
+            temperature=[event.temperature for event in events],
+            humidity=[event.humidity for event in events],
+            timestamp=[event.timestamp for event in events],
+        )
+
+    @staticmethod
+    def from_dicts(payloads: Iterable[Mapping[str, Any]]) -> "EventBatch":
+        columns: Dict[str, List[Any]] = {name: [] for name in COLUMN_TYPES}
+        for payload in payloads:
+            for name, values in columns.items():
+                values.append(payload[name])
+        return EventBatch(**columns)
+
+    @property
+    def backend(self) -> str:
+        return "numpy" if np is not None else "array"
+
+    def __len__(self) -> int:
+        return len(self.sensor_id)
+
+    def replace(self, **columns: Any) -> "EventBatch":
+        """Return a batch sharing every column not given in ``columns``."""
+        current = {name: getattr(self, name) for name in COLUMN_TYPES}
+        current.update(columns)
+        return EventBatch(**current)
+
+    def select(self, mask: Iterable[bool]) -> "EventBatch":
+        """Keep only the rows where ``mask`` is true."""
+        if np is not None:
+            keep = np.asarray(mask, dtype=bool)
+            return self.replace(
+                **{name: getattr(self, name)[keep] for name in COLUMN_TYPES}
+            )
+        keep = list(mask)
+        return self.replace(
+            **{name: list(compress(getattr(self, name), keep)) for name in COLUMN_TYPES}
+        )
+
+    def to_events(self) -> List[EventPayload]:
+        return [
+            EventPayload(
+                sensor_id=sensor_id,
+                temperature=temperature,
+                humidity=humidity,
+                timestamp=timestamp,
+            )
+            for sensor_id, temperature, humidity, timestamp in zip(
+                self.sensor_id.tolist(),
+                self.temperature.tolist(),
+                self.humidity.tolist(),
+                self.timestamp.tolist(),
+            )
+        ]
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 import os
 from pathlib import Path
 from typing import Optional
@@ -24,6 +24,34 @@ class RuntimeConfig:
     demo_mode: bool = False
     policy_enabled: bool = False
     policy_allowlist: Optional[tuple[int, ...]] = None
+    batch_ingest: bool = False
+    shard_count: int = 1
+    consumer_workers: int = 0
+    streaming: bool = False
+    stream_window: int = 500
+    dynamodb_batch: bool = False
+    lambda_async: bool = False
+    lambda_concurrency: int = 4
+    s3_gzip: bool = False
+    checkpoint_table: Optional[str] = None
+    checkpoint_interval: int = 100
+    batch_stages: tuple[str, ...] = ()
+    batch_max_events: int = 500
+    batch_max_bytes: int = 0
+    batch_max_delay_ms: float = 0.0
+    plugin_workers: int = 0
+    columnar: bool = False
+    plugin_in_place: bool = False
+    load_sensors: int = 0
+    load_zipf: float = 1.1
+    load_anomaly_rate: float = 0.0
+    codec: str = "json"
+    kinesis_aggregation: bool = False
+    partitioned_output: bool = False
+    partition_sensor_buckets: int = 16
+    partition_file_bytes: int = 128 * 1024 * 1024
+    segment_output: bool = False
+    segment_block_rows: int = 16_384
 
     @staticmethod
     def from_env() -> "RuntimeConfig":
@@ -41,6 +69,39 @@ class RuntimeConfig:
             tuple(int(item) for item in allowlist_raw.split(",") if item.strip())
             or None
         )
+        batch_ingest = os.getenv("RTAP_BATCH_INGEST", "0") == "1"
+        shard_count = int(os.getenv("RTAP_SHARD_COUNT", "1"))
+        consumer_workers = int(os.getenv("RTAP_CONSUMER_WORKERS", "0"))
+        streaming = os.getenv("RTAP_STREAMING", "0") == "1"
+        stream_window = int(os.getenv("RTAP_STREAM_WINDOW", "500"))
+        dynamodb_batch = os.getenv("RTAP_DYNAMODB_BATCH", "0") == "1"
+        lambda_async = os.getenv("RTAP_LAMBDA_ASYNC", "0") == "1"
+        lambda_concurrency = int(os.getenv("RTAP_LAMBDA_CONCURRENCY", "4"))
+        s3_gzip = os.getenv("RTAP_S3_GZIP", "0") == "1"
+        checkpoint_table = os.getenv("RTAP_CHECKPOINT_TABLE", "").strip() or None
+        checkpoint_interval = int(os.getenv("RTAP_CHECKPOINT_INTERVAL", "100"))
+        stages_raw = os.getenv("RTAP_BATCH_STAGES", "").strip()
+        batch_stages = tuple(
+            item.strip().lower() for item in stages_raw.split(",") if item.strip()
+        )
+        batch_max_events = int(os.getenv("RTAP_BATCH_MAX_EVENTS", "500"))
+        batch_max_bytes = int(os.getenv("RTAP_BATCH_MAX_BYTES", "0"))
+        batch_max_delay_ms = float(os.getenv("RTAP_BATCH_MAX_DELAY_MS", "0"))
+        plugin_workers = int(os.getenv("RTAP_PLUGIN_WORKERS", "0"))
+        columnar = os.getenv("RTAP_COLUMNAR", "0") == "1"
+        plugin_in_place = os.getenv("RTAP_PLUGIN_IN_PLACE", "0") == "1"
+        load_sensors = int(os.getenv("RTAP_LOAD_SENSORS", "0"))
+        load_zipf = float(os.getenv("RTAP_LOAD_ZIPF", "1.1"))
+        load_anomaly_rate = float(os.getenv("RTAP_LOAD_ANOMALY_RATE", "0"))
+        codec = os.getenv("RTAP_CODEC", "json").strip().lower()
+        kinesis_aggregation = os.getenv("RTAP_KINESIS_AGGREGATION", "0") == "1"
+        partitioned_output = os.getenv("RTAP_PARTITIONED_OUTPUT", "0") == "1"
+        partition_sensor_buckets = int(os.getenv("RTAP_PARTITION_SENSOR_BUCKETS", "16"))
+        partition_file_bytes = int(
+            os.getenv("RTAP_PARTITION_FILE_BYTES", str(128 * 1024 * 1024))
+        )
+        segment_output = os.getenv("RTAP_SEGMENT_OUTPUT", "0") == "1"
+        segment_block_rows = int(os.getenv("RTAP_SEGMENT_BLOCK_ROWS", "16384"))
         return RuntimeConfig(
             use_fake_aws=use_fake_aws,
             log_format=log_format,
@@ -50,17 +111,40 @@ class RuntimeConfig:
             demo_mode=demo_mode,
             policy_enabled=policy_enabled,
             policy_allowlist=policy_allowlist,
+            batch_ingest=batch_ingest,
+            shard_count=shard_count,
+            consumer_workers=consumer_workers,
+            streaming=streaming,
+            stream_window=stream_window,
+            dynamodb_batch=dynamodb_batch,
+            lambda_async=lambda_async,
+            lambda_concurrency=lambda_concurrency,
+            s3_gzip=s3_gzip,
+            checkpoint_table=checkpoint_table,
+            checkpoint_interval=checkpoint_interval,
+            batch_stages=batch_stages,
+            batch_max_events=batch_max_events,
+            batch_max_bytes=batch_max_bytes,
+            batch_max_delay_ms=batch_max_delay_ms,
+            plugin_workers=plugin_workers,
+            columnar=columnar,
+            plugin_in_place=plugin_in_place,
+            load_sensors=load_sensors,
+            load_zipf=load_zipf,
+            load_anomaly_rate=load_anomaly_rate,
+            codec=codec,
+            kinesis_aggregation=kinesis_aggregation,
+            partitioned_output=partitioned_output,
+            partition_sensor_buckets=partition_sensor_buckets,
+            partition_file_bytes=partition_file_bytes,
+            segment_output=segment_output,
+            segment_block_rows=segment_block_rows,
         )
 
     def with_demo(self, trace_path: Optional[Path] = None) -> "RuntimeConfig":
         """Return a demo-friendly configuration without mutating the original."""
-        return RuntimeConfig(
-            use_fake_aws=self.use_fake_aws,
-            log_format=self.log_format,
+        return replace(
+            self,
             trace_path=trace_path if trace_path is not None else self.trace_path,
-            otel_enabled=self.otel_enabled,
-            metrics_enabled=self.metrics_enabled,
             demo_mode=True,
-            policy_enabled=self.policy_enabled,
-            policy_allowlist=self.policy_allowlist,
         )
@@ -0,0 +1,276 @@
+"""Local Kinesis event source mapping for driving Lambda handlers.
+
+:class:`EventSourceMapping` polls every shard of a stream, groups records
+into Kinesis-shaped Lambda events and invokes a handler on a thread pool,
+following the Lambda poller's rules: batches close on ``batch_size`` or
+after ``batching_window_s``; with a ``parallelization_factor`` above one
+each shard is split into that many lanes by partition key, so records of a
+key stay ordered; a lane has at most one invocation in flight; a failed
+batch, or the part of it from the first ``batchItemFailures`` entry on, is
+retried up to ``max_retry_attempts`` times before it is dropped.
+"""
+
+from __future__ import annotations
+
+import base64
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+import hashlib
+import time
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+import uuid
+
+from .consumer import ShardReader, list_shard_ids
+from .metrics import MetricRegistry
+
+
+Handler = Callable[[Dict[str, Any], Any], Any]
+
+_REGION = "us-east-1"
+_ACCOUNT = "000000000000"
+
+
+@dataclass
+class LambdaContext:
+    """The subset of the Lambda context object handlers usually read."""
+
+    function_name: str
+    aws_request_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    memory_limit_in_mb: int = 128
+    timeout_s: float = 60.0
+    _started: float = field(default_factory=time.monotonic, repr=False)
+
+    def get_remaining_time_in_millis(self) -> int:
+        elapsed = time.monotonic() - self._started
+        return max(0, int((self.timeout_s - elapsed) * 1000))
+
+
+@dataclass
+class EsmStats:
+    records: int = 0
+    invocations: int = 0
+    failed_invocations: int = 0
+    retried_records: int = 0
+    dropped_records: int = 0
+    elapsed_s: float = 0.0
+
+    @property
+    def records_per_second(self) -> float:
+        return self.records / self.elapsed_s if self.elapsed_s else 0.0
+
+
+@dataclass
+class _Lane:
+    shard_id: str
+    pending: Deque[dict] = field(default_factory=deque)
+    opened_at: Optional[float] = None
+    in_flight: Optional[Future] = None
+    attempts: int = 0
+
+
+def to_lambda_record(record: dict, stream_arn: str, shard_id: str) -> Dict[str, Any]:
+    """Shape a get_records entry the way Lambda delivers it."""
+    sequence_number = record["SequenceNumber"]
+    return {
+        "kinesis": {
+            "kinesisSchemaVersion": "1.0",
+            "partitionKey": record["PartitionKey"],
+            "sequenceNumber": sequence_number,
+            "data": base64.b64encode(record["Data"]).decode("ascii"),
+            "approximateArrivalTimestamp": record["ApproximateArrivalTimestamp"],
+        },
+        "eventSource": "aws:kinesis",
+        "eventVersion": "1.0",
+        "eventID": f"{shard_id}:{sequence_number}",
+        "eventName": "aws:kinesis:record",
+        "awsRegion": _REGION,
+        "eventSourceARN": stream_arn,
+    }
+
+
+@dataclass
+class EventSourceMapping:
+    """Poll a stream and feed its records to ``handler`` in batches.
+
+    :meth:`run` returns :class:`EsmStats`; ``metrics`` also holds the
+    ``esm.iterator_age_ms`` (age of each batch's last record when it is
+    invoked), ``esm.invocation_ms`` and ``esm.batch.size`` histograms.
+    """
+
+    client: Any
+    stream_name: str
+    handler: Handler
+    function_name: str = "rtap-processor"
+    batch_size: int = 100
+    batching_window_s: float = 0.0
+    parallelization_factor: int = 1
+    starting_position: str = "TRIM_HORIZON"
+    max_retry_attempts: int = 3
+    max_workers: Optional[int] = None
+    poll_limit: int = 10_000
+    poll_interval_s: float = 0.01
+    metrics: MetricRegistry = field(default_factory=MetricRegistry)
+    clock: Callable[[], float] = time.time
+
+    def __post_init__(self) -> None:
+        if not 1 <= self.batch_size <= 10_000:
+            raise ValueError("batch_size must be between 1 and 10000")
+        if not 1 <= self.parallelization_factor <= 10:
+            raise ValueError("parallelization_factor must be between 1 and 10")
+        if self.batching_window_s < 0:
+            raise ValueError("batching_window_s must not be negative")
+
+    @property
+    def stream_arn(self) -> str:
+        return f"arn:aws:kinesis:{_REGION}:{_ACCOUNT}:stream/{self.stream_name}"
+
+    def run(
+        self, duration_s: Optional[float] = None, until_idle: bool = True
+    ) -> EsmStats:
+        """Poll until the stream is drained (or ``duration_s`` passes)."""
+        readers = [
+            ShardReader(
+                self.client,
+                self.stream_name,
+                shard_id,
+                iterator_type=self.starting_position,
+                limit=self.poll_limit,
+            )
+            for shard_id in list_shard_ids(self.client, self.stream_name)
+        ]
+        lanes: Dict[Tuple[str, int], _Lane] = {
+            (reader.shard_id, slot): _Lane(reader.shard_id)
+            for reader in readers
+            for slot in range(self.parallelization_factor)
+        }
+        stats = EsmStats()
+        start = time.perf_counter()
+        workers = self.max_workers or max(1, len(lanes))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while True:
+                polled = 0
+                for reader in readers:
+                    records = reader.poll()
+                    polled += len(records)
+                    for record in records:
+                        lane = lanes[(reader.shard_id, self._slot(record))]
+                        if not lane.pending:
+                            lane.opened_at = self.clock()
+                        lane.pending.append(record)
+                for lane in lanes.values():
+                    if lane.in_flight is None and self._ready(lane):
+                        batch = self._take(lane)
+                        lane.in_flight = executor.submit(
+                            self._invoke, lane.shard_id, batch
+                        )
+                running = [lane.in_flight for lane in lanes.values() if lane.in_flight]
+                if running:
+                    wait(
+                        running,
+                        timeout=self.poll_interval_s,
+                        return_when=FIRST_COMPLETED,
+                    )
+                for lane in lanes.values():
+                    if lane.in_flight is not None and lane.in_flight.done():
+                        self._complete(lane, stats)
+                elapsed = time.perf_counter() - start
+                if duration_s is not None and elapsed >= duration_s:
+                    break
+                busy = any(lane.pending or lane.in_flight for lane in lanes.values())
+                if until_idle and not polled and not busy:
+                    break
+                if not polled and not running:
+                    time.sleep(self.poll_interval_s)
+            for lane in lanes.values():
+                if lane.in_flight is not None:
+                    lane.in_flight.result()
+                    self._complete(lane, stats)
+        stats.elapsed_s = time.perf_counter() - start
+        return stats
+
+    def _slot(self, record: dict) -> int:
+        if self.parallelization_factor == 1:
+            return 0
+        digest = hashlib.md5(record["PartitionKey"].encode("utf-8")).digest()
+        return int.from_bytes(digest[:4], "big") % self.parallelization_factor
+
+    def _ready(self, lane: _Lane) -> bool:
+        if not lane.pending:
+            return False
+        if len(lane.pending) >= self.batch_size:
+            return True
+        return self.clock() - lane.opened_at >= self.batching_window_s
+
+    def _take(self, lane: _Lane) -> List[dict]:
+        batch = [
+            lane.pending.popleft()
+            for _ in range(min(self.batch_size, len(lane.pending)))
+        ]
+        lane.opened_at = self.clock() if lane.pending else None
+        return batch
+
+    def _invoke(
+        self, shard_id: str, batch: List[dict]
+    ) -> Tuple[List[dict], Any, Optional[Exception]]:
+        event = {
+            "Records": [
+                to_lambda_record(record, self.stream_arn, shard_id) for record in batch
+            ]
+        }
+        age_ms = (self.clock() - batch[-1]["ApproximateArrivalTimestamp"]) * 1000
+        self.metrics.record("esm.iterator_age_ms", age_ms)
+        self.metrics.record("esm.batch.size", len(batch))
+        started = time.perf_counter()
+        try:
+            response = self.handler(event, LambdaContext(self.function_name))
+            error = None
+        except Exception as exc:  # The handler's failure fails the batch.
+            response, error = None, exc
+        duration_ms = (time.perf_counter() - started) * 1000
+        self.metrics.record("esm.invocation_ms", duration_ms)
+        return batch, response, error
+
+    def _complete(self, lane: _Lane, stats: EsmStats) -> None:
+        batch, response, error = lane.in_flight.result()
+        lane.in_flight = None
+        stats.invocations += 1
+        self.metrics.increment("esm.invocations")
+        retry_from = 0 if error is not None else self._first_failure(batch, response)
+        if retry_from is None:
+            stats.records += len(batch)
+            self.metrics.increment("esm.records.processed", len(batch))
+            lane.attempts = 0
+            return
+        stats.failed_invocations += 1
+        stats.records += retry_from
+        self.metrics.increment("esm.invocations.failed")
+        self.metrics.increment("esm.records.processed", retry_from)
+        failed = batch[retry_from:]
+        lane.attempts += 1
+        if lane.attempts > self.max_retry_attempts:
+            stats.dropped_records += len(failed)
+            self.metrics.increment("esm.records.dropped", len(failed))
+            lane.attempts = 0
+            return
+        stats.retried_records += len(failed)
+        self.metrics.increment("esm.records.retried", len(failed))
+        lane.pending.extendleft(reversed(failed))
+        lane.opened_at = self.clock()
+
+    @staticmethod
+    def _first_failure(batch: List[dict], response: Any) -> Optional[int]:
+        """Index to resume from per ``batchItemFailures``; None on success."""
+        failures = (
+            response.get("batchItemFailures") if isinstance(response, dict) else None
+        )
+        if not failures:
+            return None
+        positions = {record["SequenceNumber"]: i for i, record in enumerate(batch)}
+        indexes = [
+            positions.get((failure or {}).get("itemIdentifier")) for failure in failures
+        ]
+        # An identifier that is missing or unknown fails the whole batch.
+        if any(index is None for index in indexes):
+            return 0
+        return min(indexes)
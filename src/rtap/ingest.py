@@ -0,0 +1,148 @@
+"""Batched Kinesis ingest using put_records."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .metrics import MetricRegistry
+
+
+MAX_RECORDS_PER_REQUEST = 500
+MAX_BYTES_PER_REQUEST = 5 * 1024 * 1024
+MAX_BYTES_PER_RECORD = 1024 * 1024
+
+RETRYABLE_ERROR_CODES = frozenset(
+    {"ProvisionedThroughputExceededException", "InternalFailure"}
+)
+
+
+# (data, partition key, explicit hash key or None)
+_Entry = Tuple[bytes, str, Optional[str]]
+
+
+def _record_size(data: bytes, partition_key: str) -> int:
+    # Kinesis counts the partition key against both the record and request limits.
+    return len(data) + len(partition_key.encode("utf-8"))
+
+
+@dataclass
+class KinesisBatchWriter:
+    """Pack records into put_records calls within the Kinesis request limits.
+
+    Entries rejected with a retryable per-record error code are resent on
+    their own in the next request; entries that keep failing after
+    ``max_retries`` attempts, or that fail with a non-retryable code, are
+    counted and returned by :meth:`flush`.
+    """
+
+    client: Any
+    stream_name: str
+    metrics: MetricRegistry = field(default_factory=MetricRegistry)
+    max_records: int = MAX_RECORDS_PER_REQUEST
+    max_bytes: int = MAX_BYTES_PER_REQUEST
+    max_retries: int = 3
+    backoff_s: float = 0.05
+    sleep: Callable[[float], None] = time.sleep
+    _pending: List[_Entry] = field(default_factory=list, repr=False)
+    _pending_bytes: int = field(default=0, repr=False)
+
+    def put(
+        self,
+        data: bytes | str,
+        partition_key: str,
+        explicit_hash_key: Optional[str] = None,
+    ) -> List[dict]:
+        """Buffer one record, sending a request once the buffer is full.
+
+        Returns the entries that permanently failed in any flush this call
+        triggered.
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        size = _record_size(data, partition_key)
+        if size > MAX_BYTES_PER_RECORD:
+            raise ValueError(
+                f"Record of {size} bytes exceeds the {MAX_BYTES_PER_RECORD} byte limit"
+            )
+        failed: List[dict] = []
+        if (
+            len(self._pending) >= self.max_records
+            or self._pending_bytes + size > self.max_bytes
+        ):
+            failed = self.flush()
+        self._pending.append((data, partition_key, explicit_hash_key))
+        self._pending_bytes += size
+        return failed
+
+    def put_many(self, records: Iterable[Tuple[Any, ...]]) -> List[dict]:
+        """Send every ``(data, partition_key[, explicit_hash_key])`` tuple.
+
+        The remainder is flushed before returning.
+        """
+        failed: List[dict] = []
+        for record in records:
+            failed.extend(self.put(*record))
+        failed.extend(self.flush())
+        return failed
+
+    def flush(self) -> List[dict]:
+        """Send buffered records, retrying failed entries individually."""
+        batch = self._pending
+        self._pending = []
+        self._pending_bytes = 0
+        failed: List[dict] = []
+        attempt = 0
+        while batch:
+            retry, rejected = self._send(batch)
+            failed.extend(rejected)
+            if not retry:
+                break
+            attempt += 1
+            if attempt > self.max_retries:
+                failed.extend(_failure(entry, code) for entry, code in retry)
+                break
+            self.metrics.increment("kinesis.put_records.retries", len(retry))
+            self.sleep(self.backoff_s * (2 ** (attempt - 1)))
+            batch = [entry for entry, _ in retry]
+        if failed:
+            self.metrics.increment("kinesis.records.failed", len(failed))
+        return failed
+
+    def _send(
+        self, batch: List[_Entry]
+    ) -> Tuple[List[Tuple[_Entry, str]], List[dict]]:
+        with self.metrics.time("kinesis.put_records"):
+            response = self.client.put_records(
+                StreamName=self.stream_name,
+                Records=[_request_entry(entry) for entry in batch],
+            )
+        self.metrics.increment("kinesis.put_records.requests")
+        retry: List[Tuple[_Entry, str]] = []
+        rejected: List[dict] = []
+        if not response.get("FailedRecordCount"):
+            self.metrics.increment("kinesis.records.sent", len(batch))
+            return retry, rejected
+        for entry, result in zip(batch, response.get("Records", [])):
+            code: Optional[str] = result.get("ErrorCode")
+            if code is None:
+                self.metrics.increment("kinesis.records.sent")
+            elif code in RETRYABLE_ERROR_CODES:
+                retry.append((entry, code))
+            else:
+                rejected.append(_failure(entry, code))
+        return retry, rejected
+
+
+def _request_entry(entry: _Entry) -> Dict[str, Any]:
+    data, key, explicit_hash_key = entry
+    request = {"Data": data, "PartitionKey": key}
+    if explicit_hash_key is not None:
+        request["ExplicitHashKey"] = explicit_hash_key
+    return request
+
+
+def _failure(entry: _Entry, code: str) -> dict:
+    data, key, _ = entry
+    return {"Data": data, "PartitionKey": key, "ErrorCode": code}
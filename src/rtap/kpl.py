@@ -0,0 +1,169 @@
+"""The KPL aggregated record wire format.
+
+An aggregated record is ``AGGREGATION_MAGIC``, a protobuf ``AggregatedRecord``
+message and the MD5 digest of that message, exactly as the Kinesis Producer
+Library writes it, so the KCL, Lambda and aws-kinesis-agg consumers can
+de-aggregate what :class:`rtap.aggregation.RecordAggregator` produces::
+
+    message AggregatedRecord {
+        repeated string partition_key_table = 1;
+        repeated string explicit_hash_key_table = 2;
+        repeated Record records = 3;
+    }
+    message Record {
+        required uint64 partition_key_index = 1;
+        optional uint64 explicit_hash_key_index = 2;
+        required bytes data = 3;
+        repeated Tag tags = 4;
+    }
+
+The module only uses the standard library so ``kinesis/consumer.py`` and
+``lambda/processor.py`` can share it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+AGGREGATION_MAGIC = b"\xf3\x89\x9a\xc2"
+DIGEST_SIZE = 16
+ENVELOPE_OVERHEAD = len(AGGREGATION_MAGIC) + DIGEST_SIZE
+
+_VARINT = 0
+_FIXED64 = 1
+_LENGTH_DELIMITED = 2
+_FIXED32 = 5
+
+_PARTITION_KEY_TABLE = 1
+_RECORDS = 3
+_PARTITION_KEY_INDEX = 1
+_DATA = 3
+
+
+def varint_size(value: int) -> int:
+    size = 1
+    while value > 0x7F:
+        value >>= 7
+        size += 1
+    return size
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _field(number: int, payload: bytes) -> bytes:
+    return _varint(number << 3 | _LENGTH_DELIMITED) + _varint(len(payload)) + payload
+
+
+def _record_message(key_index: int, data: bytes) -> bytes:
+    return (
+        _varint(_PARTITION_KEY_INDEX << 3 | _VARINT)
+        + _varint(key_index)
+        + _field(_DATA, data)
+    )
+
+
+def key_entry_size(partition_key: str) -> int:
+    """Bytes a new partition key adds to the key table."""
+    length = len(partition_key.encode("utf-8"))
+    return 1 + varint_size(length) + length
+
+
+def record_entry_size(key_index: int, data_size: int) -> int:
+    """Bytes one user record adds to an aggregated record."""
+    inner = 1 + varint_size(key_index) + 1 + varint_size(data_size) + data_size
+    return 1 + varint_size(inner) + inner
+
+
+def encode_aggregated(records: Sequence[Tuple[str, bytes]]) -> bytes:
+    """Aggregate ``(partition_key, data)`` pairs into one Kinesis record body."""
+    keys: dict = {}
+    parts: List[bytes] = []
+    for partition_key, data in records:
+        index = keys.setdefault(partition_key, len(keys))
+        parts.append(_field(_RECORDS, _record_message(index, data)))
+    table = [_field(_PARTITION_KEY_TABLE, key.encode("utf-8")) for key in keys]
+    message = b"".join(table + parts)
+    return AGGREGATION_MAGIC + message + hashlib.md5(message).digest()
+
+
+def is_aggregated(data: bytes) -> bool:
+    return len(data) >= ENVELOPE_OVERHEAD and data[:4] == AGGREGATION_MAGIC
+
+
+def _read_varint(buffer: memoryview, offset: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        if offset >= len(buffer):
+            raise ValueError("Aggregated record is truncated")
+        byte = buffer[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+
+
+def _fields(buffer: memoryview) -> Iterator[Tuple[int, int, object]]:
+    """Yield ``(field number, wire type, value)`` for each field of a message."""
+    offset = 0
+    while offset < len(buffer):
+        key, offset = _read_varint(buffer, offset)
+        number, wire_type = key >> 3, key & 0x07
+        if wire_type == _VARINT:
+            value, offset = _read_varint(buffer, offset)
+        elif wire_type == _LENGTH_DELIMITED:
+            length, offset = _read_varint(buffer, offset)
+            if offset + length > len(buffer):
+                raise ValueError("Aggregated record is truncated")
+            value = buffer[offset : offset + length]
+            offset += length
+        elif wire_type in (_FIXED64, _FIXED32):
+            offset += 8 if wire_type == _FIXED64 else 4
+            value = None
+        else:
+            raise ValueError(f"Unsupported protobuf wire type {wire_type}")
+        yield number, wire_type, value
+
+
+def deaggregate_records(data: bytes) -> List[Tuple[Optional[str], bytes]]:
+    """Return ``(partition_key, data)`` for each user record in ``data``.
+
+    Records without the magic come back as one entry with no key.
+    """
+    if not is_aggregated(data):
+        return [(None, data)]
+    view = memoryview(data)
+    message = view[len(AGGREGATION_MAGIC) : -DIGEST_SIZE]
+    if hashlib.md5(message).digest() != view[-DIGEST_SIZE:]:
+        raise ValueError("Aggregated record failed its MD5 check")
+    keys: List[str] = []
+    records: List[Tuple[int, bytes]] = []
+    for number, wire_type, value in _fields(message):
+        if wire_type != _LENGTH_DELIMITED:
+            continue
+        if number == _PARTITION_KEY_TABLE:
+            keys.append(bytes(value).decode("utf-8"))
+        elif number == _RECORDS:
+            key_index, payload = 0, b""
+            for inner, inner_type, inner_value in _fields(value):
+                if inner == _PARTITION_KEY_INDEX and inner_type == _VARINT:
+                    key_index = inner_value
+                elif inner == _DATA and inner_type == _LENGTH_DELIMITED:
+                    payload = bytes(inner_value)
+            records.append((key_index, payload))
+    if any(index >= len(keys) for index, _ in records):
+        raise ValueError("Aggregated record references a missing partition key")
+    return [(keys[index], payload) for index, payload in records]
+
+
+def deaggregate(data: bytes) -> List[bytes]:
+    """Return the user records carried by ``data``."""
+    return [payload for _, payload in deaggregate_records(data)]
@@ -0,0 +1,133 @@
+"""High-volume synthetic event generation for load tests."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from itertools import accumulate
+import random
+import time
+from typing import Any, Iterator, List, Optional
+
+from .columnar import EventBatch, np, round_value
+from .plugins.base import EventPayload
+
+
+def _grid(low: float, high: float) -> List[float]:
+    """Every two-decimal value between ``low`` and ``high`` inclusive."""
+    start, stop = round(low * 100), round(high * 100)
+    return [value / 100 for value in range(start, stop + 1)]
+
+
+def zipf_weights(count: int, exponent: float) -> List[float]:
+    """Weights ``1 / rank ** exponent`` for ranks 1..count; 0 means uniform."""
+    return [1.0 / rank**exponent for rank in range(1, count + 1)]
+
+
+@dataclass
+class LoadGenerator:
+    """Generate events in bulk, one columnar :class:`EventBatch` at a time.
+
+    Sensor ids 1..``sensor_count`` follow a Zipf distribution with exponent
+    ``zipf_exponent`` (sensor 1 is the hottest key). Timestamps advance from
+    ``start_timestamp`` at ``events_per_second``. A fraction
+    ``anomaly_rate`` of events is emitted as bursts of ``anomaly_burst``
+    consecutive over-temperature readings from a single sensor. Batches are
+    produced lazily, so memory stays bounded by ``batch_size`` whatever the
+    event count. Output is reproducible for a given seed and backend (NumPy
+    when installed, the ``random`` module otherwise).
+    """
+
+    seed: int = 42
+    sensor_count: int = 1000
+    zipf_exponent: float = 1.1
+    events_per_second: float = 1000.0
+    start_timestamp: Optional[int] = None
+    anomaly_rate: float = 0.0
+    anomaly_burst: int = 50
+    batch_size: int = 65_536
+    min_temp: float = 20.0
+    max_temp: float = 35.0
+    min_humidity: float = 30.0
+    max_humidity: float = 70.0
+    anomaly_min_temp: float = 60.0
+    anomaly_max_temp: float = 80.0
+    _cum_weights: List[float] = field(default_factory=list, init=False, repr=False)
+    _probabilities: Any = field(default=None, init=False, repr=False)
+    _temperatures: List[float] = field(default_factory=list, init=False, repr=False)
+    _humidities: List[float] = field(default_factory=list, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.sensor_count < 1:
+            raise ValueError("sensor_count must be at least 1")
+        if not 0.0 <= self.anomaly_rate <= 1.0:
+            raise ValueError("anomaly_rate must be between 0 and 1")
+        weights = zipf_weights(self.sensor_count, self.zipf_exponent)
+        self._cum_weights = list(accumulate(weights))
+        # Sampling pre-rounded values avoids a round() call per field.
+        self._temperatures = _grid(self.min_temp, self.max_temp)
+        self._humidities = _grid(self.min_humidity, self.max_humidity)
+        if np is not None:
+            self._probabilities = np.asarray(weights) / self._cum_weights[-1]
+
+    def generate(self, count: int) -> List[EventPayload]:
+        return list(self.iter_events(count))
+
+    def iter_events(self, count: int) -> Iterator[EventPayload]:
+        for batch in self.iter_batches(count):
+            yield from batch.to_events()
+
+    def iter_batches(self, count: int) -> Iterator[EventBatch]:
+        start = self.start_timestamp
+        if start is None:
+            start = int(time.time())
+        fill = self._fill_numpy if np is not None else self._fill_python
+        rng = (
+            np.random.default_rng(self.seed)
+            if np is not None
+            else random.Random(self.seed)
+        )
+        for offset in range(0, count, self.batch_size):
+            size = min(self.batch_size, count - offset)
+            yield fill(rng, offset, size, start)
+
+    def _burst_starts(self, draw, size: int) -> List[int]:
+        bursts = round(size * self.anomaly_rate / self.anomaly_burst)
+        if not bursts or size <= self.anomaly_burst:
+            return []
+        return sorted(draw(size - self.anomaly_burst) for _ in range(bursts))
+
+    def _fill_python(
+        self, rng: random.Random, offset: int, size: int, start: int
+    ) -> EventBatch:
+        population = range(1, self.sensor_count + 1)
+        sensors = rng.choices(population, cum_weights=self._cum_weights, k=size)
+        temperature = rng.choices(self._temperatures, k=size)
+        humidity = rng.choices(self._humidities, k=size)
+        rate = self.events_per_second
+        timestamps = [start + int((offset + i) / rate) for i in range(size)]
+        anomaly_span = self.anomaly_max_temp - self.anomaly_min_temp
+        for begin in self._burst_starts(rng.randrange, size):
+            sensor = sensors[begin]
+            for index in range(begin, begin + self.anomaly_burst):
+                sensors[index] = sensor
+                temperature[index] = round_value(
+                    self.anomaly_min_temp + anomaly_span * rng.random()
+                )
+        return EventBatch(sensors, temperature, humidity, timestamps)
+
+    def _fill_numpy(self, rng, offset: int, size: int, start: int) -> EventBatch:
+        sensors = rng.choice(self.sensor_count, size=size, p=self._probabilities)
+        sensors += 1
+        temperature = np.round(rng.uniform(self.min_temp, self.max_temp, size), 2)
+        humidity = np.round(
+            rng.uniform(self.min_humidity, self.max_humidity, size), 2
+        )
+        positions = np.arange(offset, offset + size, dtype=np.float64)
+        timestamps = start + (positions / self.events_per_second).astype(np.int64)
+        burst = self.anomaly_burst
+        for begin in self._burst_starts(lambda high: int(rng.integers(high)), size):
+            sensors[begin : begin + burst] = sensors[begin]
+            temperature[begin : begin + burst] = np.round(
+                rng.uniform(self.anomaly_min_temp, self.anomaly_max_temp, burst), 2
+            )
+        return EventBatch(sensors, temperature, humidity, timestamps)
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+import threading
 import time
 from typing import Dict, Iterable, Optional
 
@@ -24,10 +25,16 @@ class Timer:
         self.registry.observe(self.name, duration)
 
 
+def _percentile(ordered: list[float], fraction: float) -> float:
+    index = min(len(ordered) - 1, int(fraction * len(ordered)))
+    return ordered[index]
+
+
 @dataclass
 class MetricSnapshot:
     counters: Dict[str, int]
     timers: Dict[str, list[float]]
+    histograms: Dict[str, list[float]] = field(default_factory=dict)
 
     def summary(self) -> Dict[str, float]:
         summary: Dict[str, float] = {}
@@ -37,6 +44,15 @@ class MetricSnapshot:
             summary[f"{name}.count"] = float(len(values))
             summary[f"{name}.avg_s"] = sum(values) / len(values)
             summary[f"{name}.max_s"] = max(values)
+        for name, values in self.histograms.items():
+            if not values:
+                continue
+            ordered = sorted(values)
+            summary[f"{name}.count"] = float(len(ordered))
+            summary[f"{name}.avg"] = sum(ordered) / len(ordered)
+            summary[f"{name}.p50"] = _percentile(ordered, 0.5)
+            summary[f"{name}.p95"] = _percentile(ordered, 0.95)
+            summary[f"{name}.max"] = ordered[-1]
         for name, count in self.counters.items():
             summary[f"{name}.count"] = float(count)
         return summary
@@ -44,40 +60,64 @@ class MetricSnapshot:
 
 @dataclass
 class MetricRegistry:
-    """Simple metrics registry for counters and timers."""
+    """Simple metrics registry for counters, timers and histograms.
+
+    Updates are guarded by a lock so stages running on worker threads can
+    share one registry.
+    """
 
     enabled: bool = True
     counters: Dict[str, int] = field(default_factory=dict)
     timers: Dict[str, list[float]] = field(default_factory=dict)
+    histograms: Dict[str, list[float]] = field(default_factory=dict)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
 
     def increment(self, name: str, value: int = 1) -> None:
         if not self.enabled:
             return
-        self.counters[name] = self.counters.get(name, 0) + value
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
 
     def observe(self, name: str, duration: float) -> None:
         if not self.enabled:
             return
-        self.timers.setdefault(name, []).append(duration)
+        with self._lock:
+            self.timers.setdefault(name, []).append(duration)
+
+    def record(self, name: str, value: float) -> None:
+        """Add a sample, such as a batch size, to the ``name`` histogram."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.histograms.setdefault(name, []).append(value)
 
     def time(self, name: str) -> Timer:
         return Timer(self, name)
 
     def snapshot(self) -> MetricSnapshot:
-        return MetricSnapshot(
-            counters=dict(self.counters),
-            timers={k: list(v) for k, v in self.timers.items()},
-        )
+        with self._lock:
+            return MetricSnapshot(
+                counters=dict(self.counters),
+                timers={k: list(v) for k, v in self.timers.items()},
+                histograms={k: list(v) for k, v in self.histograms.items()},
+            )
 
     def merge(self, other: "MetricRegistry") -> None:
-        for name, count in other.counters.items():
-            self.counters[name] = self.counters.get(name, 0) + count
-        for name, values in other.timers.items():
-            self.timers.setdefault(name, []).extend(values)
+        with self._lock:
+            for name, count in other.counters.items():
+                self.counters[name] = self.counters.get(name, 0) + count
+            for name, values in other.timers.items():
+                self.timers.setdefault(name, []).extend(values)
+            for name, values in other.histograms.items():
+                self.histograms.setdefault(name, []).extend(values)
 
     def reset(self) -> None:
-        self.counters.clear()
-        self.timers.clear()
+        with self._lock:
+            self.counters.clear()
+            self.timers.clear()
+            self.histograms.clear()
 
 
 def format_metrics(
@@ -88,7 +128,7 @@ def format_metrics(
     return "\n".join(
         (
             f"{prefix}.{name}: {value:.{decimals}f}"
-            if name.endswith(".avg_s") or name.endswith(".max_s")
+            if name.endswith((".avg_s", ".max_s", ".avg"))
             else f"{prefix}.{name}: {value:.0f}"
         )
         for name, value in items
@@ -99,6 +139,10 @@ def merge_snapshots(snapshots: Iterable[MetricSnapshot]) -> MetricSnapshot:
     registry = MetricRegistry()
     for snapshot in snapshots:
         registry.merge(
-            MetricRegistry(counters=snapshot.counters, timers=snapshot.timers)
+            MetricRegistry(
+                counters=snapshot.counters,
+                timers=snapshot.timers,
+                histograms=snapshot.histograms,
+            )
         )
     return registry.snapshot()
@@ -0,0 +1,113 @@
+"""Hive-style partitioned S3 layout for processed events."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Iterable, List, Optional
+import uuid
+
+from .artifacts import S3StreamWriter
+from .codecs import JSON_CODEC
+from .metrics import MetricRegistry
+from .plugins.base import EventPayload
+
+
+DEFAULT_SENSOR_BUCKETS = 16
+DEFAULT_TARGET_FILE_BYTES = 128 * 1024 * 1024
+
+
+def sensor_bucket(sensor_id: int, buckets: int = DEFAULT_SENSOR_BUCKETS) -> int:
+    """Bucket a sensor id; queries filter on ``sensor_id % buckets``."""
+    return sensor_id % buckets
+
+
+def partition_path(event: EventPayload, buckets: int = DEFAULT_SENSOR_BUCKETS) -> str:
+    """Return ``dt=YYYY-MM-DD/hour=HH/sensor_bucket=N`` for an event (UTC)."""
+    moment = datetime.fromtimestamp(event.timestamp, tz=timezone.utc)
+    return (
+        f"dt={moment:%Y-%m-%d}/hour={moment:%H}/"
+        f"sensor_bucket={sensor_bucket(event.sensor_id, buckets)}"
+    )
+
+
+@dataclass
+class PartitionedS3Writer:
+    """Route events into rolling JSON Lines files per partition.
+
+    Each partition has one open :class:`S3StreamWriter`; once a file reaches
+    ``target_file_bytes`` it is closed and the next event starts a new part.
+    At most ``max_open_partitions`` files stay open, and the least recently
+    written one is closed when another partition needs a slot, bounding the
+    upload buffers held in memory.
+    """
+
+    client: Any
+    bucket: str
+    prefix: str = "processed"
+    sensor_buckets: int = DEFAULT_SENSOR_BUCKETS
+    target_file_bytes: int = DEFAULT_TARGET_FILE_BYTES
+    max_open_partitions: int = 64
+    gzip: bool = False
+    run_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    metrics: MetricRegistry = field(default_factory=MetricRegistry)
+    _open: "OrderedDict[str, S3StreamWriter]" = field(
+        default_factory=OrderedDict, repr=False
+    )
+    _parts: dict = field(default_factory=dict, repr=False)
+    _keys: List[str] = field(default_factory=list, repr=False)
+
+    @property
+    def keys(self) -> List[str]:
+        """Keys of every file started so far, in creation order."""
+        return list(self._keys)
+
+    def write(self, event: EventPayload) -> None:
+        partition = partition_path(event, self.sensor_buckets)
+        writer = self._writer(partition)
+        if writer.tell():
+            writer.write(b"\n")
+        writer.write(JSON_CODEC.encode(event))
+        if writer.tell() >= self.target_file_bytes:
+            self._close(partition)
+
+    def write_many(self, events: Iterable[EventPayload]) -> None:
+        for event in events:
+            self.write(event)
+
+    def close(self) -> List[str]:
+        for partition in list(self._open):
+            self._close(partition)
+        return self.keys
+
+    def abort(self) -> None:
+        writers, self._open = self._open, OrderedDict()
+        for writer in writers.values():
+            writer.abort()
+
+    def _writer(self, partition: str) -> S3StreamWriter:
+        writer: Optional[S3StreamWriter] = self._open.get(partition)
+        if writer is not None:
+            self._open.move_to_end(partition)
+            return writer
+        if len(self._open) >= self.max_open_partitions:
+            self._close(next(iter(self._open)))
+        part = self._parts.get(partition, 0)
+        self._parts[partition] = part + 1
+        suffix = ".jsonl.gz" if self.gzip else ".jsonl"
+        key = f"{self.prefix}/{partition}/part-{self.run_id}-{part:05d}{suffix}"
+        writer = S3StreamWriter(
+            self.client,
+            self.bucket,
+            key,
+            gzip=self.gzip,
+            metrics=self.metrics,
+        )
+        self._open[partition] = writer
+        self._keys.append(key)
+        return writer
+
+    def _close(self, partition: str) -> None:
+        self._open.pop(partition).close()
+        self.metrics.increment("s3.partitioned.files")
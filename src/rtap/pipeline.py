@@ -3,22 +3,45 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+import functools
+from itertools import islice
 import json
 from pathlib import Path
+import posixpath
 import random
+import threading
 import time
-from typing import Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 import boto3
 import rtap.aws  # noqa: F401
 
+from .aggregates import RunningAggregate
+from .aggregation import RecordAggregator, deaggregate, list_shard_ranges
+from .artifacts import S3StreamWriter
+from .batching import BATCH_STAGES, MicroBatcher
+from .checkpoint import DynamoDBCheckpointStore, ShardCheckpointer
+from .codecs import JSON_CODEC, RecordCodec, decode_record, get_codec
+from .columnar import EventBatch
 from .config import RuntimeConfig
+from .consumer import ParallelShardConsumer, ShardReader, list_shard_ids
 from .health import HealthStatus, build_health_status
+from .ingest import KinesisBatchWriter
+from .loadgen import LoadGenerator
 from .logging_utils import LogContext, configure_logging
 from .metrics import MetricRegistry
+from .partitioning import PartitionedS3Writer
 from .plugins.base import EventPayload
 from .plugins.loader import PluginRegistry
+from .plugins.parallel import ProcessPoolPluginRunner
 from .policy import PolicyEngine
+from .segments import SEGMENT_CONTENT_TYPE, SegmentWriter
+from .sinks import (
+    DynamoDBBatchWriter,
+    LambdaBatchSink,
+    UnwrittenItemsError,
+    to_dynamodb_item,
+)
 from .tracing import TraceRecorder
 
 
@@ -40,20 +63,44 @@ class EventGenerator:
     max_humidity: float = 70.0
 
     def generate(self, count: int) -> List[EventPayload]:
+        return list(self.iter_events(count))
+
+    def iter_events(self, count: int) -> Iterator[EventPayload]:
+        """Lazily yield the same events :meth:`generate` returns."""
         rng = random.Random(self.seed)
-        events: List[EventPayload] = []
         for _ in range(count):
-            events.append(
-                EventPayload(
-                    sensor_id=rng.randint(1, 5),
-                    temperature=round(rng.uniform(self.min_temp, self.max_temp), 2),
-                    humidity=round(
-                        rng.uniform(self.min_humidity, self.max_humidity), 2
-                    ),
-                    timestamp=int(time.time()),
-                )
+            yield EventPayload(
+                sensor_id=rng.randint(1, 5),
+                temperature=round(rng.uniform(self.min_temp, self.max_temp), 2),
+                humidity=round(rng.uniform(self.min_humidity, self.max_humidity), 2),
+                timestamp=int(time.time()),
             )
-        return events
+
+
+def _raise_unwritten(table_name: str, failed: List[Dict[str, Any]]) -> None:
+    """Fail the run rather than checkpoint past items DynamoDB never stored."""
+    if failed:
+        raise UnwrittenItemsError(table_name, failed)
+
+
+def _chunked(
+    items: Iterable[EventPayload], size: int
+) -> Iterator[List[EventPayload]]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def segment_key(report_key: str) -> str:
+    """Key of the columnar segment written next to ``report_key``."""
+    return posixpath.splitext(report_key)[0] + ".rtseg"
+
+
+def _encoded_size(event: EventPayload) -> int:
+    return len(JSON_CODEC.encode(event))
 
 
 @dataclass
@@ -63,6 +110,35 @@ class Pipeline:
     metrics: MetricRegistry = field(default_factory=MetricRegistry)
     trace: TraceRecorder = field(default_factory=TraceRecorder)
     policy: Optional[PolicyEngine] = None
+    _lambda_sink: Optional[LambdaBatchSink] = field(
+        default=None, init=False, repr=False
+    )
+    _aggregate: RunningAggregate = field(
+        default_factory=RunningAggregate, init=False, repr=False
+    )
+    _aggregate_lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+    _store_batchers: Dict[str, MicroBatcher] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _plugin_runner: Optional[ProcessPoolPluginRunner] = field(
+        default=None, init=False, repr=False
+    )
+    _plugin_batcher: Optional[MicroBatcher] = field(
+        default=None, init=False, repr=False
+    )
+    _plugin_output: List[EventPayload] = field(
+        default_factory=list, init=False, repr=False
+    )
+    _plugin_lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+    _codec: RecordCodec = field(default=JSON_CODEC, init=False, repr=False)
+    _partitioned: Optional[PartitionedS3Writer] = field(
+        default=None, init=False, repr=False
+    )
+    _segment: Optional[SegmentWriter] = field(default=None, init=False, repr=False)
 
     def __post_init__(self) -> None:
         self.metrics.enabled = self.config.metrics_enabled
@@ -74,6 +150,13 @@ class Pipeline:
                 self.policy = PolicyEngine.from_allowlist(self.config.policy_allowlist)
             else:
                 self.policy = PolicyEngine()
+        self._codec = get_codec(self.config.codec)
+        if self.config.plugin_in_place:
+            # Consumed payloads are decoded fresh and owned by the pipeline.
+            self.plugins.mutate_in_place = True
+        unknown = set(self.config.batch_stages) - set(BATCH_STAGES)
+        if unknown:
+            raise ValueError(f"Unknown batch stage: {', '.join(sorted(unknown))}")
 
     def _clients(self):
         return {
@@ -87,7 +170,9 @@ class Pipeline:
         self, stream_name: str, bucket_name: str, table_name: str
     ) -> None:
         clients = self._clients()
-        clients["kinesis"].create_stream(StreamName=stream_name, ShardCount=1)
+        clients["kinesis"].create_stream(
+            StreamName=stream_name, ShardCount=self.config.shard_count
+        )
         clients["s3"].create_bucket(Bucket=bucket_name)
         clients["dynamodb"].create_table(
             TableName=table_name,
@@ -102,20 +187,189 @@ class Pipeline:
             ProvisionedThroughput={"ReadCapacityUnits": 1, "WriteCapacityUnits": 1},
         )
 
+    def _process_records(
+        self, records: List[dict], metrics: MetricRegistry
+    ) -> List[EventPayload]:
+        if self.config.columnar:
+            return self._process_columnar(records, metrics)
+        # Each record names its own format, so mixed streams decode cleanly.
+        events = [
+            decode_record(data)
+            for record in records
+            for data in deaggregate(record["Data"])
+        ]
+        return self._finish_events(self._apply_plugins(events, metrics), metrics)
+
+    def _finish_events(
+        self, events: Iterable[EventPayload], metrics: MetricRegistry
+    ) -> List[EventPayload]:
+        """Apply the policy to transformed events and aggregate the rest."""
+        processed: List[EventPayload] = []
+        aggregate = RunningAggregate()
+        for processed_event in events:
+            if self.policy is not None:
+                decision = self.policy.evaluate(processed_event)
+                if not decision.allowed:
+                    metrics.increment("policy.denied")
+                    continue
+                metrics.increment("policy.allowed")
+            processed.append(processed_event)
+            aggregate.update(processed_event)
+            metrics.increment("kinesis.records.received")
+        with self._aggregate_lock:
+            self._aggregate.merge(aggregate)
+        return processed
+
+    def _process_columnar(
+        self, records: List[dict], metrics: MetricRegistry
+    ) -> List[EventPayload]:
+        """Decode, transform, filter and aggregate records column-wise."""
+        batch = EventBatch.from_events(
+            [
+                decode_record(data)
+                for record in records
+                for data in deaggregate(record["Data"])
+            ]
+        )
+        batch = self.plugins.process_batch(batch)
+        if self.policy is not None:
+            mask = self.policy.evaluate_batch(batch)
+            allowed = int(sum(mask))
+            if len(batch) - allowed:
+                metrics.increment("policy.denied", len(batch) - allowed)
+            if allowed:
+                metrics.increment("policy.allowed", allowed)
+            batch = batch.select(mask)
+        aggregate = RunningAggregate()
+        aggregate.update_batch(batch)
+        if len(batch):
+            metrics.increment("kinesis.records.received", len(batch))
+        with self._aggregate_lock:
+            self._aggregate.merge(aggregate)
+        return batch.to_events()
+
+    def _apply_plugins(
+        self, events: List[EventPayload], metrics: MetricRegistry
+    ) -> List[EventPayload]:
+        """Transform events, returning those the plugins stage has finished.
+
+        With plugin micro-batching, events wait in the run's batcher until a
+        batch fills up, so they can come out of a later call (or out of
+        :meth:`_drain_plugins`) than the one that added them.
+        """
+        runner = self._plugin_runner
+        batcher = self._plugin_batcher
+        if batcher is None:
+            if runner is not None:
+                return runner.process_many(events, metrics)
+            chain = self.plugins.compile()
+            return [chain(event) for event in events]
+        with self._plugin_lock:
+            batcher.add_many(events)
+            batcher.poll()
+            transformed, self._plugin_output = self._plugin_output, []
+        return transformed
+
+    def _drain_plugins(self) -> List[EventPayload]:
+        """Flush the plugins micro-batcher and finish what it still held."""
+        batcher = self._plugin_batcher
+        if batcher is None:
+            return []
+        with self._plugin_lock:
+            batcher.close()
+            transformed, self._plugin_output = self._plugin_output, []
+        return self._finish_events(transformed, self.metrics)
+
+    def _microbatcher(self, stage: str, sink) -> MicroBatcher[EventPayload]:
+        return MicroBatcher(
+            sink,
+            name=stage,
+            max_items=self.config.batch_max_events,
+            max_bytes=self.config.batch_max_bytes or None,
+            max_delay_ms=self.config.batch_max_delay_ms or None,
+            sizer=_encoded_size,
+            metrics=self.metrics,
+        )
+
+    def _ingest_batched(
+        self,
+        client,
+        stream_name: str,
+        events: Iterable[EventPayload],
+        partition_key: Optional[str],
+        logger,
+    ) -> None:
+        writer = KinesisBatchWriter(client, stream_name, metrics=self.metrics)
+        failed = writer.put_many(
+            (self._codec.encode(event), partition_key or str(event.sensor_id))
+            for event in events
+        )
+        if failed:
+            logger.warning(
+                "Records dropped after put_records retries",
+                extra={"rtap_failed": len(failed)},
+            )
+
+    def _ingest_aggregated(
+        self,
+        client,
+        stream_name: str,
+        events: Iterable[EventPayload],
+        partition_key: Optional[str],
+        logger,
+    ) -> None:
+        """Pack events into per-shard aggregated records before sending."""
+        aggregator = RecordAggregator(
+            list_shard_ranges(client, stream_name), metrics=self.metrics
+        )
+        records = []
+        for event in events:
+            records.extend(
+                aggregator.add(
+                    self._codec.encode(event), partition_key or str(event.sensor_id)
+                )
+            )
+        records.extend(aggregator.flush())
+        if self.config.batch_ingest:
+            writer = KinesisBatchWriter(client, stream_name, metrics=self.metrics)
+            failed = writer.put_many(records)
+            if failed:
+                logger.warning(
+                    "Records dropped after put_records retries",
+                    extra={"rtap_failed": len(failed)},
+                )
+            return
+        for record in records:
+            request = {
+                "StreamName": stream_name,
+                "Data": record.data,
+                "PartitionKey": record.partition_key,
+            }
+            if record.explicit_hash_key is not None:
+                request["ExplicitHashKey"] = record.explicit_hash_key
+            client.put_record(**request)
+            self.metrics.increment("kinesis.records.sent")
+
+    def _open_artifact(self, bucket_name: str, key: str) -> S3StreamWriter:
+        return S3StreamWriter(
+            boto3.client("s3"),
+            bucket_name,
+            key,
+            gzip=self.config.s3_gzip,
+            metrics=self.metrics,
+        )
+
     def _write_events_to_s3(
         self, bucket_name: str, key: str, events: Iterable[EventPayload]
-    ) -> None:
-        body = "\n".join(json.dumps(event.as_dict()) for event in events)
-        boto3.client("s3").put_object(Bucket=bucket_name, Key=key, Body=body)
+    ) -> S3StreamWriter:
+        with self._open_artifact(bucket_name, key) as body:
+            self._emit(body, events)
+        return body
 
     def _store_event_in_dynamodb(self, table_name: str, payload: EventPayload) -> None:
-        item = {
-            "sensor_id": {"S": str(payload.sensor_id)},
-            "timestamp": {"N": str(payload.timestamp)},
-            "temperature": {"N": str(payload.temperature)},
-            "humidity": {"N": str(payload.humidity)},
-        }
-        boto3.client("dynamodb").put_item(TableName=table_name, Item=item)
+        boto3.client("dynamodb").put_item(
+            TableName=table_name, Item=to_dynamodb_item(payload)
+        )
 
     def _invoke_lambda(
         self, function_name: str, payload: Dict[str, float | int]
@@ -124,6 +378,14 @@ class Pipeline:
             FunctionName=function_name, Payload=json.dumps(payload)
         )
 
+    def _invoke_lambda_batch(
+        self, function_name: str, events: List[EventPayload]
+    ) -> None:
+        """Send one synchronous invocation carrying ``{"events": [...]}``."""
+        self._invoke_lambda(
+            function_name, {"events": [event.as_dict() for event in events]}
+        )
+
     def run(
         self,
         *,
@@ -131,7 +393,7 @@ class Pipeline:
         bucket_name: str,
         table_name: str,
         event_count: int = 5,
-        partition_key: str = "demo",
+        partition_key: Optional[str] = None,
         report_key: str = "reports/summary.json",
         trace_key: str = "reports/trace.jsonl",
         artifact_dir: Optional[Path] = None,
@@ -150,66 +412,96 @@ class Pipeline:
         with self.metrics.time("pipeline.setup"):
             self._ensure_resources(stream_name, bucket_name, table_name)
 
-        generator = EventGenerator(seed=seed)
-        events = generator.generate(event_count)
+        generator = self._event_source(seed)
         clients = self._clients()
+        readers = self._readers(clients, stream_name)
 
-        with self.metrics.time("pipeline.ingest"):
-            for event in events:
-                clients["kinesis"].put_record(
-                    StreamName=stream_name,
-                    Data=json.dumps(event.as_dict()),
-                    PartitionKey=partition_key,
+        self._aggregate = RunningAggregate()
+        self._open_plugin_runner()
+        self._open_lambda_sink()
+        self._open_store_batchers(table_name)
+        self._open_outputs(bucket_name, report_key)
+        try:
+            if self.config.streaming:
+                events_processed, report = self._run_streaming(
+                    clients,
+                    readers,
+                    generator.iter_events(event_count),
+                    stream_name=stream_name,
+                    bucket_name=bucket_name,
+                    table_name=table_name,
+                    partition_key=partition_key,
+                    report_key=report_key,
+                    trace_key=trace_key,
+                    logger=logger,
                 )
-                self.metrics.increment("kinesis.records.sent")
+            else:
+                events = generator.generate(event_count)
+                self._ingest(clients, stream_name, events, partition_key, logger)
+                processed = self._consume(readers)
+                processed.extend(self._drain_plugins())
+                self._store(table_name, processed)
+                self._close_store_batchers()
 
-        shard_iterator = clients["kinesis"].get_shard_iterator(
-            StreamName=stream_name,
-            ShardId="shardId-000000000000",
-            ShardIteratorType="TRIM_HORIZON",
-        )["ShardIterator"]
+                report = self._aggregate.summary()
+                self._write_events_to_s3(
+                    bucket_name, report_key, processed
+                ).copy_to(trace_key)
+                events_processed = len(processed)
+            self._close_outputs()
+            self._close_lambda_sink()
+            self._checkpoint(readers, flush=True)
+        finally:
+            self._abort_outputs()
+            self._close_store_batchers()
+            self._close_lambda_sink()
+            self._close_plugin_runner()
 
-        processed: List[EventPayload] = []
-        with self.metrics.time("pipeline.consume"):
-            while True:
-                response = clients["kinesis"].get_records(
-                    ShardIterator=shard_iterator, Limit=50
-                )
-                records = response.get("Records", [])
-                if not records:
-                    break
-                for record in records:
-                    payload = json.loads(record["Data"])
-                    event = EventPayload(
-                        sensor_id=int(payload["sensor_id"]),
-                        temperature=float(payload["temperature"]),
-                        humidity=float(payload["humidity"]),
-                        timestamp=int(payload["timestamp"]),
-                    )
-                    processed_event = self.plugins.process_all(event)
-                    if self.policy is not None:
-                        decision = self.policy.evaluate(processed_event)
-                        if not decision.allowed:
-                            self.metrics.increment("policy.denied")
-                            continue
-                        self.metrics.increment("policy.allowed")
-                    processed.append(processed_event)
-                    self.metrics.increment("kinesis.records.received")
-                shard_iterator = response.get("NextShardIterator", shard_iterator)
+        logger.info("Pipeline run complete", extra={"rtap_processed": events_processed})
+        return self._result(events_processed, report_key, report)
 
-        with self.metrics.time("pipeline.store"):
-            for event in processed:
-                self._store_event_in_dynamodb(table_name, event)
-                self._invoke_lambda("rtap-processor", event.as_dict())
-
-        report = self._build_report(processed)
-        self._write_events_to_s3(bucket_name, report_key, processed)
-        self._write_events_to_s3(bucket_name, trace_key, processed)
+    def _event_source(self, seed: int) -> EventGenerator | LoadGenerator:
+        """Pick the load generator when RTAP_LOAD_SENSORS asks for it."""
+        if self.config.load_sensors:
+            return LoadGenerator(
+                seed=seed,
+                sensor_count=self.config.load_sensors,
+                zipf_exponent=self.config.load_zipf,
+                anomaly_rate=self.config.load_anomaly_rate,
+            )
+        return EventGenerator(seed=seed)
 
-        if self.trace.enabled:
-            for event in processed:
-                self.trace.record_event("event.processed", payload=event.as_dict())
+    def _readers(self, clients, stream_name: str) -> List[ShardReader]:
+        store = None
+        if self.config.checkpoint_table:
+            store = DynamoDBCheckpointStore(
+                clients["dynamodb"], self.config.checkpoint_table
+            )
+            store.ensure_table()
+        readers = []
+        for shard_id in list_shard_ids(clients["kinesis"], stream_name):
+            checkpointer = None
+            if store is not None:
+                checkpointer = ShardCheckpointer(
+                    store,
+                    stream_name,
+                    shard_id,
+                    interval=self.config.checkpoint_interval,
+                    metrics=self.metrics,
+                )
+            readers.append(
+                ShardReader(
+                    clients["kinesis"],
+                    stream_name,
+                    shard_id,
+                    checkpointer=checkpointer,
+                )
+            )
+        return readers
 
+    def _result(
+        self, events_processed: int, report_key: str, report: Dict[str, float | int]
+    ) -> PipelineResult:
         metrics_snapshot = self.metrics.snapshot().summary()
         health = build_health_status(
             {
@@ -219,28 +511,259 @@ class Pipeline:
                 "lambda": True,
             }
         )
-
-        logger.info("Pipeline run complete", extra={"rtap_processed": len(processed)})
         return PipelineResult(
-            events_processed=len(processed),
+            events_processed=events_processed,
             s3_object_key=report_key,
             report=report,
             metrics_snapshot=metrics_snapshot,
             health=health,
         )
 
-    def _build_report(self, events: Iterable[EventPayload]) -> Dict[str, float | int]:
-        events_list = list(events)
-        if not events_list:
-            return {"event_count": 0}
-        avg_temp = sum(event.temperature for event in events_list) / len(events_list)
-        avg_humidity = sum(event.humidity for event in events_list) / len(events_list)
-        max_temp = max(event.temperature for event in events_list)
-        min_temp = min(event.temperature for event in events_list)
-        return {
-            "event_count": len(events_list),
-            "avg_temperature": round(avg_temp, 2),
-            "avg_humidity": round(avg_humidity, 2),
-            "max_temperature": max_temp,
-            "min_temperature": min_temp,
-        }
+    def _run_streaming(
+        self,
+        clients,
+        readers: List[ShardReader],
+        events: Iterable[EventPayload],
+        *,
+        stream_name: str,
+        bucket_name: str,
+        table_name: str,
+        partition_key: Optional[str],
+        report_key: str,
+        trace_key: str,
+        logger,
+    ) -> tuple[int, Dict[str, float | int]]:
+        """Push events through ingest, consume and store one window at a time.
+
+        Only the current window of ``stream_window`` events is held in
+        memory; the S3 body is uploaded in multipart chunks as it grows and
+        the report is accumulated as events pass.
+        """
+        with self._open_artifact(bucket_name, report_key) as body:
+            for window in _chunked(events, self.config.stream_window):
+                self._ingest(clients, stream_name, window, partition_key, logger)
+                processed = self._consume(readers)
+                self._store(table_name, processed)
+                self._emit(body, processed)
+                if (
+                    not self._store_batchers
+                    and self._lambda_sink is None
+                    and self._plugin_batcher is None
+                ):
+                    # Nothing is left buffered, so the window is stored.
+                    self._checkpoint(readers)
+            remaining = self._drain_plugins()
+            if remaining:
+                self._store(table_name, remaining)
+                self._emit(body, remaining)
+            self._close_store_batchers()
+        body.copy_to(trace_key)
+        return self._aggregate.count, self._aggregate.summary()
+
+    def _emit(self, body: S3StreamWriter, events: Iterable[EventPayload]) -> None:
+        """Serialize each event once into the JSONL artifact and the trace."""
+        partitioned = self._partitioned
+        segment = self._segment
+        for event in events:
+            payload = event.as_dict()
+            if body.tell():
+                body.write(b"\n")
+            body.write(JSON_CODEC.dumps(payload))
+            if partitioned is not None:
+                partitioned.write(event)
+            if segment is not None:
+                segment.append(event)
+            if self.trace.enabled:
+                self.trace.record_event("event.processed", payload=payload)
+
+    def _ingest(
+        self,
+        clients,
+        stream_name: str,
+        events: Iterable[EventPayload],
+        partition_key: Optional[str],
+        logger,
+    ) -> None:
+        with self.metrics.time("pipeline.ingest"):
+            if self.config.kinesis_aggregation:
+                self._ingest_aggregated(
+                    clients["kinesis"], stream_name, events, partition_key, logger
+                )
+                return
+            if self.config.batch_ingest:
+                self._ingest_batched(
+                    clients["kinesis"], stream_name, events, partition_key, logger
+                )
+                return
+            for event in events:
+                clients["kinesis"].put_record(
+                    StreamName=stream_name,
+                    Data=self._codec.encode(event),
+                    PartitionKey=partition_key or str(event.sensor_id),
+                )
+                self.metrics.increment("kinesis.records.sent")
+
+    def _consume(self, readers: List[ShardReader]) -> List[EventPayload]:
+        with self.metrics.time("pipeline.consume"):
+            return ParallelShardConsumer(
+                readers,
+                self._process_records,
+                metrics=self.metrics,
+                max_workers=self.config.consumer_workers or None,
+            ).run()
+
+    def _checkpoint(self, readers: List[ShardReader], flush: bool = False) -> None:
+        """Checkpoint the shards once what was read from them is stored.
+
+        Checkpointing only after the store stage keeps delivery at least
+        once: a run that fails before this point re-reads the records.
+        """
+        for reader in readers:
+            reader.checkpoint(flush=flush)
+
+    def _store(self, table_name: str, events: Iterable[EventPayload]) -> None:
+        with self.metrics.time("pipeline.store"):
+            dynamodb_batcher = self._store_batchers.get("dynamodb")
+            lambda_batcher = self._store_batchers.get("lambda")
+            writer = None
+            if dynamodb_batcher is None and self.config.dynamodb_batch:
+                writer = DynamoDBBatchWriter(
+                    boto3.client("dynamodb"), table_name, metrics=self.metrics
+                )
+            for event in events:
+                if dynamodb_batcher is not None:
+                    dynamodb_batcher.add(event)
+                elif writer is not None:
+                    _raise_unwritten(table_name, writer.write(event))
+                else:
+                    self._store_event_in_dynamodb(table_name, event)
+                if lambda_batcher is not None:
+                    lambda_batcher.add(event)
+                elif self._lambda_sink is not None:
+                    self._lambda_sink.write(event)
+                else:
+                    self._invoke_lambda("rtap-processor", event.as_dict())
+            for batcher in self._store_batchers.values():
+                batcher.poll()
+            if writer is not None:
+                _raise_unwritten(table_name, writer.close())
+            if self._lambda_sink is not None and lambda_batcher is None:
+                self._lambda_sink.flush()
+
+    def _open_store_batchers(self, table_name: str) -> None:
+        """Create the sink micro-batchers, which live for the whole run.
+
+        Keeping them across windows lets a batch fill up from several small
+        windows until it hits the size, byte or delay bound.
+        """
+        stages = self.config.batch_stages
+        if "dynamodb" in stages:
+            writer = DynamoDBBatchWriter(
+                boto3.client("dynamodb"), table_name, metrics=self.metrics
+            )
+            self._store_batchers["dynamodb"] = self._microbatcher(
+                "dynamodb",
+                lambda events: _raise_unwritten(table_name, writer.write_many(events)),
+            )
+        if "lambda" in stages:
+            if self._lambda_sink is not None:
+                sink = self._lambda_sink.write_many
+            else:
+                sink = functools.partial(self._invoke_lambda_batch, "rtap-processor")
+            self._store_batchers["lambda"] = self._microbatcher("lambda", sink)
+
+    def _close_store_batchers(self) -> None:
+        batchers, self._store_batchers = self._store_batchers, {}
+        for batcher in batchers.values():
+            batcher.close()
+
+    def _open_outputs(self, bucket_name: str, report_key: str) -> None:
+        """Open the optional partitioned and segment copies of the artifact."""
+        if self.config.partitioned_output:
+            self._partitioned = PartitionedS3Writer(
+                boto3.client("s3"),
+                bucket_name,
+                sensor_buckets=self.config.partition_sensor_buckets,
+                target_file_bytes=self.config.partition_file_bytes,
+                gzip=self.config.s3_gzip,
+                metrics=self.metrics,
+            )
+        if self.config.segment_output:
+            body = S3StreamWriter(
+                boto3.client("s3"),
+                bucket_name,
+                segment_key(report_key),
+                content_type=SEGMENT_CONTENT_TYPE,
+                metrics=self.metrics,
+            )
+            self._segment = SegmentWriter(
+                body, block_rows=self.config.segment_block_rows
+            )
+
+    def _close_outputs(self) -> None:
+        if self._partitioned is not None:
+            with self.metrics.time("pipeline.partitioned_output"):
+                self._partitioned.close()
+            self._partitioned = None
+        if self._segment is not None:
+            self._segment.close()
+            self._segment.sink.close()
+            self._segment = None
+
+    def _abort_outputs(self) -> None:
+        """Drop unfinished partition and segment files when the run fails."""
+        if self._partitioned is not None:
+            self._partitioned.abort()
+            self._partitioned = None
+        if self._segment is not None:
+            self._segment.sink.abort()
+            self._segment = None
+
+    def _open_lambda_sink(self) -> None:
+        if self.config.lambda_async:
+            self._lambda_sink = LambdaBatchSink(
+                boto3.client("lambda"),
+                "rtap-processor",
+                metrics=self.metrics,
+                max_concurrency=self.config.lambda_concurrency,
+            )
+
+    def _open_plugin_runner(self) -> None:
+        """Start the plugin workers and the run-long plugins micro-batcher.
+
+        Like the store batchers, the plugins batcher lives for the whole run
+        so a batch fills up from several polls and shards.
+        """
+        if self.config.plugin_workers and self.plugins.plugins:
+            self._plugin_runner = ProcessPoolPluginRunner(
+                self.plugins.plugins,
+                max_workers=self.config.plugin_workers,
+                metrics=self.metrics,
+            )
+        if "plugins" in self.config.batch_stages:
+            runner = self._plugin_runner
+
+            def process(batch: List[EventPayload]) -> None:
+                if runner is not None:
+                    self._plugin_output.extend(runner.process_many(batch, self.metrics))
+                else:
+                    self._plugin_output.extend(self.plugins.process_many(batch))
+
+            self._plugin_batcher = self._microbatcher("plugins", process)
+
+    def _close_plugin_runner(self) -> None:
+        # Anything still batched here belongs to a failed run and is dropped;
+        # its records were not checkpointed.
+        self._plugin_batcher = None
+        self._plugin_output = []
+        if self._plugin_runner is not None:
+            self._plugin_runner.close()
+            self._plugin_runner = None
+
+    def _close_lambda_sink(self) -> None:
+        """Wait for in-flight Lambda invocations before the run reports."""
+        if self._lambda_sink is None:
+            return
+        with self.metrics.time("pipeline.lambda_drain"):
+            self._lambda_sink.close()
+        self._lambda_sink = None
@@ -6,8 +6,13 @@ from dataclasses import dataclass
 from typing import Dict, Protocol
 
 
-@dataclass
+@dataclass(slots=True)
 class EventPayload:
+    """One sensor reading.
+
+    Slotted so each retained event carries no per-instance ``__dict__``.
+    """
+
     sensor_id: int
     temperature: float
     humidity: float
@@ -28,3 +33,16 @@ class Plugin(Protocol):
     def process(self, payload: EventPayload) -> EventPayload:
         """Return a transformed payload."""
         raise NotImplementedError
+
+
+class InPlacePlugin(Plugin, Protocol):
+    """A plugin that can also transform a payload by mutating it.
+
+    Plugins opt in by implementing ``process_in_place``; the registry only
+    calls it when it owns the payloads (``mutate_in_place=True``), so the
+    plugin never has to copy.
+    """
+
+    def process_in_place(self, payload: EventPayload) -> None:
+        """Update ``payload`` in place."""
+        raise NotImplementedError
@@ -3,37 +3,95 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Callable, Dict
 
+from ..columnar import EventBatch, np, round_column, round_value
 from .base import EventPayload
 
+FieldTransform = Callable[[float], float]
+
+
+def normalize_temperature(value: float) -> float:
+    """Convert Fahrenheit-looking readings (above 60) to Celsius."""
+    return round_value((value - 32) * 5 / 9 if value > 60 else value)
+
+
+def clamp_humidity(value: float) -> float:
+    return round_value(min(max(value, 0.0), 100.0))
+
 
 @dataclass
 class NormalizeTemperaturePlugin:
     name: str = "normalize_temperature"
 
+    def field_transforms(self) -> Dict[str, FieldTransform]:
+        return {"temperature": normalize_temperature}
+
     def process(self, payload: EventPayload) -> EventPayload:
-        normalized = (
-            (payload.temperature - 32) * 5 / 9
-            if payload.temperature > 60
-            else payload.temperature
-        )
         return EventPayload(
             sensor_id=payload.sensor_id,
-            temperature=round(normalized, 2),
+            temperature=normalize_temperature(payload.temperature),
             humidity=payload.humidity,
             timestamp=payload.timestamp,
         )
 
+    def process_in_place(self, payload: EventPayload) -> None:
+        payload.temperature = normalize_temperature(payload.temperature)
+
+    def process_batch(self, batch: EventBatch) -> EventBatch:
+        temperature = batch.temperature
+        if np is not None:
+            normalized = np.where(
+                temperature > 60, (temperature - 32) * 5 / 9, temperature
+            )
+            return batch.replace(temperature=round_column(normalized))
+        return batch.replace(
+            temperature=[normalize_temperature(value) for value in temperature]
+        )
+
 
 @dataclass
 class HumidityClampPlugin:
     name: str = "clamp_humidity"
 
+    def field_transforms(self) -> Dict[str, FieldTransform]:
+        return {"humidity": clamp_humidity}
+
     def process(self, payload: EventPayload) -> EventPayload:
-        clamped = min(max(payload.humidity, 0.0), 100.0)
         return EventPayload(
             sensor_id=payload.sensor_id,
             temperature=payload.temperature,
-            humidity=round(clamped, 2),
+            humidity=clamp_humidity(payload.humidity),
             timestamp=payload.timestamp,
         )
+
+    def process_in_place(self, payload: EventPayload) -> None:
+        payload.humidity = clamp_humidity(payload.humidity)
+
+    def process_batch(self, batch: EventBatch) -> EventBatch:
+        if np is not None:
+            return batch.replace(
+                humidity=round_column(np.clip(batch.humidity, 0.0, 100.0))
+            )
+        return batch.replace(
+            humidity=[clamp_humidity(value) for value in batch.humidity]
+        )
+
+
+@dataclass
+class PassthroughPlugin:
+    """Leave payloads unchanged; compiled chains drop it entirely."""
+
+    name: str = "passthrough"
+
+    def field_transforms(self) -> Dict[str, FieldTransform]:
+        return {}
+
+    def process(self, payload: EventPayload) -> EventPayload:
+        return payload
+
+    def process_in_place(self, payload: EventPayload) -> None:
+        return None
+
+    def process_batch(self, batch: EventBatch) -> EventBatch:
+        return batch
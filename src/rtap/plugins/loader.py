@@ -4,27 +4,88 @@ from __future__ import annotations
 
 import importlib
 from dataclasses import dataclass, field
-from typing import Dict, Iterable, List
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from .base import Plugin
-from .builtin import HumidityClampPlugin, NormalizeTemperaturePlugin
+from ..columnar import EventBatch
+from .base import EventPayload, Plugin
+from .builtin import HumidityClampPlugin, NormalizeTemperaturePlugin, PassthroughPlugin
+from .compiled import Chain, compile_chain
 
 
 BUILTIN_PLUGINS: Dict[str, type[Plugin]] = {
     "normalize_temperature": NormalizeTemperaturePlugin,
     "clamp_humidity": HumidityClampPlugin,
+    "passthrough": PassthroughPlugin,
 }
 
 
 @dataclass
 class PluginRegistry:
-    """Registry for processing plugins."""
+    """Registry for processing plugins.
+
+    With ``mutate_in_place`` the caller promises it owns the payloads it
+    passes in, and plugins that implement ``process_in_place`` update them
+    directly instead of allocating a copy per plugin.
+
+    :meth:`compile` fuses the chain into one callable, cached until the
+    registered plugins change; after :meth:`freeze` registration is closed
+    and :meth:`process_all` always runs the compiled chain, which is
+    recompiled whenever ``mutate_in_place`` changes.
+    """
 
     plugins: List[Plugin] = field(default_factory=list)
+    mutate_in_place: bool = False
+    _mutate_in_place: bool = field(default=False, init=False, repr=False)
+    _frozen: bool = field(default=False, init=False, repr=False)
+    _compiled: Optional[Chain] = field(default=None, init=False, repr=False)
+    # The compiled plugins and mode; holding the plugins keeps them alive,
+    # so a new plugin can never be mistaken for one that was collected.
+    _compiled_key: Optional[Tuple[Tuple[Plugin, ...], bool]] = field(
+        default=None, init=False, repr=False
+    )
+
+    @property  # type: ignore[no-redef]
+    def mutate_in_place(self) -> bool:
+        return self._mutate_in_place
+
+    @mutate_in_place.setter
+    def mutate_in_place(self, value: bool) -> None:
+        if isinstance(value, property):
+            # The dataclass default when the argument is omitted.
+            value = False
+        self._mutate_in_place = value
+        # The frozen chain is bound to the mode it was compiled for.
+        if self._frozen:
+            self.compile()
+
+    @property
+    def frozen(self) -> bool:
+        return self._frozen
 
     def register(self, plugin: Plugin) -> None:
+        if self._frozen:
+            raise RuntimeError("PluginRegistry is frozen")
         self.plugins.append(plugin)
 
+    def freeze(self) -> Chain:
+        """Close registration and return the compiled chain."""
+        self._frozen = True
+        return self.compile()
+
+    def compile(self) -> Chain:
+        if self._compiled is None or not self._is_current():
+            self._compiled = compile_chain(self.plugins, in_place=self.mutate_in_place)
+            self._compiled_key = (tuple(self.plugins), self.mutate_in_place)
+        return self._compiled
+
+    def _is_current(self) -> bool:
+        compiled, in_place = self._compiled_key
+        return (
+            in_place == self.mutate_in_place
+            and len(compiled) == len(self.plugins)
+            and all(old is new for old, new in zip(compiled, self.plugins))
+        )
+
     def register_builtin(self, names: Iterable[str]) -> None:
         for name in names:
             cls = BUILTIN_PLUGINS.get(name)
@@ -39,6 +100,36 @@ class PluginRegistry:
         self.register(plugin_cls())
 
     def process_all(self, payload):
+        if self._frozen:
+            return self._compiled(payload)
         for plugin in self.plugins:
-            payload = plugin.process(payload)
+            if self.mutate_in_place and hasattr(plugin, "process_in_place"):
+                plugin.process_in_place(payload)
+            else:
+                payload = plugin.process(payload)
         return payload
+
+    def process_many(self, payloads: Iterable[EventPayload]) -> List[EventPayload]:
+        """Run a batch through every plugin.
+
+        When any plugin implements ``process_batch`` the batch is converted
+        to a columnar :class:`EventBatch` once and handed through
+        :meth:`process_batch`; otherwise plugins run per payload.
+        """
+        batch = list(payloads)
+        if any(hasattr(plugin, "process_batch") for plugin in self.plugins):
+            return self.process_batch(EventBatch.from_events(batch)).to_events()
+        chain = self.compile()
+        return [chain(payload) for payload in batch]
+
+    def process_batch(self, batch: EventBatch) -> EventBatch:
+        """Transform a columnar batch, column-wise where plugins support it."""
+        for plugin in self.plugins:
+            process_batch = getattr(plugin, "process_batch", None)
+            if process_batch is not None:
+                batch = process_batch(batch)
+            else:
+                batch = EventBatch.from_events(
+                    [plugin.process(payload) for payload in batch.to_events()]
+                )
+        return batch
@@ -4,8 +4,9 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from enum import Enum
-from typing import Iterable, Set
+from typing import Any, Iterable, Set
 
+from .columnar import EventBatch, np
 from .plugins.base import EventPayload
 
 
@@ -42,6 +43,25 @@ class PolicyEngine:
             return PolicyDecision(False, RiskLevel.medium, "humidity above threshold")
         return PolicyDecision(True, RiskLevel.low, "within policy")
 
+    def evaluate_batch(self, batch: EventBatch) -> Any:
+        """Return a per-row mask of events the policy allows."""
+        if np is not None:
+            mask = (batch.temperature <= self.max_temperature) & (
+                batch.humidity <= self.max_humidity
+            )
+            if self.allowed_sensors is not None:
+                mask &= np.isin(batch.sensor_id, list(self.allowed_sensors))
+            return mask
+        allowed = self.allowed_sensors
+        return [
+            (allowed is None or sensor_id in allowed)
+            and temperature <= self.max_temperature
+            and humidity <= self.max_humidity
+            for sensor_id, temperature, humidity in zip(
+                batch.sensor_id, batch.temperature, batch.humidity
+            )
+        ]
+
     @staticmethod
     def from_allowlist(allowlist: Iterable[int]) -> "PolicyEngine":
         return PolicyEngine(allowed_sensors=set(allowlist))
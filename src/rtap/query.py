@@ -0,0 +1,589 @@
+"""A small SQL engine over processed events stored in S3.
+
+It understands the subset of Athena SQL the analytics workloads use::
+
+    SELECT <column | agg(column) | agg(*) | *> [AS alias], ...
+    FROM [database.]table
+    [WHERE column <op> literal [AND ...]]
+    [GROUP BY column, ...]
+    [ORDER BY output_column [ASC | DESC]]
+    [LIMIT n]
+
+with ``COUNT``, ``SUM``, ``AVG``, ``MIN`` and ``MAX`` aggregates. Tables are
+registered from ``CREATE EXTERNAL TABLE`` statements. Objects are listed
+under the table location; ``key=value`` path segments that contradict the
+WHERE clause are pruned without being read. JSON Lines objects are decoded
+with only the referenced columns kept and rows filtered as they are read;
+columnar segments (``.rtseg``) get the predicate pushed into their zone maps
+and read only the referenced columns.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import gzip
+from itertools import islice
+import operator
+import re
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .codecs import JSON_CODEC
+from .columnar import COLUMN_TYPES
+from .metrics import MetricRegistry
+from .segments import Range, SegmentReader, is_segment
+
+
+AGGREGATES = ("count", "sum", "avg", "min", "max")
+
+_KEYWORDS = {
+    "select",
+    "from",
+    "where",
+    "and",
+    "group",
+    "order",
+    "by",
+    "asc",
+    "desc",
+    "limit",
+    "as",
+}
+_TOKEN = re.compile(
+    r"\s*(?:(?P<number>\d+(?:\.\d+)?)|(?P<string>'(?:[^']|'')*')"
+    r"|(?P<name>[A-Za-z_][A-Za-z0-9_.]*)|(?P<symbol><=|>=|<>|!=|[=<>(),*;-]))"
+)
+_INTEGER_TYPES = {"tinyint", "smallint", "int", "integer", "bigint"}
+_FLOAT_TYPES = {"float", "real", "double"}
+_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<>": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+_CREATE_TABLE = re.compile(
+    r"CREATE\s+EXTERNAL\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(?P<name>[\w.]+)\s*"
+    r"\((?P<columns>[^)]*)\)"
+    r"(?:\s*PARTITIONED\s+BY\s*\((?P<partitions>[^)]*)\))?"
+    r".*?LOCATION\s+'(?P<location>[^']+)'",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+class QuerySyntaxError(ValueError):
+    """Raised for SQL the engine does not understand."""
+
+
+@dataclass(frozen=True)
+class ColumnRef:
+    name: str
+    alias: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class AggregateRef:
+    function: str
+    column: Optional[str]  # None for COUNT(*)
+    alias: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class Condition:
+    column: str
+    op: str
+    value: Any
+
+    def matches(self, value: Any) -> bool:
+        if value is None:
+            return False
+        literal = self.value
+        if isinstance(value, str) and not isinstance(literal, str):
+            try:
+                value = float(value)
+            except ValueError:
+                literal = str(literal)
+        elif isinstance(literal, str) and not isinstance(value, str):
+            value = str(value)
+        return _OPERATORS[self.op](value, literal)
+
+
+@dataclass(frozen=True)
+class Query:
+    items: Tuple[ColumnRef | AggregateRef, ...]
+    table: str
+    where: Tuple[Condition, ...] = ()
+    group_by: Tuple[str, ...] = ()
+    order_by: Optional[Tuple[str, bool]] = None  # (column, descending)
+    limit: Optional[int] = None
+
+    @property
+    def is_aggregate(self) -> bool:
+        return bool(self.group_by) or any(
+            isinstance(item, AggregateRef) for item in self.items
+        )
+
+
+@dataclass
+class Table:
+    name: str
+    location: str
+    columns: Dict[str, str]
+    partition_keys: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def all_columns(self) -> Dict[str, str]:
+        return {**self.columns, **self.partition_keys}
+
+    def bucket_and_prefix(self) -> Tuple[str, str]:
+        if not self.location.startswith("s3://"):
+            raise ValueError(f"Unsupported table location: {self.location}")
+        bucket, _, prefix = self.location[len("s3://") :].partition("/")
+        if prefix and not prefix.endswith("/"):
+            prefix += "/"
+        return bucket, prefix
+
+
+def _column_definitions(text: Optional[str]) -> Dict[str, str]:
+    columns: Dict[str, str] = {}
+    for definition in (text or "").split(","):
+        parts = definition.split()
+        if len(parts) >= 2:
+            columns[parts[0].strip("`\"").lower()] = parts[1].lower()
+    return columns
+
+
+def parse_create_table(sql: str) -> Optional[Table]:
+    """Return the table a ``CREATE EXTERNAL TABLE`` statement defines."""
+    match = _CREATE_TABLE.search(sql)
+    if match is None:
+        return None
+    return Table(
+        name=match["name"].lower(),
+        location=match["location"],
+        columns=_column_definitions(match["columns"]),
+        partition_keys=_column_definitions(match["partitions"]),
+    )
+
+
+def _tokenize(sql: str) -> List[Tuple[str, Any]]:
+    tokens: List[Tuple[str, Any]] = []
+    position = 0
+    sql = sql.rstrip()
+    while position < len(sql):
+        match = _TOKEN.match(sql, position)
+        if match is None or match.end() == position:
+            raise QuerySyntaxError(f"Unexpected input at: {sql[position:][:20]!r}")
+        position = match.end()
+        kind = match.lastgroup
+        text = match[kind]
+        if kind == "number":
+            tokens.append(("number", float(text) if "." in text else int(text)))
+        elif kind == "string":
+            tokens.append(("string", text[1:-1].replace("''", "'")))
+        elif kind == "name" and text.lower() in _KEYWORDS:
+            tokens.append(("keyword", text.lower()))
+        elif kind == "name":
+            tokens.append(("name", text.lower()))
+        elif text != ";":
+            tokens.append(("symbol", text))
+    return tokens
+
+
+class _Parser:
+    def __init__(self, sql: str) -> None:
+        self.tokens = _tokenize(sql)
+        self.position = 0
+
+    def peek(self, kind: str, value: Any = None) -> bool:
+        if self.position >= len(self.tokens):
+            return False
+        token_kind, token_value = self.tokens[self.position]
+        return token_kind == kind and (value is None or token_value == value)
+
+    def accept(self, kind: str, value: Any = None) -> Any:
+        if not self.peek(kind, value):
+            return None
+        self.position += 1
+        return self.tokens[self.position - 1][1]
+
+    def expect(self, kind: str, value: Any = None) -> Any:
+        token = self.accept(kind, value)
+        if token is None:
+            found = (
+                self.tokens[self.position][1]
+                if self.position < len(self.tokens)
+                else "end of query"
+            )
+            raise QuerySyntaxError(f"Expected {value or kind}, found {found!r}")
+        return token
+
+    def parse(self) -> Query:
+        self.expect("keyword", "select")
+        items = [self.item()]
+        while self.accept("symbol", ","):
+            items.append(self.item())
+        self.expect("keyword", "from")
+        table = self.expect("name")
+        where: List[Condition] = []
+        if self.accept("keyword", "where"):
+            where.append(self.condition())
+            while self.accept("keyword", "and"):
+                where.append(self.condition())
+        group_by: List[str] = []
+        if self.accept("keyword", "group"):
+            self.expect("keyword", "by")
+            group_by.append(self.expect("name"))
+            while self.accept("symbol", ","):
+                group_by.append(self.expect("name"))
+        order_by = None
+        if self.accept("keyword", "order"):
+            self.expect("keyword", "by")
+            column = self.expect("name")
+            descending = bool(self.accept("keyword", "desc"))
+            if not descending:
+                self.accept("keyword", "asc")
+            order_by = (column, descending)
+        limit = None
+        if self.accept("keyword", "limit"):
+            limit = self.expect("number")
+        if self.position != len(self.tokens):
+            raise QuerySyntaxError(f"Unexpected {self.tokens[self.position][1]!r}")
+        return Query(
+            tuple(items), table, tuple(where), tuple(group_by), order_by, limit
+        )
+
+    def item(self) -> ColumnRef | AggregateRef:
+        if self.accept("symbol", "*"):
+            return ColumnRef("*")
+        name = self.expect("name")
+        if self.accept("symbol", "("):
+            if name not in AGGREGATES:
+                raise QuerySyntaxError(f"Unsupported function: {name}")
+            column = None if self.accept("symbol", "*") else self.expect("name")
+            if column is None and name != "count":
+                raise QuerySyntaxError(f"{name.upper()}(*) is not supported")
+            self.expect("symbol", ")")
+            return AggregateRef(name, column, self.alias())
+        return ColumnRef(name, self.alias())
+
+    def alias(self) -> Optional[str]:
+        if self.accept("keyword", "as"):
+            return self.expect("name")
+        return self.accept("name")
+
+    def condition(self) -> Condition:
+        column = self.expect("name")
+        op = self.expect("symbol")
+        if op not in _OPERATORS:
+            raise QuerySyntaxError(f"Unsupported operator: {op}")
+        negative = bool(self.accept("symbol", "-"))
+        value = self.accept("number")
+        if value is None:
+            if negative:
+                raise QuerySyntaxError("Expected a number after '-'")
+            value = self.expect("string")
+        return Condition(column, op, -value if negative else value)
+
+
+def parse_query(sql: str) -> Query:
+    return _Parser(sql).parse()
+
+
+class _Accumulator:
+    __slots__ = ("function", "count", "total", "value")
+
+    def __init__(self, function: str) -> None:
+        self.function = function
+        self.count = 0
+        self.total = 0.0
+        self.value: Any = None
+
+    def add(self, value: Any) -> None:
+        if value is None:
+            return
+        self.count += 1
+        if self.function in ("sum", "avg"):
+            self.total += value
+        elif self.function == "min":
+            if self.value is None or value < self.value:
+                self.value = value
+        elif self.function == "max":
+            if self.value is None or value > self.value:
+                self.value = value
+
+    def result(self) -> Any:
+        if self.function == "count":
+            return self.count
+        if self.function == "sum":
+            return self.total if self.count else None
+        if self.function == "avg":
+            return self.total / self.count if self.count else None
+        return self.value
+
+
+@dataclass
+class QueryStats:
+    objects_scanned: int = 0
+    objects_pruned: int = 0
+    bytes_scanned: int = 0
+    rows_scanned: int = 0
+    blocks_skipped: int = 0
+
+
+@dataclass
+class QueryResult:
+    """Column names and types plus a lazily evaluated row iterator.
+
+    ``stats`` is updated while ``rows`` is consumed.
+    """
+
+    columns: List[str]
+    types: List[str]
+    rows: Iterator[Tuple[Any, ...]]
+    stats: QueryStats
+
+
+def _partition_value(value: str, column_type: str) -> Any:
+    """Convert a ``key=value`` path segment to its declared column type."""
+    try:
+        if column_type in _INTEGER_TYPES:
+            return int(value)
+        if column_type in _FLOAT_TYPES or column_type.startswith("decimal"):
+            return float(value)
+    except ValueError:
+        return None
+    return value
+
+
+def _partition_values(
+    relative_key: str, partition_keys: Dict[str, str]
+) -> Dict[str, Any]:
+    values = {}
+    for segment in relative_key.split("/")[:-1]:
+        name, separator, value = segment.partition("=")
+        name = name.lower()
+        if separator and name in partition_keys:
+            values[name] = _partition_value(value, partition_keys[name])
+    return values
+
+
+def _tally_segment(stats: QueryStats, metrics: MetricRegistry) -> None:
+    """Move a segment reader's byte and block counts into ``stats``."""
+    stats.bytes_scanned += metrics.counters.pop("segments.bytes.read", 0)
+    stats.blocks_skipped += metrics.counters.pop("segments.blocks.skipped", 0)
+
+
+def _pushdown_ranges(conditions: Sequence[Condition]) -> Dict[str, Range]:
+    """Inclusive ranges implied by numeric conditions, for zone-map skipping."""
+    ranges: Dict[str, List[Optional[float]]] = {}
+    for condition in conditions:
+        value = condition.value
+        if condition.column not in COLUMN_TYPES or isinstance(value, str):
+            continue
+        low, high = ranges.setdefault(condition.column, [None, None])
+        if condition.op in ("=", ">", ">="):
+            low = value if low is None else max(low, value)
+        if condition.op in ("=", "<", "<="):
+            high = value if high is None else min(high, value)
+        ranges[condition.column] = [low, high]
+    return {name: (low, high) for name, (low, high) in ranges.items()}
+
+
+def _item_type(item: ColumnRef | AggregateRef, available: Dict[str, str]) -> str:
+    if isinstance(item, ColumnRef):
+        return available[item.name]
+    if item.function == "count":
+        return "bigint"
+    if item.function == "avg":
+        return "double"
+    return available[item.column]
+
+
+@dataclass
+class QueryEngine:
+    """Run :class:`Query` objects against tables whose data lives in S3."""
+
+    client: Any
+    metrics: MetricRegistry = field(default_factory=MetricRegistry)
+
+    def execute(self, query: Query | str, table: Table) -> QueryResult:
+        if isinstance(query, str):
+            query = parse_query(query)
+        available = table.all_columns
+        items: List[ColumnRef | AggregateRef] = []
+        for item in query.items:
+            if isinstance(item, ColumnRef) and item.name == "*":
+                items.extend(ColumnRef(name) for name in available)
+            else:
+                items.append(item)
+        referenced = {
+            *(item.column for item in items if isinstance(item, AggregateRef)),
+            *(item.name for item in items if isinstance(item, ColumnRef)),
+            *(condition.column for condition in query.where),
+            *query.group_by,
+        }
+        referenced.discard(None)
+        unknown = referenced - set(available)
+        if unknown:
+            raise QuerySyntaxError(f"Unknown column: {', '.join(sorted(unknown))}")
+        if query.is_aggregate:
+            for item in items:
+                if isinstance(item, ColumnRef) and item.name not in query.group_by:
+                    raise QuerySyntaxError(
+                        f"Column {item.name} must appear in GROUP BY"
+                    )
+        columns = [
+            item.alias
+            or (item.name if isinstance(item, ColumnRef) else f"_col{index}")
+            for index, item in enumerate(items)
+        ]
+        types = [_item_type(item, available) for item in items]
+        order_index = None
+        if query.order_by is not None:
+            name = query.order_by[0]
+            if name not in columns:
+                raise QuerySyntaxError(f"ORDER BY {name} is not a selected column")
+            order_index = columns.index(name)
+
+        stats = QueryStats()
+        rows = self._scan(table, query, sorted(referenced), stats)
+        if query.is_aggregate:
+            output = self._aggregate(rows, items, query.group_by)
+        else:
+            output = (tuple(row[item.name] for item in items) for row in rows)
+        if order_index is not None:
+            output = iter(
+                sorted(
+                    output,
+                    key=lambda row: (row[order_index] is None, row[order_index]),
+                    reverse=query.order_by[1],
+                )
+            )
+        if query.limit is not None:
+            output = islice(output, query.limit)
+        return QueryResult(columns, types, output, stats)
+
+    def _aggregate(
+        self,
+        rows: Iterator[Dict[str, Any]],
+        items: Sequence[ColumnRef | AggregateRef],
+        group_by: Sequence[str],
+    ) -> Iterator[Tuple[Any, ...]]:
+        aggregates = [item for item in items if isinstance(item, AggregateRef)]
+        groups: Dict[Tuple[Any, ...], List[_Accumulator]] = {}
+        for row in rows:
+            key = tuple(row[name] for name in group_by)
+            accumulators = groups.get(key)
+            if accumulators is None:
+                accumulators = groups[key] = [
+                    _Accumulator(item.function) for item in aggregates
+                ]
+            for item, accumulator in zip(aggregates, accumulators):
+                accumulator.add(1 if item.column is None else row[item.column])
+        if not groups and not group_by:
+            groups[()] = [_Accumulator(item.function) for item in aggregates]
+        for key, accumulators in groups.items():
+            keyed = dict(zip(group_by, key))
+            results = iter(accumulator.result() for accumulator in accumulators)
+            yield tuple(
+                keyed[item.name] if isinstance(item, ColumnRef) else next(results)
+                for item in items
+            )
+
+    def _objects(
+        self, table: Table, conditions: Sequence[Condition], stats: QueryStats
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        bucket, prefix = table.bucket_and_prefix()
+        partition_conditions = [
+            condition
+            for condition in conditions
+            if condition.column in table.partition_keys
+        ]
+        request = {"Bucket": bucket, "Prefix": prefix}
+        while True:
+            response = self.client.list_objects_v2(**request)
+            for entry in response.get("Contents", []):
+                key = entry["Key"]
+                if key.endswith("/"):
+                    continue
+                partitions = _partition_values(
+                    key[len(prefix) :], table.partition_keys
+                )
+                if not all(
+                    condition.matches(partitions.get(condition.column))
+                    for condition in partition_conditions
+                ):
+                    stats.objects_pruned += 1
+                    self.metrics.increment("query.objects.pruned")
+                    continue
+                yield key, partitions
+            if not response.get("IsTruncated"):
+                return
+            request["ContinuationToken"] = response["NextContinuationToken"]
+
+    def _scan(
+        self,
+        table: Table,
+        query: Query,
+        columns: Sequence[str],
+        stats: QueryStats,
+    ) -> Iterator[Dict[str, Any]]:
+        bucket, _ = table.bucket_and_prefix()
+        partition_keys = table.partition_keys
+        conditions = [c for c in query.where if c.column not in partition_keys]
+        data_columns = [name for name in columns if name not in partition_keys]
+        for key, partitions in self._objects(table, query.where, stats):
+            response = self.client.get_object(Bucket=bucket, Key=key)
+            body = response["Body"].read()
+            stats.objects_scanned += 1
+            self.metrics.increment("query.objects.scanned")
+            if is_segment(body):
+                records = self._segment_rows(body, data_columns, conditions, stats)
+            else:
+                stats.bytes_scanned += len(body)
+                if response.get("ContentEncoding") == "gzip":
+                    body = gzip.decompress(body)
+                records = self._json_rows(body, data_columns, stats)
+            extra = {name: partitions.get(name) for name in partition_keys}
+            for record in records:
+                if extra:
+                    record.update(extra)
+                if all(c.matches(record[c.column]) for c in conditions):
+                    yield record
+
+    def _json_rows(
+        self, body: bytes, columns: Sequence[str], stats: QueryStats
+    ) -> Iterator[Dict[str, Any]]:
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            payload = JSON_CODEC.loads(line)
+            stats.rows_scanned += 1
+            yield {name: payload.get(name) for name in columns}
+
+    def _segment_rows(
+        self,
+        body: bytes,
+        columns: Sequence[str],
+        conditions: Sequence[Condition],
+        stats: QueryStats,
+    ) -> Iterator[Dict[str, Any]]:
+        metrics = MetricRegistry()
+        reader = SegmentReader(body, metrics=metrics)
+        stored = [name for name in columns if name in reader.columns]
+        missing = {name: None for name in columns if name not in reader.columns}
+        # COUNT(*) alone still needs one column to learn each block's rows.
+        projected = stored or reader.columns[:1]
+        for block in reader.iter_blocks(projected, _pushdown_ranges(conditions)):
+            # Count each block as it is decoded, so a LIMIT that stops
+            # reading early still reports what it scanned.
+            _tally_segment(stats, metrics)
+            for row in zip(*(block[name].tolist() for name in projected)):
+                stats.rows_scanned += 1
+                record = dict(zip(projected, row))
+                if missing:
+                    record.update(missing)
+                yield record
+        _tally_segment(stats, metrics)
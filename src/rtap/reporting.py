@@ -3,14 +3,18 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+import gzip
 import json
 from pathlib import Path
-from typing import Dict, Iterable, List
+from typing import Dict, Iterable, List, Mapping, Optional
 
 import boto3
 import rtap.aws  # noqa: F401
 
+from .aggregates import RunningAggregate
+from .codecs import JSON_CODEC
 from .plugins.base import EventPayload
+from .segments import Range, SegmentReader, is_segment
 
 
 @dataclass
@@ -25,43 +29,32 @@ class AnalyticsReport:
         for line in text.splitlines():
             if not line.strip():
                 continue
-            payload = json.loads(line)
-            events.append(
-                EventPayload(
-                    sensor_id=int(payload["sensor_id"]),
-                    temperature=float(payload["temperature"]),
-                    humidity=float(payload["humidity"]),
-                    timestamp=int(payload["timestamp"]),
-                )
-            )
+            events.append(JSON_CODEC.decode(line))
         return AnalyticsReport(events)
 
     @staticmethod
     def from_s3(bucket: str, key: str) -> "AnalyticsReport":
         response = boto3.client("s3").get_object(Bucket=bucket, Key=key)
-        body = response["Body"].read().decode("utf-8")
-        return AnalyticsReport.from_json_lines(body)
+        body = response["Body"].read()
+        if response.get("ContentEncoding") == "gzip":
+            body = gzip.decompress(body)
+        if is_segment(body):
+            return AnalyticsReport.from_segment(body)
+        return AnalyticsReport.from_json_lines(body.decode("utf-8"))
+
+    @staticmethod
+    def from_segment(
+        data: bytes, where: Optional[Mapping[str, Range]] = None
+    ) -> "AnalyticsReport":
+        """Load events from a columnar segment, keeping rows within ``where``."""
+        return AnalyticsReport(SegmentReader(data).read_batch(where).to_events())
 
     @staticmethod
     def from_events(events: Iterable[EventPayload]) -> "AnalyticsReport":
         return AnalyticsReport(list(events))
 
     def summary(self) -> Dict[str, float | int]:
-        if not self.events:
-            return {"event_count": 0}
-        total_temp = sum(event.temperature for event in self.events)
-        total_humidity = sum(event.humidity for event in self.events)
-        temps = [event.temperature for event in self.events]
-        humidities = [event.humidity for event in self.events]
-        return {
-            "event_count": len(self.events),
-            "avg_temperature": round(total_temp / len(self.events), 2),
-            "avg_humidity": round(total_humidity / len(self.events), 2),
-            "min_temperature": min(temps),
-            "max_temperature": max(temps),
-            "min_humidity": min(humidities),
-            "max_humidity": max(humidities),
-        }
+        return RunningAggregate.from_events(self.events).summary()
 
     def anomalies(
         self, temp_threshold: float = 33.0, humidity_threshold: float = 65.0
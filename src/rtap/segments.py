@@ -0,0 +1,303 @@
+"""Columnar segment files with per-block zone maps.
+
+A segment is :data:`SEGMENT_MAGIC` plus a version byte, followed by blocks
+of up to ``block_rows`` rows. Each block stores every column contiguously as
+little-endian ``int64``/``float64`` values. The file ends with a JSON footer
+holding the row count and, per block and column, the byte range and min/max
+(the zone map), then the footer length and the magic again. Readers load
+only the columns they project and skip blocks whose zone maps cannot match
+the range predicate.
+"""
+
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass, field
+import io
+from itertools import compress
+import json
+import struct
+import sys
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .columnar import COLUMN_TYPES, EventBatch, column_stats, make_column, np
+from .metrics import MetricRegistry
+from .plugins.base import EventPayload
+
+
+SEGMENT_MAGIC = b"RTSG"
+SEGMENT_VERSION = 1
+SEGMENT_CONTENT_TYPE = "application/x-rtap-segment"
+DEFAULT_BLOCK_ROWS = 16_384
+
+# Inclusive (low, high) bounds; None leaves that side open.
+Range = Tuple[Optional[float], Optional[float]]
+
+_HEADER = SEGMENT_MAGIC + bytes([SEGMENT_VERSION])
+_TRAILER = struct.Struct("<I4s")
+_NUMPY_TYPES = {"q": "<i8", "d": "<f8"}
+_BIG_ENDIAN = sys.byteorder == "big"
+
+
+def is_segment(data: bytes) -> bool:
+    return data[: len(SEGMENT_MAGIC)] == SEGMENT_MAGIC
+
+
+def _column_bytes(column: Any, typecode: str) -> bytes:
+    if np is not None:
+        return column.astype(_NUMPY_TYPES[typecode], copy=False).tobytes()
+    if _BIG_ENDIAN:
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _decode_column(view: memoryview, typecode: str) -> Any:
+    if np is not None:
+        return np.frombuffer(view, dtype=_NUMPY_TYPES[typecode])
+    column = array(typecode)
+    column.frombytes(view)
+    if _BIG_ENDIAN:
+        column.byteswap()
+    return column
+
+
+def _concat(typecode: str, parts: List[Any]) -> Any:
+    if np is not None:
+        if not parts:
+            return np.empty(0, dtype=_NUMPY_TYPES[typecode])
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+    column = array(typecode)
+    for part in parts:
+        column.extend(part)
+    return column
+
+
+def _excludes(zone: Sequence[float], bounds: Range) -> bool:
+    """Whether a block's ``[min, max]`` lies entirely outside ``bounds``."""
+    low, high = bounds
+    return (low is not None and zone[3] < low) or (high is not None and zone[2] > high)
+
+
+def _range_mask(column: Any, low: Optional[float], high: Optional[float]) -> Any:
+    if np is not None:
+        if low is not None and high is not None:
+            return (column >= low) & (column <= high)
+        return column >= low if low is not None else column <= high
+    if low is not None and high is not None:
+        return [low <= value <= high for value in column]
+    if low is not None:
+        return [value >= low for value in column]
+    return [value <= high for value in column]
+
+
+def _row_mask(columns: Mapping[str, Any], where: Mapping[str, Range]) -> Any:
+    mask = None
+    for name, (low, high) in where.items():
+        if low is None and high is None:
+            continue
+        keep = _range_mask(columns[name], low, high)
+        if mask is None:
+            mask = keep
+        elif np is not None:
+            mask &= keep
+        else:
+            mask = list(map(bool.__and__, mask, keep))
+    return mask
+
+
+@dataclass
+class SegmentWriter:
+    """Append events to ``sink`` (anything with ``write(bytes)``) as a segment.
+
+    Rows are buffered until ``block_rows`` of them form a block; :meth:`close`
+    writes the last partial block and the footer but leaves ``sink`` open.
+    """
+
+    sink: Any
+    block_rows: int = DEFAULT_BLOCK_ROWS
+    _pending: Dict[str, List[Any]] = field(
+        default_factory=lambda: {name: [] for name in COLUMN_TYPES}, repr=False
+    )
+    _blocks: List[Dict[str, Any]] = field(default_factory=list, repr=False)
+    _offset: int = field(default=0, repr=False)
+    _rows: int = field(default=0, repr=False)
+    _closed: bool = field(default=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.block_rows < 1:
+            raise ValueError("block_rows must be at least 1")
+        self._write(_HEADER)
+
+    def __enter__(self) -> "SegmentWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+
+    def append(self, event: EventPayload) -> None:
+        pending = self._pending
+        pending["sensor_id"].append(event.sensor_id)
+        pending["temperature"].append(event.temperature)
+        pending["humidity"].append(event.humidity)
+        pending["timestamp"].append(event.timestamp)
+        if len(pending["sensor_id"]) >= self.block_rows:
+            self._flush_block()
+
+    def write_events(self, events: Iterable[EventPayload]) -> None:
+        for event in events:
+            self.append(event)
+
+    def write_batch(self, batch: EventBatch) -> None:
+        for name, values in self._pending.items():
+            values.extend(getattr(batch, name).tolist())
+        while len(self._pending["sensor_id"]) >= self.block_rows:
+            self._flush_block()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._pending["sensor_id"]:
+            self._flush_block()
+        footer = json.dumps(
+            {
+                "version": SEGMENT_VERSION,
+                "columns": COLUMN_TYPES,
+                "rows": self._rows,
+                "blocks": self._blocks,
+            },
+            separators=(",", ":"),
+        ).encode("utf-8")
+        self._write(footer)
+        self._write(_TRAILER.pack(len(footer), SEGMENT_MAGIC))
+
+    def _flush_block(self) -> None:
+        rows = min(self.block_rows, len(self._pending["sensor_id"]))
+        zones: Dict[str, List[Any]] = {}
+        for name, values in self._pending.items():
+            column = make_column(name, values[:rows])
+            del values[:rows]
+            _, low, high = column_stats(column)
+            body = _column_bytes(column, COLUMN_TYPES[name])
+            zones[name] = [self._offset, len(body), low, high]
+            self._write(body)
+        self._blocks.append({"rows": rows, "columns": zones})
+        self._rows += rows
+
+    def _write(self, data: bytes) -> None:
+        self.sink.write(data)
+        self._offset += len(data)
+
+
+def encode_segment(
+    events: Iterable[EventPayload] | EventBatch, block_rows: int = DEFAULT_BLOCK_ROWS
+) -> bytes:
+    buffer = io.BytesIO()
+    with SegmentWriter(buffer, block_rows=block_rows) as writer:
+        if isinstance(events, EventBatch):
+            writer.write_batch(events)
+        else:
+            writer.write_events(events)
+    return buffer.getvalue()
+
+
+@dataclass
+class SegmentReader:
+    """Read projected columns from a segment held in memory.
+
+    ``where`` maps column names to inclusive ``(low, high)`` ranges that all
+    have to hold. Blocks whose zone maps rule the predicate out are never
+    decoded (counted as ``segments.blocks.skipped``); rows of the remaining
+    blocks are filtered exactly. ``segments.bytes.read`` counts the column
+    bytes decoded.
+    """
+
+    data: bytes
+    metrics: MetricRegistry = field(default_factory=MetricRegistry)
+    footer: Dict[str, Any] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if not is_segment(self.data) or len(self.data) < len(_HEADER) + _TRAILER.size:
+            raise ValueError("Not an RTAP segment")
+        if self.data[len(SEGMENT_MAGIC)] != SEGMENT_VERSION:
+            raise ValueError(f"Unsupported segment version {self.data[4]}")
+        length, magic = _TRAILER.unpack_from(self.data, len(self.data) - _TRAILER.size)
+        if magic != SEGMENT_MAGIC:
+            raise ValueError("Segment is truncated")
+        end = len(self.data) - _TRAILER.size
+        self.footer = json.loads(self.data[end - length : end])
+
+    @property
+    def row_count(self) -> int:
+        return self.footer["rows"]
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.footer["columns"])
+
+    def iter_blocks(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        where: Optional[Mapping[str, Range]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield the projected, filtered columns of each matching block."""
+        types = self.footer["columns"]
+        columns = list(types) if columns is None else list(columns)
+        where = dict(where or {})
+        unknown = (set(columns) | set(where)) - set(types)
+        if unknown:
+            raise ValueError(f"Unknown segment column: {', '.join(sorted(unknown))}")
+        view = memoryview(self.data)
+        needed = list(dict.fromkeys([*columns, *where]))
+        for block in self.footer["blocks"]:
+            zones = block["columns"]
+            if any(_excludes(zones[name], bounds) for name, bounds in where.items()):
+                self.metrics.increment("segments.blocks.skipped")
+                continue
+            self.metrics.increment("segments.blocks.read")
+            decoded = {}
+            for name in needed:
+                offset, length = zones[name][0], zones[name][1]
+                self.metrics.increment("segments.bytes.read", length)
+                decoded[name] = _decode_column(
+                    view[offset : offset + length], types[name]
+                )
+            mask = _row_mask(decoded, where)
+            if mask is not None:
+                if np is not None:
+                    decoded = {name: decoded[name][mask] for name in columns}
+                else:
+                    decoded = {
+                        name: array(types[name], compress(decoded[name], mask))
+                        for name in columns
+                    }
+            yield {name: decoded[name] for name in columns}
+
+    def read(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        where: Optional[Mapping[str, Range]] = None,
+    ) -> Dict[str, Any]:
+        """Return ``{column: values}`` for the projection across all blocks."""
+        types = self.footer["columns"]
+        names = list(types) if columns is None else list(columns)
+        parts: Dict[str, List[Any]] = {name: [] for name in names}
+        for block in self.iter_blocks(names, where):
+            for name, values in block.items():
+                parts[name].append(values)
+        return {name: _concat(types[name], parts[name]) for name in names}
+
+    def read_batch(self, where: Optional[Mapping[str, Range]] = None) -> EventBatch:
+        return EventBatch(**self.read(where=where))
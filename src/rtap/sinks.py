@@ -0,0 +1,236 @@
+"""Batched sinks for the pipeline store stage."""
+
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from .metrics import MetricRegistry
+from .plugins.base import EventPayload
+
+
+DYNAMODB_BATCH_LIMIT = 25
+LAMBDA_ASYNC_PAYLOAD_LIMIT = 256 * 1024
+
+_BATCH_PREFIX = b'{"events": ['
+_BATCH_SUFFIX = b"]}"
+_BATCH_SEPARATOR = b", "
+
+
+def to_dynamodb_item(payload: EventPayload) -> Dict[str, Dict[str, str]]:
+    """Return the typed DynamoDB item for a processed event."""
+    return {
+        "sensor_id": {"S": str(payload.sensor_id)},
+        "timestamp": {"N": str(payload.timestamp)},
+        "temperature": {"N": str(payload.temperature)},
+        "humidity": {"N": str(payload.humidity)},
+    }
+
+
+class UnwrittenItemsError(RuntimeError):
+    """Raised when items are still unprocessed after batch_write_item retries."""
+
+    def __init__(self, table_name: str, items: List[Dict[str, Any]]) -> None:
+        super().__init__(
+            f"{len(items)} items were not written to {table_name} "
+            "after batch_write_item retries"
+        )
+        self.table_name = table_name
+        self.items = items
+
+
+@dataclass
+class DynamoDBBatchWriter:
+    """Group put requests into batch_write_item calls of up to 25 items.
+
+    DynamoDB rejects a batch that names the same key twice, so a write for
+    a key that is already pending replaces the pending item (the last write
+    wins, as with one put_item per event). ``UnprocessedItems`` returned by DynamoDB are resubmitted with
+    exponential backoff; items still unprocessed after ``max_attempts``
+    calls are returned by :meth:`flush`.
+    """
+
+    client: Any
+    table_name: str
+    metrics: MetricRegistry = field(default_factory=MetricRegistry)
+    batch_size: int = DYNAMODB_BATCH_LIMIT
+    max_attempts: int = 5
+    base_delay_s: float = 0.05
+    max_delay_s: float = 2.0
+    sleep: Callable[[float], None] = time.sleep
+    _pending: Dict[tuple, Dict[str, Any]] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self) -> None:
+        if not 0 < self.batch_size <= DYNAMODB_BATCH_LIMIT:
+            raise ValueError(
+                f"batch_size must be between 1 and {DYNAMODB_BATCH_LIMIT}"
+            )
+
+    def write(self, payload: EventPayload) -> List[Dict[str, Any]]:
+        item = to_dynamodb_item(payload)
+        key = (item["sensor_id"]["S"], item["timestamp"]["N"])
+        if key in self._pending:
+            self.metrics.increment("dynamodb.items.deduplicated")
+        self._pending[key] = {"PutRequest": {"Item": item}}
+        if len(self._pending) >= self.batch_size:
+            return self.flush()
+        return []
+
+    def write_many(self, payloads: Iterable[EventPayload]) -> List[Dict[str, Any]]:
+        failed: List[Dict[str, Any]] = []
+        for payload in payloads:
+            failed.extend(self.write(payload))
+        failed.extend(self.flush())
+        return failed
+
+    def flush(self) -> List[Dict[str, Any]]:
+        failed: List[Dict[str, Any]] = []
+        requests = list(self._pending.values())
+        self._pending.clear()
+        for start in range(0, len(requests), self.batch_size):
+            failed.extend(self._write_batch(requests[start : start + self.batch_size]))
+        return failed
+
+    def close(self) -> List[Dict[str, Any]]:
+        return self.flush()
+
+    def _write_batch(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        attempt = 0
+        while True:
+            with self.metrics.time("dynamodb.batch_write"):
+                response = self.client.batch_write_item(
+                    RequestItems={self.table_name: requests}
+                )
+            self.metrics.increment("dynamodb.batch_write.requests")
+            unprocessed = response.get("UnprocessedItems", {}).get(self.table_name, [])
+            self.metrics.increment(
+                "dynamodb.items.written", len(requests) - len(unprocessed)
+            )
+            if not unprocessed:
+                return []
+            attempt += 1
+            if attempt >= self.max_attempts:
+                self.metrics.increment("dynamodb.items.failed", len(unprocessed))
+                return unprocessed
+            self.metrics.increment("dynamodb.batch_write.retries")
+            self.metrics.increment("dynamodb.items.unprocessed", len(unprocessed))
+            self.sleep(min(self.max_delay_s, self.base_delay_s * 2 ** (attempt - 1)))
+            requests = unprocessed
+
+
+@dataclass
+class LambdaBatchSink:
+    """Aggregate events into size-bounded payloads and invoke Lambda.
+
+    Each payload is ``{"events": [...]}`` and stays under
+    ``max_payload_bytes``. Invocations run on a thread pool; at most
+    ``max_concurrency`` are in flight and :meth:`write` blocks once that
+    limit is reached. :meth:`close` flushes and waits for every in-flight
+    invocation.
+    """
+
+    client: Any
+    function_name: str
+    metrics: MetricRegistry = field(default_factory=MetricRegistry)
+    invocation_type: str = "Event"
+    max_payload_bytes: int = LAMBDA_ASYNC_PAYLOAD_LIMIT
+    max_concurrency: int = 4
+    _buffer: List[bytes] = field(default_factory=list, repr=False)
+    _buffer_bytes: int = field(default=0, repr=False)
+    _in_flight: Set[Future] = field(default_factory=set, repr=False)
+    _executor: Optional[ThreadPoolExecutor] = field(default=None, repr=False)
+    _slots: Optional[threading.BoundedSemaphore] = field(default=None, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _errors: List[BaseException] = field(default_factory=list, repr=False)
+
+    def __post_init__(self) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._in_flight)
+
+    def write(self, payload: EventPayload) -> None:
+        encoded = json.dumps(payload.as_dict()).encode("utf-8")
+        overhead = len(_BATCH_PREFIX) + len(_BATCH_SUFFIX)
+        if len(encoded) + overhead > self.max_payload_bytes:
+            raise ValueError(
+                f"Event of {len(encoded)} bytes exceeds the Lambda payload limit"
+            )
+        # One separator per event after the first.
+        separators = len(self._buffer) * len(_BATCH_SEPARATOR)
+        projected = self._buffer_bytes + len(encoded) + separators + overhead
+        if self._buffer and projected > self.max_payload_bytes:
+            self.flush()
+        self._buffer.append(encoded)
+        self._buffer_bytes += len(encoded)
+
+    def write_many(self, payloads: Iterable[EventPayload]) -> None:
+        for payload in payloads:
+            self.write(payload)
+        self.flush()
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        body = _BATCH_PREFIX + _BATCH_SEPARATOR.join(self._buffer) + _BATCH_SUFFIX
+        count = len(self._buffer)
+        self._buffer = []
+        self._buffer_bytes = 0
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self._invoke, body, count)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._in_flight.add(future)
+        future.add_done_callback(self._release)
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Block until every dispatched invocation has completed."""
+        with self._lock:
+            pending = list(self._in_flight)
+        wait(pending, timeout=timeout)
+
+    def close(self) -> None:
+        """Flush, wait for in-flight calls and re-raise the first failure.
+
+        Each failure is raised once, so closing again is a no-op.
+        """
+        self.flush()
+        self.wait()
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            errors, self._errors = self._errors, []
+        if errors:
+            raise errors[0]
+
+    def _release(self, future: Future) -> None:
+        error = future.exception()
+        with self._lock:
+            self._in_flight.discard(future)
+            if error is not None:
+                self._errors.append(error)
+        if error is not None:
+            self.metrics.increment("lambda.invoke.errors")
+        self._slots.release()
+
+    def _invoke(self, body: bytes, count: int) -> None:
+        with self.metrics.time("lambda.invoke"):
+            response = self.client.invoke(
+                FunctionName=self.function_name,
+                InvocationType=self.invocation_type,
+                Payload=body,
+            )
+        self.metrics.increment("lambda.invocations")
+        if response.get("FunctionError") or response.get("StatusCode", 200) >= 300:
+            self.metrics.increment("lambda.events.failed", count)
+        else:
+            self.metrics.increment("lambda.events.dispatched", count)
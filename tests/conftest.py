@@ -2,6 +2,9 @@
 
 import sitecustomize  # noqa: F401
 
+import importlib.util
+from pathlib import Path
+
 import pytest
 
 import rtap.aws as aws
@@ -12,3 +15,24 @@ def reset_rtap_cache():
     aws.reset_cache()
     yield
     aws.reset_cache()
+
+
+@pytest.fixture
+def load_script():
+    """Return a loader that imports a standalone script as a fresh module.
+
+    Scripts such as ``lambda/processor.py`` are not packages, so they are
+    loaded from their path relative to the repository root; every call runs
+    the module again so environment-driven settings are read anew.
+    """
+    root = Path(__file__).resolve().parents[1]
+
+    def load(relative_path):
+        path = root / relative_path
+        name = "_".join(Path(relative_path).with_suffix("").parts)
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    return load
@@ -0,0 +1,51 @@
+import json
+
+from rtap.aggregates import RunningAggregate
+from rtap.plugins.base import EventPayload
+
+
+EVENTS = [
+    EventPayload(sensor_id=1, temperature=20.0, humidity=40.0, timestamp=1),
+    EventPayload(sensor_id=1, temperature=25.0, humidity=45.0, timestamp=2),
+    EventPayload(sensor_id=2, temperature=35.0, humidity=60.0, timestamp=3),
+    EventPayload(sensor_id=3, temperature=18.5, humidity=71.0, timestamp=4),
+]
+
+
+def test_running_aggregate_summary():
+    summary = RunningAggregate.from_events(EVENTS).summary()
+
+    assert summary == {
+        "event_count": 4,
+        "avg_temperature": 24.62,
+        "avg_humidity": 54.0,
+        "min_temperature": 18.5,
+        "max_temperature": 35.0,
+        "min_humidity": 40.0,
+        "max_humidity": 71.0,
+    }
+    assert RunningAggregate().summary() == {"event_count": 0}
+
+
+def test_running_aggregate_merge_is_associative_with_identity():
+    a, b, c = (RunningAggregate.from_events([event]) for event in EVENTS[:3])
+    d = RunningAggregate.from_events(EVENTS[3:])
+
+    left = ((a + b) + c) + d
+    right = a + (b + (c + (d + RunningAggregate())))
+
+    assert left == right == RunningAggregate.from_events(EVENTS)
+    assert left.sensor_counts == {1: 2, 2: 1, 3: 1}
+
+
+def test_running_aggregate_round_trips_through_json():
+    partial = RunningAggregate.from_events(EVENTS[:2])
+    shipped = json.loads(json.dumps(partial.to_dict()))
+
+    restored = RunningAggregate.from_dict(shipped)
+    empty = RunningAggregate.from_dict(
+        json.loads(json.dumps(RunningAggregate().to_dict()))
+    )
+
+    assert restored == partial
+    assert empty == RunningAggregate()
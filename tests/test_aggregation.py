@@ -0,0 +1,116 @@
+import hashlib
+
+import boto3
+import pytest
+
+from rtap.aggregation import (
+    AGGREGATION_MAGIC,
+    RecordAggregator,
+    deaggregate,
+    list_shard_ranges,
+)
+from rtap.config import RuntimeConfig
+from rtap.kpl import deaggregate_records, encode_aggregated
+from rtap.metrics import MetricRegistry
+from rtap.pipeline import Pipeline
+
+
+def test_aggregator_round_trips_and_respects_size_limit():
+    metrics = MetricRegistry()
+    aggregator = RecordAggregator(max_bytes=200, metrics=metrics)
+    payloads = [f"record-{index:03d}".encode() for index in range(30)]
+
+    records = []
+    for payload in payloads:
+        records.extend(aggregator.add(payload, "key"))
+    records.extend(aggregator.flush())
+
+    assert all(len(record.data) + len("key") <= 200 for record in records)
+    assert all(record.data.startswith(AGGREGATION_MAGIC) for record in records)
+    assert [item for r in records for item in deaggregate(r.data)] == payloads
+    ratios = metrics.histograms["kinesis.aggregation.ratio"]
+    assert sum(ratios) == 30 and len(ratios) == len(records)
+
+
+def test_deaggregate_passes_plain_records_and_rejects_corruption():
+    aggregator = RecordAggregator()
+    aggregator.add(b"a", "k")
+    aggregator.add(b"b", "k")
+    (record,) = aggregator.flush()
+
+    assert deaggregate(b'{"sensor_id": 1}') == [b'{"sensor_id": 1}']
+    with pytest.raises(ValueError):
+        deaggregate(record.data[:-1] + bytes([record.data[-1] ^ 1]))
+
+
+def test_aggregates_use_the_kpl_protobuf_layout():
+    # AggregatedRecord{partition_key_table: ["a"], records: [{0, b"x"}]}.
+    message = bytes.fromhex("0a0161" "1a05" "0800" "1a0178")
+    expected = AGGREGATION_MAGIC + message + hashlib.md5(message).digest()
+    assert encode_aggregated([("a", b"x")]) == expected
+
+    # KPL writers may add explicit hash keys (field 2) and tags (field 4).
+    message = bytes.fromhex(
+        "0a0161" "0a0162" "120131" "1a07" "080110001a0179" "1a09" "0800" "1a0178"
+        "2202" "0a00"
+    )
+    data = AGGREGATION_MAGIC + message + hashlib.md5(message).digest()
+    assert deaggregate_records(data) == [("b", b"y"), ("a", b"x")]
+
+    aggregator = RecordAggregator()
+    for key in ("k1", "k2", "k1"):
+        aggregator.add(key.encode(), key)
+    (record,) = aggregator.flush()
+    assert deaggregate_records(record.data) == [
+        ("k1", b"k1"),
+        ("k2", b"k2"),
+        ("k1", b"k1"),
+    ]
+
+
+def test_aggregates_are_pinned_to_the_partition_key_shard():
+    client = boto3.client("kinesis")
+    client.create_stream(StreamName="agg-shards", ShardCount=4)
+    aggregator = RecordAggregator(list_shard_ranges(client, "agg-shards"))
+    for index in range(40):
+        aggregator.add(str(index).encode(), str(index % 8))
+
+    for record in aggregator.flush():
+        request = {"StreamName": "agg-shards", "Data": record.data}
+        expected = client.put_record(PartitionKey=record.partition_key, **request)
+        if record.explicit_hash_key is not None:
+            pinned = client.put_record(
+                PartitionKey="other",
+                ExplicitHashKey=record.explicit_hash_key,
+                **request,
+            )
+            assert pinned["ShardId"] == expected["ShardId"]
+
+
+@pytest.mark.parametrize("batch_ingest", [False, True])
+def test_pipeline_aggregates_and_deaggregates(batch_ingest):
+    pipeline = Pipeline(
+        config=RuntimeConfig(
+            kinesis_aggregation=True, batch_ingest=batch_ingest, shard_count=2
+        )
+    )
+    result = pipeline.run(
+        stream_name=f"agg-{batch_ingest}",
+        bucket_name="agg-bucket",
+        table_name="agg-table",
+        event_count=50,
+    )
+
+    assert result.events_processed == 50
+    assert pipeline.metrics.counters["kinesis.records.sent"] < 10
+    assert result.metrics_snapshot["kinesis.aggregation.ratio.avg"] > 5
+
+
+def test_standalone_scripts_deaggregate(load_script):
+    aggregator = RecordAggregator()
+    aggregator.add(b'{"a": 1}', "k")
+    aggregator.add(b'{"a": 2}', "k")
+    (record,) = aggregator.flush()
+    for relative in ("lambda/processor.py", "kinesis/consumer.py"):
+        module = load_script(relative)
+        assert module.deaggregate(record.data) == [b'{"a": 1}', b'{"a": 2}']
@@ -0,0 +1,55 @@
+import gzip
+
+import boto3
+import pytest
+
+from rtap.artifacts import MULTIPART_MIN_PART_BYTES, S3StreamWriter
+from rtap.config import RuntimeConfig
+from rtap.pipeline import Pipeline
+from rtap.reporting import AnalyticsReport
+
+
+def test_stream_writer_uses_multipart_for_large_bodies():
+    s3 = boto3.client("s3")
+    chunk = b"x" * (1024 * 1024)
+    writer = S3StreamWriter(
+        s3, "artifacts", "big.bin", part_size=MULTIPART_MIN_PART_BYTES
+    )
+    with writer as body:
+        for _ in range(12):
+            body.write(chunk)
+
+    stored = s3.get_object(Bucket="artifacts", Key="big.bin")["Body"].read()
+    assert stored == chunk * 12
+    assert s3.uploads == {}
+
+
+def test_stream_writer_aborts_multipart_upload_on_error():
+    s3 = boto3.client("s3")
+    with pytest.raises(RuntimeError):
+        with S3StreamWriter(s3, "artifacts", "broken.bin") as body:
+            body.write(b"y" * (9 * 1024 * 1024))
+            raise RuntimeError("boom")
+
+    assert s3.uploads == {}
+    assert "broken.bin" not in s3.buckets.get("artifacts", {})
+
+
+def test_pipeline_writes_gzip_artifacts_read_transparently():
+    pipeline = Pipeline(config=RuntimeConfig(s3_gzip=True))
+    pipeline.run(
+        stream_name="gzip-stream",
+        bucket_name="gzip-bucket",
+        table_name="gzip-table",
+        event_count=6,
+        report_key="reports/events.jsonl",
+        trace_key="reports/trace.jsonl",
+    )
+
+    s3 = boto3.client("s3")
+    response = s3.get_object(Bucket="gzip-bucket", Key="reports/trace.jsonl")
+    assert response["ContentEncoding"] == "gzip"
+    assert len(gzip.decompress(response["Body"].read()).splitlines()) == 6
+
+    report = AnalyticsReport.from_s3("gzip-bucket", "reports/events.jsonl")
+    assert report.summary()["event_count"] == 6
@@ -0,0 +1,69 @@
+import asyncio
+
+import boto3
+import pytest
+
+from rtap import AsyncPipeline, Pipeline
+from rtap.async_pipeline import _run_stages
+from rtap.config import RuntimeConfig
+
+
+def _run(engine, stream_name):
+    return engine.run(
+        stream_name=stream_name,
+        bucket_name="engines-bucket",
+        table_name="engines-table",
+        event_count=60,
+        report_key=f"reports/{stream_name}.jsonl",
+    )
+
+
+def test_async_pipeline_matches_sync_pipeline():
+    config = RuntimeConfig(stream_window=8, shard_count=2)
+    sync_result = _run(Pipeline(config=config), "sync-stream")
+    async_result = _run(AsyncPipeline(config=config), "async-stream")
+
+    assert async_result.events_processed == sync_result.events_processed == 60
+    assert async_result.report["event_count"] == 60
+    assert async_result.report["max_temperature"] == sync_result.report[
+        "max_temperature"
+    ]
+    assert set(async_result.metrics_snapshot) == set(sync_result.metrics_snapshot)
+    assert async_result.health.status == "ok"
+
+
+def test_stage_failure_cancels_blocked_stages():
+    async def main():
+        queue = asyncio.Queue(1)
+
+        async def produce():
+            while True:
+                await queue.put(1)
+
+        async def fail():
+            await asyncio.sleep(0)
+            raise RuntimeError("stage failed")
+
+        producer = asyncio.ensure_future(produce())
+        with pytest.raises(RuntimeError):
+            await _run_stages(producer, fail())
+        assert producer.cancelled()
+
+    asyncio.run(main())
+
+
+def test_failed_store_aborts_the_artifact_and_closes_sinks(monkeypatch):
+    engine = AsyncPipeline(
+        config=RuntimeConfig(stream_window=4, lambda_async=True), queue_size=1
+    )
+
+    def store(table_name, events):
+        raise RuntimeError("store failed")
+
+    monkeypatch.setattr(engine, "_store", store)
+    with pytest.raises(RuntimeError):
+        _run(engine, "failing-stream")
+
+    assert engine._lambda_sink is None
+    s3 = boto3.client("s3")
+    assert "reports/failing-stream.jsonl" not in s3.buckets.get("engines-bucket", {})
@@ -0,0 +1,140 @@
+import json
+
+import boto3
+import pytest
+
+from rtap import AsyncPipeline
+from rtap.batching import MicroBatcher
+from rtap.config import RuntimeConfig
+from rtap.metrics import MetricRegistry
+from rtap.pipeline import Pipeline
+from rtap.plugins.base import EventPayload
+from rtap.plugins.loader import PluginRegistry
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_micro_batcher_flushes_on_size_bytes_and_time():
+    batches = []
+    metrics = MetricRegistry()
+    clock = _Clock()
+    batcher = MicroBatcher(
+        batches.append,
+        name="test",
+        max_items=3,
+        max_bytes=10,
+        max_delay_ms=50,
+        metrics=metrics,
+        clock=clock,
+    )
+
+    batcher.add_many([b"a", b"b", b"c"])
+    batcher.add_many([b"12345", b"67890"])
+    batcher.add(b"x")
+    clock.now = 0.1
+    assert batcher.poll()
+    batcher.add(b"tail")
+    batcher.close()
+
+    assert batches == [
+        [b"a", b"b", b"c"],
+        [b"12345", b"67890"],
+        [b"x"],
+        [b"tail"],
+    ]
+    assert metrics.counters == {
+        "batch.test.flush.size": 1,
+        "batch.test.flush.bytes": 1,
+        "batch.test.flush.time": 1,
+        "batch.test.flush.close": 1,
+    }
+    summary = metrics.snapshot().summary()
+    assert summary["batch.test.size.count"] == 4.0
+    assert summary["batch.test.size.max"] == 3
+    assert summary["batch.test.size.avg"] == 1.75
+
+
+def test_process_many_prefers_process_batch():
+    class Doubler:
+        name = "double"
+        calls = 0
+
+        def process_batch(self, batch):
+            Doubler.calls += 1
+            return batch.replace(temperature=[t * 2 for t in batch.temperature])
+
+    registry = PluginRegistry()
+    registry.register_builtin(["clamp_humidity"])
+    registry.register(Doubler())
+    events = [EventPayload(1, 10.0, 120.0, 0), EventPayload(2, 11.0, -5.0, 0)]
+
+    result = registry.process_many(events)
+
+    assert [(e.temperature, e.humidity) for e in result] == [
+        (20.0, 100.0),
+        (22.0, 0.0),
+    ]
+    assert Doubler.calls == 1
+
+
+def test_streaming_pipeline_micro_batches_sink_stages(monkeypatch):
+    monkeypatch.setenv("RTAP_STREAMING", "1")
+    monkeypatch.setenv("RTAP_STREAM_WINDOW", "5")
+    monkeypatch.setenv("RTAP_BATCH_STAGES", "plugins,dynamodb,lambda")
+    monkeypatch.setenv("RTAP_BATCH_MAX_EVENTS", "12")
+    pipeline = Pipeline(config=RuntimeConfig.from_env())
+
+    result = pipeline.run(
+        stream_name="mb-stream",
+        bucket_name="mb-bucket",
+        table_name="mb-table",
+        event_count=30,
+    )
+
+    assert result.events_processed == 30
+    counters = pipeline.metrics.counters
+    assert counters["batch.dynamodb.flush.size"] == 2
+    assert counters["batch.dynamodb.flush.close"] == 1
+    assert (
+        counters["dynamodb.items.written"] + counters["dynamodb.items.deduplicated"]
+        == 30
+    )
+    invocations = boto3.client("lambda").invocations
+    assert [len(json.loads(call["Payload"])["events"]) for call in invocations] == [
+        12,
+        12,
+        6,
+    ]
+    # The plugins batcher lives for the run, so its batches of 12 span
+    # several windows (and polls) of five events.
+    assert result.metrics_snapshot["batch.plugins.size.count"] == 3
+    assert result.metrics_snapshot["batch.plugins.size.max"] == 12
+
+
+@pytest.mark.parametrize("engine", [Pipeline, AsyncPipeline])
+def test_plugins_batcher_is_drained_when_the_run_ends(monkeypatch, engine):
+    monkeypatch.setenv("RTAP_STREAM_WINDOW", "5")
+    monkeypatch.setenv("RTAP_BATCH_STAGES", "plugins")
+    monkeypatch.setenv("RTAP_BATCH_MAX_EVENTS", "1000")
+    result = engine(config=RuntimeConfig.from_env()).run(
+        stream_name=f"drain-{engine.__name__}",
+        bucket_name="drain-bucket",
+        table_name="drain-table",
+        event_count=23,
+    )
+
+    assert result.events_processed == 23
+    assert result.report["event_count"] == 23
+    assert result.metrics_snapshot["batch.plugins.flush.close.count"] == 1
+    assert result.metrics_snapshot["batch.plugins.size.max"] == 23
+
+
+def test_pipeline_rejects_unknown_batch_stage():
+    with pytest.raises(ValueError):
+        Pipeline(config=RuntimeConfig(batch_stages=("kinesis",)))
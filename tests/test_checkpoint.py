@@ -0,0 +1,116 @@
+import boto3
+import pytest
+
+from fake_aws import FakeDynamoDB
+from rtap.checkpoint import DynamoDBCheckpointStore, ShardCheckpointer
+from rtap.config import RuntimeConfig
+from rtap.consumer import ShardReader
+from rtap.metrics import MetricRegistry
+from rtap.pipeline import Pipeline
+from rtap.sinks import UnwrittenItemsError
+
+
+def test_checkpointer_writes_every_interval():
+    store = DynamoDBCheckpointStore(boto3.client("dynamodb"), "leases")
+    store.ensure_table()
+    metrics = MetricRegistry()
+    checkpointer = ShardCheckpointer(
+        store, "s", "shard-0", interval=10, metrics=metrics
+    )
+
+    for index in range(25):
+        checkpointer.record(f"{index:021d}")
+
+    assert metrics.counters["kinesis.checkpoints.written"] == 2
+    assert store.get("s", "shard-0") == f"{19:021d}"
+    checkpointer.flush()
+    assert store.get("s", "shard-0") == f"{24:021d}"
+
+
+def test_reader_resumes_after_checkpoint():
+    client = boto3.client("kinesis")
+    client.create_stream(StreamName="resume", ShardCount=1)
+    for index in range(5):
+        client.put_record(
+            StreamName="resume", Data=str(index).encode(), PartitionKey="k"
+        )
+    store = DynamoDBCheckpointStore(boto3.client("dynamodb"), "leases")
+    store.ensure_table()
+    shard_id = "shardId-000000000000"
+    first = client.get_records(
+        ShardIterator=client.get_shard_iterator(
+            StreamName="resume", ShardId=shard_id, ShardIteratorType="TRIM_HORIZON"
+        )["ShardIterator"]
+    )["Records"]
+    store.put("resume", shard_id, first[2]["SequenceNumber"])
+
+    checkpointer = ShardCheckpointer(store, "resume", shard_id)
+    reader = ShardReader(client, "resume", shard_id, checkpointer=checkpointer)
+
+    assert [int(r["Data"]) for r in reader.poll()] == [3, 4]
+
+
+def test_pipeline_rerun_processes_only_new_events(monkeypatch):
+    monkeypatch.setenv("RTAP_CHECKPOINT_TABLE", "rtap-leases")
+    monkeypatch.setenv("RTAP_SHARD_COUNT", "2")
+    options = dict(stream_name="cp", bucket_name="cp-bucket", table_name="cp-table")
+
+    first = Pipeline(config=RuntimeConfig.from_env()).run(event_count=8, **options)
+    second = Pipeline(config=RuntimeConfig.from_env()).run(
+        event_count=3, seed=7, **options
+    )
+
+    assert first.events_processed == 8
+    assert second.events_processed == 3
+    assert second.report["event_count"] == 3
+
+
+# Streaming stores (and checkpoints) the first window of four before the
+# second store fails, so only that window is read again.
+@pytest.mark.parametrize("streaming, fail_on, reread", [("0", 1, 8), ("1", 2, 4)])
+def test_failed_store_leaves_records_to_be_read_again(
+    monkeypatch, streaming, fail_on, reread
+):
+    monkeypatch.setenv("RTAP_CHECKPOINT_TABLE", "rtap-leases")
+    monkeypatch.setenv("RTAP_CHECKPOINT_INTERVAL", "1")
+    monkeypatch.setenv("RTAP_SHARD_COUNT", "2")
+    monkeypatch.setenv("RTAP_STREAMING", streaming)
+    monkeypatch.setenv("RTAP_STREAM_WINDOW", "4")
+    options = dict(stream_name="cp", bucket_name="cp-bucket", table_name="cp-table")
+    failing = Pipeline(config=RuntimeConfig.from_env())
+    calls = []
+
+    def store(table_name, events):
+        calls.append(table_name)
+        if len(calls) == fail_on:
+            raise RuntimeError("store failed")
+        Pipeline._store(failing, table_name, events)
+
+    monkeypatch.setattr(failing, "_store", store)
+    with pytest.raises(RuntimeError):
+        failing.run(event_count=8, **options)
+
+    rerun = Pipeline(config=RuntimeConfig.from_env()).run(
+        event_count=3, seed=7, **options
+    )
+    assert rerun.events_processed == reread + 3
+
+
+def test_unwritten_dynamodb_items_leave_records_to_be_read_again(monkeypatch):
+    monkeypatch.setenv("RTAP_CHECKPOINT_TABLE", "rtap-leases")
+    monkeypatch.setenv("RTAP_CHECKPOINT_INTERVAL", "1")
+    monkeypatch.setenv("RTAP_DYNAMODB_BATCH", "1")
+    options = dict(stream_name="ddb", bucket_name="ddb-bucket", table_name="ddb-table")
+    with monkeypatch.context() as throttled:
+        throttled.setattr(
+            FakeDynamoDB,
+            "batch_write_item",
+            lambda self, RequestItems: {"UnprocessedItems": RequestItems},
+        )
+        with pytest.raises(UnwrittenItemsError):
+            Pipeline(config=RuntimeConfig.from_env()).run(event_count=4, **options)
+
+    rerun = Pipeline(config=RuntimeConfig.from_env()).run(
+        event_count=2, seed=7, **options
+    )
+    assert rerun.events_processed == 6
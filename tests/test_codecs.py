@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from rtap.codecs import (
+    BINARY_CODEC,
+    JSON_CODEC,
+    decode_record,
+    detect_codec,
+    get_codec,
+)
+from rtap.config import RuntimeConfig
+from rtap.pipeline import Pipeline
+from rtap.plugins.base import EventPayload
+
+EVENT = EventPayload(sensor_id=42, temperature=21.5, humidity=55.25, timestamp=1_700)
+
+
+def test_codecs_round_trip_and_are_detected_from_the_record():
+    for codec in (JSON_CODEC, BINARY_CODEC):
+        encoded = codec.encode(EVENT)
+        assert detect_codec(encoded) is codec
+        assert decode_record(encoded) == EVENT
+
+    assert len(BINARY_CODEC.encode(EVENT)) == 29
+    legacy = '{"sensor_id": "3", "temperature": 1, "humidity": 2, "timestamp": 5}'
+    assert decode_record(legacy) == EventPayload(3, 1.0, 2.0, 5)
+
+
+def test_binary_codec_decodes_concatenated_records():
+    events = [EventPayload(i, i + 0.5, i * 2.0, 1_000 + i) for i in range(5)]
+    buffer = b"".join(BINARY_CODEC.encode(event) for event in events)
+
+    assert list(BINARY_CODEC.iter_decode(buffer)) == events
+    with pytest.raises(ValueError):
+        BINARY_CODEC.decode(JSON_CODEC.encode(EVENT).ljust(29))
+    with pytest.raises(ValueError):
+        get_codec("avro")
+
+
+def test_pipeline_binary_codec_matches_json_codec():
+    reports = []
+    for codec in ("json", "binary"):
+        pipeline = Pipeline(config=RuntimeConfig(codec=codec))
+        result = pipeline.run(
+            stream_name=f"codec-{codec}",
+            bucket_name="codec-bucket",
+            table_name="codec-table",
+            event_count=25,
+        )
+        reports.append(result.report)
+
+    assert reports[0] == reports[1]
+
+
+def test_lambda_processor_decodes_binary_records(load_script):
+    processor = load_script("lambda/processor.py")
+    records = [
+        {"kinesis": {"data": codec.encode(EVENT), "sequenceNumber": str(index)}}
+        for index, codec in enumerate((BINARY_CODEC, JSON_CODEC))
+    ]
+
+    response = processor.lambda_handler({"Records": records}, None)
+
+    assert response["batchItemFailures"] == []
+    (body,) = processor.s3.buckets[processor.BUCKET_NAME].values()
+    assert [json.loads(line) for line in body.splitlines()] == [EVENT.as_dict()] * 2
@@ -0,0 +1,112 @@
+import random
+
+import pytest
+
+from rtap.aggregates import RunningAggregate
+from rtap.columnar import EventBatch, round_column, round_value
+from rtap.config import RuntimeConfig
+from rtap.pipeline import Pipeline
+from rtap.plugins.base import EventPayload
+from rtap.plugins.builtin import HumidityClampPlugin, NormalizeTemperaturePlugin
+from rtap.policy import PolicyEngine
+
+
+def _events(count, seed=3):
+    rng = random.Random(seed)
+    return [
+        EventPayload(
+            sensor_id=rng.randint(1, 5),
+            temperature=round(rng.uniform(10.0, 110.0), 2),
+            humidity=round(rng.uniform(-20.0, 120.0), 2),
+            timestamp=1_700_000_000 + index,
+        )
+        for index in range(count)
+    ]
+
+
+def test_event_batch_round_trips_and_selects_rows():
+    events = _events(10)
+    batch = EventBatch.from_events(events)
+
+    assert len(batch) == 10
+    assert batch.to_events() == events
+    selected = batch.select([index % 2 == 0 for index in range(10)])
+    assert selected.to_events() == events[::2]
+
+
+def test_builtin_process_batch_matches_per_event_process():
+    events = _events(50)
+    for plugin in (NormalizeTemperaturePlugin(), HumidityClampPlugin()):
+        expected = [plugin.process(event) for event in events]
+        actual = plugin.process_batch(EventBatch.from_events(events)).to_events()
+        assert actual == expected
+
+
+def test_policy_and_aggregate_batches_match_row_path():
+    events = _events(200)
+    policy = PolicyEngine.from_allowlist([1, 2, 4])
+    batch = EventBatch.from_events(events)
+
+    mask = policy.evaluate_batch(batch)
+    assert list(mask) == [policy.evaluate(event).allowed for event in events]
+
+    aggregate = RunningAggregate()
+    aggregate.update_batch(batch)
+    assert aggregate.summary() == RunningAggregate.from_events(events).summary()
+
+
+def test_columnar_pipeline_matches_row_pipeline():
+    results = []
+    for columnar in (False, True):
+        pipeline = Pipeline(
+            config=RuntimeConfig(columnar=columnar, policy_enabled=True)
+        )
+        pipeline.plugins.register_builtin(["normalize_temperature", "clamp_humidity"])
+        results.append(
+            pipeline.run(
+                stream_name=f"col-{columnar}",
+                bucket_name="col-bucket",
+                table_name="col-table",
+                event_count=40,
+            )
+        )
+
+    row, columnar = results
+    assert columnar.events_processed == row.events_processed
+    assert columnar.report == row.report
+
+
+# Python's round() gives 2.83, 55.65 and 63.09 for the first three.
+ROUNDING_CASES = [2.835, 55.645, 63.095, -0.001, 99.999]
+
+
+def test_round_value_matches_the_numpy_rule():
+    assert [round_value(value) for value in ROUNDING_CASES] == [
+        2.84,
+        55.64,
+        63.1,
+        -0.0,
+        100.0,
+    ]
+    assert list(round_column(ROUNDING_CASES)) == [
+        round_value(value) for value in ROUNDING_CASES
+    ]
+
+
+def test_numpy_round_matches_round_value():
+    np = pytest.importorskip("numpy")
+
+    rounded = np.round(np.array(ROUNDING_CASES), 2).tolist()
+    assert rounded == [round_value(value) for value in ROUNDING_CASES]
+    events = [EventPayload(1, value * 3, value, 0) for value in ROUNDING_CASES]
+    for plugin in (NormalizeTemperaturePlugin(), HumidityClampPlugin()):
+        batch = plugin.process_batch(EventBatch.from_events(events)).to_events()
+        assert batch == [plugin.process(event) for event in events]
+
+
+def test_numpy_backend_when_available():
+    np = pytest.importorskip("numpy")
+    batch = EventBatch.from_events(_events(5))
+
+    assert batch.backend == "numpy"
+    assert isinstance(batch.temperature, np.ndarray)
@@ -0,0 +1,91 @@
+import hashlib
+
+import boto3
+
+from fake_aws import FakeKinesis
+from rtap.aggregation import list_shard_ranges
+from rtap.config import RuntimeConfig
+from rtap.consumer import ParallelShardConsumer, ShardReader, list_shard_ids
+from rtap.metrics import MetricRegistry
+from rtap.pipeline import Pipeline
+
+
+def test_fake_kinesis_routes_partition_keys_by_md5():
+    client = boto3.client("kinesis")
+    client.create_stream(StreamName="sharded", ShardCount=4)
+    shards = client.list_shards(StreamName="sharded")["Shards"]
+
+    response = client.put_record(StreamName="sharded", Data=b"{}", PartitionKey="a")
+
+    hash_key = int(hashlib.md5(b"a").hexdigest(), 16)
+    expected = next(
+        shard["ShardId"]
+        for shard in shards
+        if int(shard["HashKeyRange"]["StartingHashKey"])
+        <= hash_key
+        <= int(shard["HashKeyRange"]["EndingHashKey"])
+    )
+    assert len(shards) == 4
+    assert response["ShardId"] == expected
+
+
+def test_shard_listings_follow_next_token(monkeypatch):
+    monkeypatch.setattr(FakeKinesis, "shard_page_size", 2)
+    client = boto3.client("kinesis")
+    client.create_stream(StreamName="paged", ShardCount=5)
+
+    assert client.list_shards(StreamName="paged")["NextToken"]
+    assert list_shard_ids(client, "paged") == [
+        f"shardId-{index:012d}" for index in range(5)
+    ]
+    ranges = list_shard_ranges(client, "paged")
+    assert len(ranges) == 5 and ranges[-1][1] == 2**128 - 1
+
+
+def test_parallel_consumer_reads_every_shard():
+    client = boto3.client("kinesis")
+    client.create_stream(StreamName="parallel", ShardCount=3)
+    for index in range(30):
+        client.put_record(
+            StreamName="parallel", Data=str(index).encode(), PartitionKey=str(index)
+        )
+    readers = [
+        ShardReader(client, "parallel", shard_id, limit=4)
+        for shard_id in list_shard_ids(client, "parallel")
+    ]
+    metrics = MetricRegistry()
+
+    results = ParallelShardConsumer(
+        readers, lambda records, _: [int(r["Data"]) for r in records], metrics=metrics
+    ).run()
+
+    assert sorted(results) == list(range(30))
+    per_shard = {
+        name: count
+        for name, count in metrics.counters.items()
+        if name.startswith("kinesis.shard.")
+    }
+    assert len(per_shard) == 3
+    assert sum(per_shard.values()) == 30
+    assert "kinesis.shard.shardId-000000000000.lag_s" in metrics.timers
+
+
+def test_pipeline_consumes_multiple_shards(monkeypatch):
+    monkeypatch.setenv("RTAP_SHARD_COUNT", "4")
+    pipeline = Pipeline(config=RuntimeConfig.from_env())
+
+    result = pipeline.run(
+        stream_name="multi-shard",
+        bucket_name="multi-bucket",
+        table_name="multi-table",
+        event_count=20,
+    )
+
+    assert result.events_processed == 20
+    shard_counts = [
+        value
+        for name, value in result.metrics_snapshot.items()
+        if name.startswith("kinesis.shard.") and name.endswith(".records.count")
+    ]
+    assert len(shard_counts) > 1
+    assert sum(shard_counts) == 20
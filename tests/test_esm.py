@@ -0,0 +1,109 @@
+import base64
+import json
+
+import boto3
+
+from rtap.codecs import JSON_CODEC
+from rtap.esm import EventSourceMapping
+from rtap.loadgen import LoadGenerator
+
+
+def _stream(name, records, shards=2):
+    client = boto3.client("kinesis")
+    client.create_stream(StreamName=name, ShardCount=shards)
+    client.put_records(
+        StreamName=name,
+        Records=[
+            {"Data": json.dumps({"key": key, "n": n}), "PartitionKey": key}
+            for key, n in records
+        ],
+    )
+    return client
+
+
+def _payloads(event):
+    return [
+        json.loads(base64.b64decode(record["kinesis"]["data"]))
+        for record in event["Records"]
+    ]
+
+
+def test_batches_respect_size_and_keep_per_key_order():
+    records = [(f"k{i % 7}", i) for i in range(300)]
+    client = _stream("orders", records)
+    seen = []
+
+    def handler(event, context):
+        assert context.get_remaining_time_in_millis() > 0
+        assert event["Records"][0]["eventSource"] == "aws:kinesis"
+        seen.append(_payloads(event))
+
+    esm = EventSourceMapping(
+        client, "orders", handler, batch_size=16, parallelization_factor=3
+    )
+    stats = esm.run()
+
+    assert stats.records == 300 and stats.invocations == len(seen)
+    assert max(len(batch) for batch in seen) <= 16
+    by_key = {}
+    for batch in seen:
+        for payload in batch:
+            by_key.setdefault(payload["key"], []).append(payload["n"])
+    assert sorted(n for ns in by_key.values() for n in ns) == list(range(300))
+    assert all(ns == sorted(ns) for ns in by_key.values())
+    summary = esm.metrics.snapshot().summary()
+    assert summary["esm.batch.size.max"] <= 16
+    assert "esm.iterator_age_ms.p95" in summary
+    assert "esm.invocation_ms.p95" in summary
+    assert stats.records_per_second > 0
+
+
+def test_partial_failures_retry_from_the_failed_record_and_errors_drop():
+    client = _stream("retries", [("k", n) for n in range(10)], shards=1)
+    deliveries = []
+
+    def handler(event, context):
+        deliveries.append([p["n"] for p in _payloads(event)])
+        if len(deliveries) == 1:
+            failed = event["Records"][4]["kinesis"]["sequenceNumber"]
+            return {"batchItemFailures": [{"itemIdentifier": failed}]}
+        return {"batchItemFailures": []}
+
+    stats = EventSourceMapping(client, "retries", handler, batch_size=10).run()
+    assert deliveries == [list(range(10)), list(range(4, 10))]
+    assert stats.records == 10 and stats.retried_records == 6
+
+    client = _stream("poison", [("k", n) for n in range(5)], shards=1)
+    attempts = []
+
+    def failing(event, context):
+        attempts.append(len(event["Records"]))
+        raise RuntimeError("boom")
+
+    esm = EventSourceMapping(client, "poison", failing, max_retry_attempts=2)
+    stats = esm.run()
+    assert attempts == [5, 5, 5]
+    assert stats.dropped_records == 5 and stats.records == 0
+    assert esm.metrics.snapshot().counters["esm.invocations.failed"] == 3
+
+
+def test_drives_the_lambda_processor(load_script):
+    processor = load_script("lambda/processor.py")
+    client = boto3.client("kinesis")
+    client.create_stream(StreamName="sensors", ShardCount=4)
+    events = LoadGenerator(seed=3, sensor_count=50).generate(400)
+    client.put_records(
+        StreamName="sensors",
+        Records=[
+            {"Data": JSON_CODEC.encode(e), "PartitionKey": str(e.sensor_id)}
+            for e in events
+        ],
+    )
+
+    stats = EventSourceMapping(
+        client, "sensors", processor.lambda_handler, batch_size=100
+    ).run()
+
+    assert stats.records == 400 and stats.failed_invocations == 0
+    stored = processor.dynamodb.tables[processor.TABLE_NAME]
+    assert len(stored) == len({(e.sensor_id, e.timestamp) for e in events})
@@ -0,0 +1,72 @@
+import boto3
+
+from rtap.config import RuntimeConfig
+from rtap.ingest import KinesisBatchWriter
+from rtap.metrics import MetricRegistry
+from rtap.pipeline import Pipeline
+
+
+def test_batch_writer_respects_record_and_byte_limits():
+    client = boto3.client("kinesis")
+    client.create_stream(StreamName="batch-stream", ShardCount=1)
+    calls = []
+    original = client.put_records
+
+    def recording_put_records(**kwargs):
+        calls.append(len(kwargs["Records"]))
+        return original(**kwargs)
+
+    client.put_records = recording_put_records
+    writer = KinesisBatchWriter(client, "batch-stream", max_bytes=10_000)
+    failed = writer.put_many((b"x" * 90, "pk") for _ in range(1200))
+
+    assert failed == []
+    assert sum(calls) == 1200
+    assert max(calls) <= 500
+    assert all(count * 92 <= 10_000 for count in calls)
+
+
+def test_batch_writer_retries_only_failed_entries():
+    responses = [
+        {
+            "FailedRecordCount": 2,
+            "Records": [
+                {"SequenceNumber": "1", "ShardId": "shardId-000000000000"},
+                {"ErrorCode": "ProvisionedThroughputExceededException"},
+                {"ErrorCode": "InvalidArgumentException"},
+            ],
+        },
+        {"FailedRecordCount": 0, "Records": [{"SequenceNumber": "2"}]},
+    ]
+    sent = []
+
+    class FlakyKinesis:
+        def put_records(self, StreamName, Records):
+            sent.append([entry["Data"] for entry in Records])
+            return responses.pop(0)
+
+    metrics = MetricRegistry()
+    writer = KinesisBatchWriter(
+        FlakyKinesis(), "flaky", metrics=metrics, sleep=lambda _: None
+    )
+    failed = writer.put_many([(b"a", "k"), (b"b", "k"), (b"c", "k")])
+
+    assert sent == [[b"a", b"b", b"c"], [b"b"]]
+    assert [entry["Data"] for entry in failed] == [b"c"]
+    assert metrics.counters["kinesis.records.sent"] == 2
+    assert metrics.counters["kinesis.put_records.retries"] == 1
+
+
+def test_pipeline_batched_ingest(monkeypatch):
+    monkeypatch.setenv("RTAP_BATCH_INGEST", "1")
+    pipeline = Pipeline(config=RuntimeConfig.from_env())
+
+    result = pipeline.run(
+        stream_name="batched-stream",
+        bucket_name="batched-bucket",
+        table_name="batched-table",
+        event_count=12,
+    )
+
+    assert result.events_processed == 12
+    assert pipeline.metrics.counters["kinesis.put_records.requests"] == 1
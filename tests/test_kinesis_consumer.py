@@ -0,0 +1,67 @@
+import json
+
+import boto3
+from botocore.exceptions import ClientError
+
+
+def _put(client, stream, count):
+    client.put_records(
+        StreamName=stream,
+        Records=[
+            {"Data": json.dumps({"n": n}), "PartitionKey": str(n)}
+            for n in range(count)
+        ],
+    )
+
+
+def test_poll_stream_reads_all_shards_concurrently(load_script):
+    consumer = load_script("kinesis/consumer.py")
+    client = boto3.client("kinesis")
+    client.create_stream(StreamName="adaptive", ShardCount=3)
+    _put(client, "adaptive", 90)
+    seen = []
+
+    pollers = consumer.poll_stream("adaptive", seen.append, max_idle_polls=1)
+
+    assert sorted(item["n"] for item in seen) == list(range(90))
+    assert len(pollers) == 3
+    assert sum(poller.stats["records"] for poller in pollers) == 90
+    assert all(poller.stats["empty_polls"] >= 1 for poller in pollers)
+    assert all(poller.records_per_second() > 0 for poller in pollers)
+
+
+def test_shard_poller_drains_when_behind_and_backs_off_when_idle(load_script):
+    consumer = load_script("kinesis/consumer.py")
+    client = boto3.client("kinesis")
+    client.create_stream(StreamName="backoff", ShardCount=1)
+    _put(client, "backoff", 25)
+    (shard_id,) = consumer.list_shards("backoff")
+    poller = consumer.ShardPoller(
+        client, "backoff", shard_id, lambda data: None, limit=10
+    )
+
+    delays = [poller.poll() for _ in range(3)]
+    assert delays[:2] == [0.0, 0.0] and poller.stats["millis_behind"] == 0
+    assert delays[2] == consumer.MIN_POLL_INTERVAL
+    idle = [poller.poll() for _ in range(7)]
+    assert idle == [0.2, 0.4, 0.8, 1.6, 3.2, 5.0, 5.0]
+    _put(client, "backoff", 1)
+    assert poller.poll() == consumer.MIN_POLL_INTERVAL
+    assert poller.poll() == consumer.MIN_POLL_INTERVAL
+    assert poller.stats["records"] == 26 and poller.stats["empty_polls"] == 8
+
+
+class _ThrottledKinesis:
+    def get_shard_iterator(self, **kwargs):
+        return {"ShardIterator": "it"}
+
+    def get_records(self, **kwargs):
+        error = {"Error": {"Code": "ProvisionedThroughputExceededException"}}
+        raise ClientError(error, "GetRecords")
+
+
+def test_throttled_polls_back_off(load_script):
+    consumer = load_script("kinesis/consumer.py")
+    poller = consumer.ShardPoller(_ThrottledKinesis(), "s", "shardId-0")
+    assert [poller.poll() for _ in range(3)] == [0.2, 0.4, 0.8]
+    assert poller.stats["throttled"] == 3
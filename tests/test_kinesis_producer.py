@@ -0,0 +1,153 @@
+import asyncio
+import json
+import threading
+import time
+
+import boto3
+import pytest
+
+
+def _stream(name, shards=4):
+    client = boto3.client("kinesis")
+    client.create_stream(StreamName=name, ShardCount=shards)
+    return client
+
+
+def _stored(client, name):
+    return sum(
+        len(shard["records"]) for shard in client.streams[name]["shards"].values()
+    )
+
+
+class _FlakyKinesis:
+    """Fails every other record of the first put_records call."""
+
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def list_shards(self, **kwargs):
+        return self.client.list_shards(**kwargs)
+
+    def put_records(self, StreamName, Records):
+        self.calls.append(len(Records))
+        if len(self.calls) > 1:
+            return self.client.put_records(StreamName=StreamName, Records=Records)
+        kept = Records[::2]
+        response = self.client.put_records(StreamName=StreamName, Records=kept)
+        results = iter(response["Records"])
+        error = {"ErrorCode": "ProvisionedThroughputExceededException"}
+        return {
+            "FailedRecordCount": len(Records) - len(kept),
+            "Records": [
+                next(results) if index % 2 == 0 else error
+                for index in range(len(Records))
+            ],
+        }
+
+
+def test_threads_share_one_batching_producer(load_script):
+    producer_module = load_script("kinesis/producer.py")
+    client = _stream("threads")
+    producer = producer_module.KinesisProducer("threads", client=client)
+
+    def send(offset):
+        for n in range(1000):
+            producer.put({"n": offset + n}, str(offset + n))
+
+    threads = [threading.Thread(target=send, args=(i * 1000,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    producer.close()
+
+    assert _stored(client, "threads") == 4000
+    assert producer.stats["sent"] == 4000 and producer.stats["failed"] == 0
+    assert producer.stats["batches"] <= 20
+
+
+def test_partial_failures_are_retried(load_script):
+    producer_module = load_script("kinesis/producer.py")
+    client = _FlakyKinesis(_stream("flaky"))
+    with producer_module.KinesisProducer("flaky", client=client) as producer:
+        for n in range(100):
+            producer.put({"n": n}, str(n))
+        producer.flush()
+        assert producer.stats["retried"] == 50
+
+    assert client.calls == [100, 50]
+    assert _stored(client.client, "flaky") == 100
+
+
+def test_asyncio_producer_flushes_on_its_linger_timer(load_script):
+    producer_module = load_script("kinesis/producer.py")
+    client = _stream("async")
+
+    async def main():
+        async with producer_module.KinesisProducer(
+            "async", client=client, linger=0.05
+        ) as producer:
+            for n in range(3):
+                await producer.aput({"n": n}, str(n))
+            await asyncio.sleep(0.3)
+            assert _stored(client, "async") == 3
+            for n in range(1200):
+                await producer.aput(b'{"n": 0}', str(n))
+            await producer.aflush()
+            assert _stored(client, "async") == 1203
+
+    asyncio.run(main())
+
+
+def test_batches_hold_at_most_one_second_of_writes_per_shard(load_script):
+    producer_module = load_script("kinesis/producer.py")
+    client = _stream("capped", shards=1)
+    sizes = []
+    put_records = client.put_records
+
+    def record_sizes(**kwargs):
+        sizes.append(len(kwargs["Records"]))
+        return put_records(**kwargs)
+
+    client.put_records = record_sizes
+    with producer_module.KinesisProducer(
+        "capped", client=client, shard_records_per_second=100
+    ) as producer:
+        for n in range(150):
+            producer.put({"n": n}, str(n))
+
+    assert max(sizes) <= 100 and sum(sizes) == 150
+    (shard,) = client.streams["capped"]["shards"].values()
+    sent = [json.loads(record["Data"])["n"] for record in shard["records"]]
+    assert sent == list(range(150))
+
+
+def test_partition_keys_count_in_utf8_bytes(load_script):
+    producer_module = load_script("kinesis/producer.py")
+    with producer_module.KinesisProducer("utf8", client=_stream("utf8")) as producer:
+        data = b"x" * (producer_module.MAX_RECORD_BYTES - 1)
+        producer.put(data, "k")
+        with pytest.raises(ValueError):
+            producer.put(data, "\u00e9")
+
+
+def test_token_bucket_paces_shard_writes(load_script):
+    producer_module = load_script("kinesis/producer.py")
+    now = [0.0]
+    bucket = producer_module.TokenBucket(1000, clock=lambda: now[0])
+    assert bucket.reserve(600) == 0.0
+    assert bucket.reserve(900) == 0.5
+    now[0] = 1.0
+    assert bucket.reserve(500) == 0.0
+
+    client = _stream("paced", shards=1)
+    start = time.perf_counter()
+    with producer_module.KinesisProducer(
+        "paced", client=client, shard_records_per_second=200
+    ) as producer:
+        for n in range(300):
+            producer.put({"n": n}, str(n))
+    assert time.perf_counter() - start >= 0.45
+    assert producer.stats["throttled_s"] > 0
+    assert _stored(client, "paced") == 300
@@ -0,0 +1,101 @@
+import base64
+
+import pytest
+
+from rtap.aggregation import RecordAggregator
+from rtap.codecs import BINARY_CODEC, JSON_CODEC
+from rtap.partitioning import DEFAULT_SENSOR_BUCKETS
+from rtap.plugins.base import EventPayload
+
+# 2024-03-05T07:30:00Z
+TIMESTAMP = 1709623800
+
+
+@pytest.fixture
+def load_processor(monkeypatch, load_script):
+    def load(**env):
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        processor = load_script("lambda/processor.py")
+        monkeypatch.setattr(processor.time, "sleep", lambda seconds: None)
+        return processor
+
+    return load
+
+
+def _record(data, sequence_number):
+    encoded = base64.b64encode(data).decode("ascii")
+    return {"kinesis": {"data": encoded, "sequenceNumber": sequence_number}}
+
+
+def _events(count):
+    return [
+        EventPayload(sensor_id, 20.0 + sensor_id / 10, 45.0, TIMESTAMP)
+        for sensor_id in range(count)
+    ]
+
+
+class _CountingDynamoDB:
+    def __init__(self, client):
+        self.client = client
+        self.calls = 0
+
+    def batch_write_item(self, **kwargs):
+        self.calls += 1
+        return self.client.batch_write_item(**kwargs)
+
+
+def test_batch_mode_batches_writes_and_decodes_base64(monkeypatch, load_processor):
+    processor = load_processor(REPORT_BATCH_ITEM_FAILURES="1")
+    dynamodb = _CountingDynamoDB(processor.dynamodb)
+    monkeypatch.setattr(processor, "dynamodb", dynamodb)
+    events = _events(60)
+    aggregator = RecordAggregator()
+    for event in events[50:]:
+        aggregator.add(BINARY_CODEC.encode(event), "key")
+    (aggregated,) = aggregator.flush()
+    records = [
+        _record(JSON_CODEC.encode(event), str(index))
+        for index, event in enumerate(events[:50])
+    ] + [_record(aggregated.data, "50")]
+
+    response = processor.lambda_handler({"Records": records}, None)
+
+    assert response["batchItemFailures"] == []
+    assert dynamodb.calls == 3
+    stored = dynamodb.client.tables[processor.TABLE_NAME]
+    assert len(stored) == 60
+    keys = [
+        key
+        for key in processor.s3.buckets[processor.BUCKET_NAME]
+        if key.startswith("processed/dt=2024-03-05/hour=07/")
+    ]
+    assert len(keys) == DEFAULT_SENSOR_BUCKETS
+
+
+def test_only_failed_records_are_reported(load_processor):
+    processor = load_processor(REPORT_BATCH_ITEM_FAILURES="1")
+    events = _events(3)
+    records = [
+        _record(JSON_CODEC.encode(events[0]), "100"),
+        _record(b"not an event", "101"),
+        _record(JSON_CODEC.encode(events[2]), "102"),
+    ]
+
+    response = processor.lambda_handler({"Records": records}, None)
+    assert response["batchItemFailures"] == [{"itemIdentifier": "101"}]
+
+    processor.dynamodb.write_capacity = 0
+    response = processor.lambda_handler({"Records": records}, None)
+    assert response["batchItemFailures"] == [
+        {"itemIdentifier": "100"},
+        {"itemIdentifier": "101"},
+        {"itemIdentifier": "102"},
+    ]
+
+
+def test_failures_raise_by_default(monkeypatch, load_processor):
+    monkeypatch.delenv("REPORT_BATCH_ITEM_FAILURES", raising=False)
+    processor = load_processor()
+    with pytest.raises(RuntimeError):
+        processor.lambda_handler({"Records": [_record(b"{", "1")]}, None)
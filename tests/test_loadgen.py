@@ -0,0 +1,61 @@
+from collections import Counter
+
+from rtap.config import RuntimeConfig
+from rtap.loadgen import LoadGenerator
+from rtap.pipeline import Pipeline
+
+
+def test_load_generator_streams_bounded_batches_reproducibly():
+    generator = LoadGenerator(seed=7, batch_size=1000, start_timestamp=1_000)
+
+    sizes = [len(batch) for batch in generator.iter_batches(2500)]
+    first = generator.generate(300)
+
+    assert sizes == [1000, 1000, 500]
+    assert first == LoadGenerator(seed=7, start_timestamp=1_000).generate(300)
+
+
+def test_load_generator_skews_sensors_and_advances_timestamps():
+    generator = LoadGenerator(
+        sensor_count=500, events_per_second=100.0, start_timestamp=1_000
+    )
+
+    events = generator.generate(20_000)
+    counts = Counter(event.sensor_id for event in events)
+    timestamps = [event.timestamp for event in events]
+
+    assert max(counts) <= 500
+    assert counts.most_common(1)[0][0] == 1
+    assert counts[1] > 20 * counts.get(250, 1)
+    assert timestamps == sorted(timestamps)
+    assert timestamps[0] == 1_000
+    assert timestamps[-1] == 1_000 + 19_999 // 100
+
+
+def test_load_generator_emits_anomaly_bursts():
+    generator = LoadGenerator(
+        anomaly_rate=0.05, anomaly_burst=20, batch_size=4000, start_timestamp=0
+    )
+
+    batch = next(generator.iter_batches(4000))
+    hot = [index for index, value in enumerate(batch.temperature) if value >= 60.0]
+
+    assert 100 <= len(hot) <= 200
+    start = hot[0]
+    assert {batch.sensor_id[i] for i in range(start, start + 20)} == {
+        batch.sensor_id[start]
+    }
+
+
+def test_pipeline_uses_load_generator(monkeypatch):
+    monkeypatch.setenv("RTAP_LOAD_SENSORS", "50")
+    pipeline = Pipeline(config=RuntimeConfig.from_env())
+
+    result = pipeline.run(
+        stream_name="load-stream",
+        bucket_name="load-bucket",
+        table_name="load-table",
+        event_count=60,
+    )
+
+    assert result.events_processed == 60
@@ -0,0 +1,106 @@
+import boto3
+
+from rtap.codecs import JSON_CODEC
+from rtap.config import RuntimeConfig
+from rtap.partitioning import PartitionedS3Writer, partition_path
+from rtap.pipeline import Pipeline
+from rtap.plugins.base import EventPayload
+
+# 2024-03-05T07:30:00Z
+TIMESTAMP = 1709623800
+
+
+def _event(sensor_id, timestamp=TIMESTAMP):
+    return EventPayload(sensor_id, 21.5, 40.0, timestamp)
+
+
+def _lines(s3, bucket, key):
+    body = s3.get_object(Bucket=bucket, Key=key)["Body"].read()
+    return [JSON_CODEC.decode(line) for line in body.splitlines()]
+
+
+def test_partition_path_uses_utc_hour_and_sensor_bucket():
+    assert partition_path(_event(35), 16) == "dt=2024-03-05/hour=07/sensor_bucket=3"
+    assert partition_path(_event(4, TIMESTAMP + 17 * 3600), 4) == (
+        "dt=2024-03-06/hour=00/sensor_bucket=0"
+    )
+
+
+def test_writer_routes_events_and_rolls_files():
+    s3 = boto3.client("s3")
+    writer = PartitionedS3Writer(
+        s3, "lake", sensor_buckets=2, target_file_bytes=150, run_id="run"
+    )
+    events = [_event(sensor_id) for sensor_id in range(1, 11)]
+    writer.write_many(events)
+    keys = writer.close()
+
+    odd = [key for key in keys if "sensor_bucket=1/" in key]
+    even = [key for key in keys if "sensor_bucket=0/" in key]
+    assert odd[0] == (
+        "processed/dt=2024-03-05/hour=07/sensor_bucket=1/part-run-00000.jsonl"
+    )
+    assert len(odd) > 1 and len(even) > 1
+    read_back = [event for key in keys for event in _lines(s3, "lake", key)]
+    assert sorted(read_back, key=lambda e: e.sensor_id) == events
+    assert writer.metrics.snapshot().summary()["s3.partitioned.files.count"] == len(
+        keys
+    )
+
+
+def test_writer_caps_open_partitions():
+    s3 = boto3.client("s3")
+    writer = PartitionedS3Writer(
+        s3, "lake", sensor_buckets=8, max_open_partitions=2, run_id="lru"
+    )
+    for sensor_id in (0, 1, 2, 0):
+        writer.write(_event(sensor_id))
+        assert len(writer._open) <= 2
+    keys = writer.close()
+
+    bucket_zero = [key for key in keys if "sensor_bucket=0/" in key]
+    assert [key.rsplit("-", 1)[-1] for key in bucket_zero] == [
+        "00000.jsonl",
+        "00001.jsonl",
+    ]
+
+
+def test_pipeline_writes_partitioned_output():
+    pipeline = Pipeline(config=RuntimeConfig(partitioned_output=True))
+    result = pipeline.run(
+        stream_name="partitioned-stream",
+        bucket_name="partitioned-bucket",
+        table_name="partitioned-table",
+        event_count=12,
+    )
+
+    s3 = boto3.client("s3")
+    keys = [
+        key
+        for key in s3.buckets["partitioned-bucket"]
+        if key.startswith("processed/dt=")
+    ]
+    events = [event for key in keys for event in _lines(s3, "partitioned-bucket", key)]
+    assert len(events) == result.events_processed == 12
+    assert all(key.endswith(".jsonl") for key in keys)
+
+
+def test_lambda_processor_writes_one_object_per_partition(load_script):
+    processor = load_script("lambda/processor.py")
+    records = [
+        {"kinesis": {"data": JSON_CODEC.encode(_event(sensor_id))}}
+        for sensor_id in (1, 17, 2)
+    ]
+
+    processor.lambda_handler({"Records": records}, None)
+
+    keys = [
+        key
+        for key in processor.s3.buckets["your-s3-bucket"]
+        if key.startswith("processed/dt=2024-03-05/hour=07/")
+    ]
+    assert len(keys) == 2
+    assert sorted(len(_lines(processor.s3, "your-s3-bucket", k)) for k in keys) == [
+        1,
+        2,
+    ]
@@ -0,0 +1,36 @@
+import boto3
+
+from rtap.config import RuntimeConfig
+from rtap.pipeline import Pipeline
+
+
+def _run(config, stream_name, event_count):
+    pipeline = Pipeline(config=config)
+    result = pipeline.run(
+        stream_name=stream_name,
+        bucket_name="streaming-bucket",
+        table_name="streaming-table",
+        event_count=event_count,
+        report_key=f"reports/{stream_name}.jsonl",
+    )
+    return pipeline, result
+
+
+def test_streaming_mode_matches_batch_report():
+    _, batch = _run(RuntimeConfig(), "batch-stream", 45)
+    pipeline, streaming = _run(
+        RuntimeConfig(streaming=True, stream_window=10), "window-stream", 45
+    )
+
+    assert streaming.events_processed == 45
+    assert streaming.report == batch.report
+    assert pipeline.metrics.snapshot().summary()["pipeline.consume.count"] == 5.0
+
+    s3 = boto3.client("s3")
+    bodies = [
+        s3.get_object(Bucket="streaming-bucket", Key=f"reports/{name}.jsonl")["Body"]
+        .read()
+        .decode("utf-8")
+        for name in ("batch-stream", "window-stream")
+    ]
+    assert len(bodies[0].splitlines()) == len(bodies[1].splitlines()) == 45
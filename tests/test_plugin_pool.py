@@ -0,0 +1,71 @@
+from dataclasses import dataclass
+
+import pytest
+
+from rtap.config import RuntimeConfig
+from rtap.metrics import MetricRegistry
+from rtap.pipeline import Pipeline
+from rtap.plugins.base import EventPayload
+from rtap.plugins.builtin import HumidityClampPlugin, NormalizeTemperaturePlugin
+from rtap.plugins.parallel import ProcessPoolPluginRunner
+
+
+@dataclass
+class FailingPlugin:
+    name: str = "failing"
+
+    def process(self, payload: EventPayload) -> EventPayload:
+        if payload.sensor_id == 7:
+            raise RuntimeError("bad sensor 7")
+        return payload
+
+
+def _events(count):
+    return [
+        EventPayload(sensor_id=i, temperature=70.0 + i, humidity=i * 2.0, timestamp=i)
+        for i in range(count)
+    ]
+
+
+def test_runner_preserves_order_and_merges_worker_timings():
+    plugins = [NormalizeTemperaturePlugin(), HumidityClampPlugin()]
+    metrics = MetricRegistry()
+    events = _events(100)
+
+    with ProcessPoolPluginRunner(
+        plugins, max_workers=2, chunk_size=16, metrics=metrics
+    ) as runner:
+        result = runner.process_many(events)
+
+    expected = events
+    for plugin in plugins:
+        expected = [plugin.process(event) for event in expected]
+    assert result == expected
+    assert len(metrics.timers["plugins.normalize_temperature"]) == 7
+    worker_events = [
+        count
+        for name, count in metrics.counters.items()
+        if name.startswith("plugins.worker.")
+    ]
+    assert sum(worker_events) == 100
+
+
+def test_runner_reraises_plugin_exceptions():
+    with ProcessPoolPluginRunner([FailingPlugin()], max_workers=1) as runner:
+        with pytest.raises(RuntimeError, match="bad sensor 7"):
+            runner.process_many(_events(10))
+
+
+def test_pipeline_runs_plugins_on_process_pool():
+    pipeline = Pipeline(config=RuntimeConfig(plugin_workers=2))
+    pipeline.plugins.register_builtin(["normalize_temperature", "clamp_humidity"])
+
+    result = pipeline.run(
+        stream_name="pool-stream",
+        bucket_name="pool-bucket",
+        table_name="pool-table",
+        event_count=20,
+    )
+
+    assert result.events_processed == 20
+    assert result.metrics_snapshot["plugins.clamp_humidity.count"] >= 1
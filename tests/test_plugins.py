@@ -1,3 +1,5 @@
+import pytest
+
 from rtap.plugins.base import EventPayload
 from rtap.plugins.loader import PluginRegistry
 
@@ -20,3 +22,77 @@ def test_registry_rejects_unknown_plugin():
         assert "Unknown builtin plugin" in str(exc)
     else:
         raise AssertionError("Expected ValueError")
+
+
+def test_event_payload_is_slotted():
+    payload = EventPayload(sensor_id=1, temperature=20.0, humidity=40.0, timestamp=1)
+
+    assert not hasattr(payload, "__dict__")
+
+
+def test_in_place_mode_mutates_owned_payloads():
+    copying = PluginRegistry()
+    copying.register_builtin(["normalize_temperature", "clamp_humidity"])
+    in_place = PluginRegistry(mutate_in_place=True)
+    in_place.register_builtin(["normalize_temperature", "clamp_humidity"])
+    payload = EventPayload(sensor_id=1, temperature=80.0, humidity=120.0, timestamp=1)
+
+    expected = copying.process_all(payload)
+    result = in_place.process_all(payload)
+
+    assert result is payload
+    assert result == expected
+
+
+def test_compiled_chain_matches_interpreted_chain():
+    registry = PluginRegistry()
+    registry.register_builtin(
+        ["normalize_temperature", "passthrough", "clamp_humidity"] * 3
+    )
+    payloads = [
+        EventPayload(sensor_id=i, temperature=40.0 + i, humidity=i * 7.5, timestamp=i)
+        for i in range(40)
+    ]
+
+    expected = [registry.process_all(payload) for payload in payloads]
+    chain = registry.freeze()
+
+    assert [chain(payload) for payload in payloads] == expected
+    assert [registry.process_all(payload) for payload in payloads] == expected
+
+
+def test_compiled_chain_is_cached_until_registry_changes():
+    registry = PluginRegistry()
+    registry.register_builtin(["passthrough"])
+    noop = registry.compile()
+    payload = EventPayload(sensor_id=1, temperature=80.0, humidity=20.0, timestamp=1)
+
+    assert noop(payload) is payload
+    assert registry.compile() is noop
+    registry.register_builtin(["normalize_temperature"])
+    normalize = registry.compile()
+    assert normalize is not noop
+    # Swapping in a new plugin object recompiles even at the same position.
+    registry.plugins[1] = type(registry.plugins[1])()
+    assert registry.compile() is not normalize
+
+    registry.freeze()
+    with pytest.raises(RuntimeError):
+        registry.register_builtin(["clamp_humidity"])
+
+
+def test_frozen_chain_follows_mode_changes():
+    registry = PluginRegistry()
+    registry.register_builtin(["normalize_temperature", "clamp_humidity"])
+    registry.freeze()
+    payload = EventPayload(sensor_id=1, temperature=80.0, humidity=120.0, timestamp=1)
+
+    copied = registry.process_all(payload)
+    assert copied is not payload and payload.humidity == 120.0
+
+    registry.mutate_in_place = True
+    assert registry.process_all(payload) is payload
+    assert payload == copied
+
+    registry.mutate_in_place = False
+    assert registry.process_all(copied) is not copied
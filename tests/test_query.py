@@ -0,0 +1,191 @@
+import boto3
+import pytest
+
+from rtap.loadgen import LoadGenerator
+from rtap.partitioning import PartitionedS3Writer
+from rtap.query import (
+    QueryEngine,
+    QuerySyntaxError,
+    Table,
+    parse_create_table,
+    parse_query,
+)
+from rtap.segments import encode_segment
+
+# 2024-03-05T00:00:00Z
+START = 1709596800
+COLUMNS = {
+    "sensor_id": "string",
+    "temperature": "double",
+    "humidity": "double",
+    "timestamp": "bigint",
+}
+DDL = """
+CREATE EXTERNAL TABLE IF NOT EXISTS lake.events (
+    sensor_id STRING, temperature DOUBLE, humidity DOUBLE, timestamp BIGINT
+)
+PARTITIONED BY (dt STRING, hour STRING, sensor_bucket INT)
+ROW FORMAT SERDE 'org.openx.data.jsonserde.JsonSerDe'
+LOCATION 's3://query-lake/processed/';
+"""
+
+
+def _events():
+    # Two hours of events, one every 3.6 seconds, over 8 sensors.
+    generator = LoadGenerator(
+        seed=7, sensor_count=8, start_timestamp=START, events_per_second=1 / 3.6
+    )
+    return generator.generate(2000)
+
+
+def _write_partitioned(events):
+    writer = PartitionedS3Writer(
+        boto3.client("s3"), "query-lake", sensor_buckets=4, run_id="q"
+    )
+    writer.write_many(events)
+    return writer.close()
+
+
+def test_parse_query_and_table_definition():
+    query = parse_query(
+        "SELECT sensor_id, COUNT(*) AS n FROM lake.events "
+        "WHERE temperature >= 30 AND dt = '2024-03-05' "
+        "GROUP BY sensor_id ORDER BY n DESC LIMIT 3;"
+    )
+    assert query.table == "lake.events"
+    assert [c.column for c in query.where] == ["temperature", "dt"]
+    assert query.order_by == ("n", True) and query.limit == 3
+
+    table = parse_create_table(DDL)
+    assert table.name == "lake.events"
+    assert table.columns == COLUMNS
+    assert list(table.partition_keys) == ["dt", "hour", "sensor_bucket"]
+
+    with pytest.raises(QuerySyntaxError):
+        parse_query("SELECT median(temperature) FROM events")
+
+
+def test_engine_prunes_partitions_and_aggregates():
+    events = _events()
+    keys = _write_partitioned(events)
+    engine = QueryEngine(boto3.client("s3"))
+
+    result = engine.execute(
+        "SELECT sensor_id, COUNT(*) AS n, MAX(temperature) AS hottest FROM events "
+        "WHERE hour = '01' AND sensor_bucket = 2 AND temperature > 25 "
+        "GROUP BY sensor_id ORDER BY sensor_id",
+        parse_create_table(DDL),
+    )
+    rows = list(result.rows)
+
+    matching = [
+        e
+        for e in events
+        if (e.timestamp - START) // 3600 == 1
+        and e.sensor_id % 4 == 2
+        and e.temperature > 25
+    ]
+    expected = sorted(
+        (
+            sensor,
+            sum(1 for e in matching if e.sensor_id == sensor),
+            max(e.temperature for e in matching if e.sensor_id == sensor),
+        )
+        for sensor in {e.sensor_id for e in matching}
+    )
+    assert rows == expected
+    assert result.columns == ["sensor_id", "n", "hottest"]
+    assert result.types == ["string", "bigint", "double"]
+    assert result.stats.objects_scanned == 1
+    assert result.stats.objects_pruned == len(keys) - 1
+
+
+def test_engine_pushes_predicates_into_segments():
+    s3 = boto3.client("s3")
+    events = _events()
+    s3.put_object(
+        Bucket="segments", Key="events/all.rtseg", Body=encode_segment(events, 100)
+    )
+    table = Table("events", "s3://segments/events", dict(COLUMNS))
+    engine = QueryEngine(s3)
+
+    result = engine.execute(
+        f"SELECT COUNT(*), AVG(humidity) FROM events WHERE timestamp < {START + 360}",
+        table,
+    )
+    ((count, humidity),) = list(result.rows)
+
+    early = [e for e in events if e.timestamp < START + 360]
+    assert count == len(early)
+    assert humidity == pytest.approx(sum(e.humidity for e in early) / len(early))
+    assert result.stats.blocks_skipped == 18
+    # Only two blocks of the timestamp and humidity columns are decoded.
+    assert result.stats.bytes_scanned == 2 * 2 * 100 * 8
+
+
+def test_segment_bytes_are_counted_before_a_limit_stops_the_scan():
+    boto3.client("s3").put_object(
+        Bucket="segments",
+        Key="events/all.rtseg",
+        Body=encode_segment(_events(), 100),
+    )
+    table = Table("events", "s3://segments/events", dict(COLUMNS))
+
+    result = QueryEngine(boto3.client("s3")).execute(
+        "SELECT temperature FROM events LIMIT 5", table
+    )
+
+    assert len(list(result.rows)) == 5
+    assert result.stats.bytes_scanned == 100 * 8
+
+
+def test_partition_values_take_their_declared_type():
+    writer = PartitionedS3Writer(
+        boto3.client("s3"), "query-lake", sensor_buckets=12, run_id="q"
+    )
+    writer.write_many(_events())
+    writer.close()
+
+    result = QueryEngine(boto3.client("s3")).execute(
+        "SELECT sensor_bucket, COUNT(*) AS n FROM events "
+        "WHERE sensor_bucket >= 2 GROUP BY sensor_bucket ORDER BY sensor_bucket",
+        parse_create_table(DDL),
+    )
+
+    # LoadGenerator sensor ids run from 1 to 8.
+    assert [bucket for bucket, _ in result.rows] == [2, 3, 4, 5, 6, 7, 8]
+
+
+def test_fake_athena_runs_queries_and_paginates(load_script):
+    _write_partitioned(_events())
+    athena = boto3.client("athena")
+    output = {"OutputLocation": "s3://query-results/"}
+    athena.start_query_execution(QueryString=DDL, ResultConfiguration=output)
+
+    started = athena.start_query_execution(
+        QueryString="SELECT * FROM events WHERE dt = '2024-03-05' LIMIT 25",
+        QueryExecutionContext={"Database": "lake"},
+        ResultConfiguration=output,
+    )
+    execution_id = started["QueryExecutionId"]
+    execution = athena.get_query_execution(QueryExecutionId=execution_id)
+    assert execution["QueryExecution"]["Status"]["State"] == "SUCCEEDED"
+    assert execution["QueryExecution"]["Statistics"]["DataScannedInBytes"] > 0
+
+    script = load_script("athena/athena_queries.py")
+    assert script.wait_for_query(athena, execution_id) == "SUCCEEDED"
+    rows = list(script.iter_result_rows(athena, execution_id, page_size=10))
+    assert len(rows) == 26
+    assert [cell["VarCharValue"] for cell in rows[0]["Data"]][-3:] == [
+        "dt",
+        "hour",
+        "sensor_bucket",
+    ]
+
+    failed = athena.start_query_execution(
+        QueryString="SELECT * FROM missing",
+        QueryExecutionContext={"Database": "lake"},
+        ResultConfiguration=output,
+    )
+    status = athena.get_query_execution(QueryExecutionId=failed["QueryExecutionId"])
+    assert status["QueryExecution"]["Status"]["State"] == "FAILED"
@@ -0,0 +1,98 @@
+import gzip
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+
+from rtap.codecs import JSON_CODEC
+from rtap.loadgen import LoadGenerator
+
+CREATE = """
+CREATE TABLE events (
+    sensor_id BIGINT, temperature DOUBLE PRECISION, humidity DOUBLE PRECISION,
+    timestamp BIGINT
+) DISTSTYLE KEY DISTKEY (sensor_id) SORTKEY (timestamp);
+"""
+
+
+def _run(client, sql, **kwargs):
+    statement_id = client.execute_statement(
+        ClusterIdentifier="rtap", Database="dev", Sql=sql, **kwargs
+    )["Id"]
+    return statement_id, client.describe_statement(Id=statement_id)
+
+
+def test_copy_loads_json_from_s3_and_results_are_paginated(load_script):
+    events = LoadGenerator(seed=5, sensor_count=20).generate(2500)
+    # Split on a line boundary so each object holds whole records.
+    first = b"\n".join(JSON_CODEC.encode(event) for event in events[:1200])
+    rest = b"\n".join(JSON_CODEC.encode(event) for event in events[1200:])
+    s3 = boto3.client("s3")
+    s3.put_object(Bucket="warehouse", Key="load/part-0.jsonl", Body=first)
+    s3.put_object(
+        Bucket="warehouse",
+        Key="load/part-1.jsonl",
+        Body=gzip.compress(rest),
+        ContentEncoding="gzip",
+    )
+    client = boto3.client("redshift-data")
+    _run(client, CREATE)
+
+    script = load_script("redshift/redshift_operations.py")
+    status = script.load_data_from_s3(
+        "rtap", "dev", "events", "warehouse", "load/", "arn:aws:iam::1:role/copy"
+    )
+    assert status["Status"] == "FINISHED" and status["ResultRows"] == 2500
+
+    statement_id, described = _run(client, "SELECT sensor_id, temperature FROM events")
+    assert described["HasResultSet"] and described["ResultRows"] == 2500
+    first_page = client.get_statement_result(Id=statement_id)
+    assert len(first_page["Records"]) == 1000 and "NextToken" in first_page
+    assert [c["typeName"] for c in first_page["ColumnMetadata"]] == ["int8", "float8"]
+    records = list(script.iter_statement_records(client, statement_id))
+    assert len(records) == 2500
+    loaded = sorted(
+        (sensor["longValue"], temperature["doubleValue"])
+        for sensor, temperature in records
+    )
+    assert loaded == sorted((e.sensor_id, e.temperature) for e in events)
+
+
+def test_parameters_failures_and_missing_statements():
+    client = boto3.client("redshift-data")
+    _run(client, CREATE)
+    _run(client, "INSERT INTO events VALUES (1, 20.5, 40, 100), (2, NULL, 41, 101)")
+
+    statement_id, described = _run(
+        client,
+        "SELECT COUNT(*), MAX(temperature) FROM events WHERE sensor_id >= :low",
+        Parameters=[{"name": "low", "value": "1"}],
+    )
+    assert described["Status"] == "FINISHED"
+    assert client.get_statement_result(Id=statement_id)["Records"] == [
+        [{"longValue": 2}, {"doubleValue": 20.5}]
+    ]
+
+    _, failed = _run(client, "COPY missing FROM 's3://warehouse/load/' JSON 'auto'")
+    assert failed["Status"] == "FAILED" and "missing" in failed["Error"]
+    with pytest.raises(ClientError) as excinfo:
+        client.describe_statement(Id="no-such-statement")
+    assert excinfo.value.response["Error"]["Code"] == "ResourceNotFoundException"
+
+
+@pytest.mark.parametrize(
+    "body, encoding",
+    [(b'{"sensor_id": 1}', "gzip"), (b'{"sensor_id": ', None), (b"[1, 2]", None)],
+)
+def test_copy_of_unreadable_objects_fails_the_statement(body, encoding):
+    extra = {"ContentEncoding": encoding} if encoding else {}
+    boto3.client("s3").put_object(
+        Bucket="warehouse", Key="bad/part-0.jsonl", Body=body, **extra
+    )
+    client = boto3.client("redshift-data")
+    _run(client, CREATE)
+
+    _, status = _run(client, "COPY events FROM 's3://warehouse/bad/' JSON 'auto'")
+
+    assert status["Status"] == "FAILED"
+    assert "Load into table 'events' failed" in status["Error"]
@@ -0,0 +1,74 @@
+import boto3
+import pytest
+
+from rtap.config import RuntimeConfig
+from rtap.loadgen import LoadGenerator
+from rtap.metrics import MetricRegistry
+from rtap.pipeline import Pipeline
+from rtap.reporting import AnalyticsReport
+from rtap.segments import SegmentReader, encode_segment
+
+
+def _events(count):
+    return LoadGenerator(seed=3, sensor_count=20, start_timestamp=0).generate(count)
+
+
+def test_segment_round_trips_events_and_projects_columns():
+    events = _events(250)
+    reader = SegmentReader(encode_segment(events, block_rows=64))
+
+    assert reader.row_count == 250
+    assert len(reader.footer["blocks"]) == 4
+    assert reader.read_batch().to_events() == events
+    projected = reader.read(columns=["humidity"])
+    assert list(projected) == ["humidity"]
+    assert projected["humidity"].tolist() == [event.humidity for event in events]
+
+
+def test_zone_maps_skip_blocks_and_rows_are_filtered_exactly():
+    # Timestamps advance by one per 1000 events, so blocks cover disjoint ranges.
+    events = _events(4000)
+    metrics = MetricRegistry()
+    reader = SegmentReader(encode_segment(events, block_rows=1000), metrics=metrics)
+
+    where = {"timestamp": (2, 2), "temperature": (30.0, None)}
+    result = reader.read(columns=["sensor_id"], where=where)
+
+    expected = [
+        event.sensor_id
+        for event in events
+        if event.timestamp == 2 and event.temperature >= 30.0
+    ]
+    assert result["sensor_id"].tolist() == expected
+    summary = metrics.snapshot().summary()
+    assert summary["segments.blocks.read.count"] == 1
+    assert summary["segments.blocks.skipped.count"] == 3
+
+
+def test_reader_rejects_unknown_columns_and_foreign_data():
+    reader = SegmentReader(encode_segment(_events(3)))
+    with pytest.raises(ValueError):
+        reader.read(columns=["pressure"])
+    with pytest.raises(ValueError):
+        SegmentReader(b'{"sensor_id": 1}')
+
+
+def test_pipeline_writes_segment_next_to_report():
+    pipeline = Pipeline(config=RuntimeConfig(segment_output=True))
+    result = pipeline.run(
+        stream_name="segment-stream",
+        bucket_name="segment-bucket",
+        table_name="segment-table",
+        event_count=15,
+        report_key="reports/segment.jsonl",
+    )
+
+    segment = AnalyticsReport.from_s3("segment-bucket", "reports/segment.rtseg")
+    jsonl = AnalyticsReport.from_s3("segment-bucket", "reports/segment.jsonl")
+    assert segment.events == jsonl.events
+    assert segment.summary() == result.report
+    body = boto3.client("s3").get_object(
+        Bucket="segment-bucket", Key="reports/segment.rtseg"
+    )["Body"].read()
+    hot = AnalyticsReport.from_segment(body, where={"temperature": (30.0, None)})
+    assert hot.events == [e for e in jsonl.events if e.temperature >= 30.0]
@@ -0,0 +1,179 @@
+import json
+
+import pytest
+from botocore.exceptions import ClientError
+
+from fake_aws import FakeDynamoDB, FakeLambda
+from rtap.config import RuntimeConfig
+from rtap.metrics import MetricRegistry
+from rtap.pipeline import Pipeline
+from rtap.plugins.base import EventPayload
+from rtap.sinks import DynamoDBBatchWriter, LambdaBatchSink
+
+
+def _events(count):
+    return [
+        EventPayload(sensor_id=index, temperature=20.0, humidity=40.0, timestamp=index)
+        for index in range(count)
+    ]
+
+
+def test_dynamodb_writer_groups_items_in_batches_of_25():
+    client = FakeDynamoDB()
+    metrics = MetricRegistry()
+    writer = DynamoDBBatchWriter(client, "events", metrics=metrics)
+
+    failed = writer.write_many(_events(60))
+
+    assert failed == []
+    assert len(client.tables["events"]) == 60
+    assert metrics.counters["dynamodb.batch_write.requests"] == 3
+    assert len(metrics.timers["dynamodb.batch_write"]) == 3
+
+
+def test_dynamodb_writer_retries_unprocessed_items_with_backoff():
+    client = FakeDynamoDB(write_capacity=10)
+    delays = []
+    writer = DynamoDBBatchWriter(client, "events", sleep=delays.append)
+
+    failed = writer.write_many(_events(25))
+
+    assert failed == []
+    assert len(client.tables["events"]) == 25
+    assert delays == [0.05, 0.1]
+
+
+def test_fake_batch_write_item_rejects_oversized_batches():
+    client = FakeDynamoDB()
+    requests = [
+        {"PutRequest": {"Item": {"sensor_id": {"S": str(i)}, "timestamp": {"N": "1"}}}}
+        for i in range(26)
+    ]
+    with pytest.raises(ClientError):
+        client.batch_write_item(RequestItems={"events": requests})
+
+
+def test_dynamodb_writer_keeps_the_last_write_for_a_duplicate_key():
+    client = FakeDynamoDB()
+    metrics = MetricRegistry()
+    writer = DynamoDBBatchWriter(client, "events", metrics=metrics)
+    events = [
+        EventPayload(sensor_id=index % 5, temperature=float(index), humidity=40.0, timestamp=1)
+        for index in range(30)
+    ]
+
+    failed = writer.write_many(events)
+
+    assert failed == []
+    assert len(client.tables["events"]) == 5
+    assert client.tables["events"][("0", "1")]["temperature"] == {"N": "25.0"}
+    assert metrics.counters["dynamodb.items.deduplicated"] == 25
+
+
+def test_fake_batch_write_item_rejects_duplicate_keys():
+    client = FakeDynamoDB()
+    item = {"sensor_id": {"S": "1"}, "timestamp": {"N": "1"}}
+    with pytest.raises(ClientError) as excinfo:
+        client.batch_write_item(
+            RequestItems={"events": [{"PutRequest": {"Item": item}}] * 2}
+        )
+    assert excinfo.value.response["Error"]["Code"] == "ValidationException"
+
+
+def test_pipeline_uses_dynamodb_batch_writer():
+    pipeline = Pipeline(config=RuntimeConfig(dynamodb_batch=True))
+    result = pipeline.run(
+        stream_name="ddb-stream",
+        bucket_name="ddb-bucket",
+        table_name="ddb-table",
+        event_count=30,
+    )
+
+    # Generated events share a timestamp, so most of them repeat a key.
+    counters = pipeline.metrics.counters
+    assert result.events_processed == 30
+    assert (
+        counters["dynamodb.items.written"] + counters["dynamodb.items.deduplicated"]
+        == 30
+    )
+
+
+def test_lambda_sink_batches_payloads_and_waits_for_in_flight_calls():
+    client = FakeLambda()
+    metrics = MetricRegistry()
+    sink = LambdaBatchSink(
+        client, "rtap-processor", metrics=metrics, max_payload_bytes=1024
+    )
+
+    sink.write_many(_events(100))
+    sink.close()
+
+    assert sink.in_flight == 0
+    assert all(call["InvocationType"] == "Event" for call in client.invocations)
+    assert all(len(call["Payload"]) <= 1024 for call in client.invocations)
+    delivered = [
+        event
+        for call in client.invocations
+        for event in json.loads(call["Payload"])["events"]
+    ]
+    assert len(delivered) == 100
+    assert metrics.counters["lambda.events.dispatched"] == 100
+
+
+def test_lambda_sink_payloads_fill_up_to_the_limit_exactly():
+    event = EventPayload(sensor_id=7, temperature=20.0, humidity=40.0, timestamp=7)
+    encoded = json.dumps(event.as_dict()).encode("utf-8")
+    # Room for exactly three events and their two ", " separators.
+    limit = len(b'{"events": [') + 3 * len(encoded) + 2 * len(b", ") + len(b"]}")
+    for max_payload_bytes, expected in ((limit, [3, 3, 1]), (limit - 1, [2] * 3 + [1])):
+        client = FakeLambda()
+        sink = LambdaBatchSink(
+            client, "rtap-processor", max_payload_bytes=max_payload_bytes
+        )
+
+        sink.write_many([event] * 7)
+        sink.close()
+
+        payloads = [json.loads(call["Payload"]) for call in client.invocations]
+        sizes = [len(call["Payload"]) for call in client.invocations]
+        assert all(size <= max_payload_bytes for size in sizes)
+        assert [len(payload["events"]) for payload in payloads] == expected
+
+
+class _FailingLambda:
+    def invoke(self, **kwargs):
+        raise RuntimeError("invoke failed")
+
+
+def test_lambda_sink_raises_each_failure_once():
+    sink = LambdaBatchSink(_FailingLambda(), "rtap-processor")
+    sink.write_many(_events(3))
+
+    with pytest.raises(RuntimeError, match="invoke failed"):
+        sink.close()
+    sink.close()
+
+
+def test_lambda_sink_releases_its_slot_when_submit_fails():
+    sink = LambdaBatchSink(FakeLambda(), "rtap-processor", max_concurrency=1)
+    sink.close()
+
+    # The executor is shut down; a leaked slot would block the second flush.
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            sink.write_many(_events(1))
+    assert sink.in_flight == 0
+
+
+def test_pipeline_dispatches_lambda_batches_asynchronously():
+    pipeline = Pipeline(config=RuntimeConfig(lambda_async=True))
+    result = pipeline.run(
+        stream_name="lambda-stream",
+        bucket_name="lambda-bucket",
+        table_name="lambda-table",
+        event_count=40,
+    )
+
+    assert result.events_processed == 40
+    assert result.metrics_snapshot["lambda.events.dispatched.count"] == 40.0
+    assert "pipeline.lambda_drain.count" in result.metrics_snapshot